@@ -0,0 +1,75 @@
+"""Compare per-test browser setup latency of get_driver() and BrowserPool.
+Only the time until the test gets its page is measured.
+
+get_driver() launches and closes a whole browser for every test,
+BrowserPool only creates and closes a new context. With warm contexts the context
+of the next test is created while the current test waits for its page to load.
+
+Usage:
+    BROWSER_HEADLESS=true python -m benchmarks.bench_browser_setup --tests 20
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.common import print_results, save_results
+from utils.browser_pool import BrowserPool
+from utils.fixtures.driver import get_driver
+
+
+def _stats(samples_ms: list) -> dict:
+    samples_ms = sorted(samples_ms)
+    return {
+        "median_ms": statistics.median(samples_ms),
+        "p95_ms": samples_ms[int(len(samples_ms) * 0.95) - 1],
+        "max_ms": samples_ms[-1],
+        "tests": len(samples_ms),
+    }
+
+
+def measure_get_driver(tests: int) -> dict:
+    samples = []
+    for _ in range(tests):
+        start = time.perf_counter()
+        page, browser = get_driver()
+        samples.append((time.perf_counter() - start) * 1000)
+        page.goto("about:blank")
+        browser.close()
+    return _stats(samples)
+
+
+def measure_browser_pool(tests: int, warm_contexts: int) -> dict:
+    pool = BrowserPool(warm_contexts=warm_contexts)
+    samples = []
+    try:
+        for _ in range(tests):
+            start = time.perf_counter()
+            page = pool.acquire()
+            samples.append((time.perf_counter() - start) * 1000)
+            page.goto("about:blank")
+            # the test body: Playwright calls the warm-up runs during
+            page.wait_for_timeout(100)
+            pool.release(page)
+    finally:
+        pool.close()
+    # the first sample includes the browser launch
+    return {**_stats(samples), "first_ms": samples[0], **pool.metrics.as_dict()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tests", type=int, default=20)
+    args = parser.parse_args()
+
+    results = {
+        "get_driver (browser per test)": measure_get_driver(args.tests),
+        "BrowserPool (context per test)": measure_browser_pool(args.tests, 0),
+        "BrowserPool (1 warm context)": measure_browser_pool(args.tests, 1),
+    }
+    print_results("Per-test browser setup", results)
+    save_results("browser_setup", results)
+
+
+if __name__ == "__main__":
+    main()
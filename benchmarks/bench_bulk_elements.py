@@ -0,0 +1,83 @@
+"""Compare the per-element and the batched BaseBlock._find_html_elements
+on a synthetic page with many matching elements.
+
+Usage:
+    BROWSER_HEADLESS=true python -m benchmarks.bench_bulk_elements --elements 1000
+"""
+
+import argparse
+import time
+
+from benchmarks.common import print_results, save_results
+from ui.base.block import BaseBlock
+from ui.base.html_element import HtmlElement
+from utils.browser_pool import BrowserPool
+from utils.reporting.test_context import _current_test
+from utils.reporting.ui_coverage_helpers import record_locator
+
+ROW_XPATH = "//tr[@class='row']"
+
+
+def legacy_find_html_elements(block: BaseBlock, xpath: str, highlight: bool = True):
+    """BaseBlock._find_html_elements before the batched implementation."""
+    pw_locator = block.element.locator(f"xpath={xpath}")
+    pw_elements = [pw_locator.nth(x) for x in range(pw_locator.count())]
+    for pw_elem in pw_elements:
+        record_locator(block.page.url, pw_elem, is_block=False, outer_xpath=xpath)
+    if pw_elements:
+        pw_locator.first.wait_for()
+
+    elements = [HtmlElement(el) for el in pw_elements]
+    if highlight:
+        _ = [x.highlight() for x in elements]
+    return elements
+
+
+def synthetic_table(rows: int) -> str:
+    cells = "".join(
+        f"<tr class='row'><td>{x}</td><td>Course {x}</td></tr>" for x in range(rows)
+    )
+    return f"<html><body><table id='courses'>{cells}</table></body></html>"
+
+
+def _timed_ms(func) -> float:
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--elements", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    token = _current_test.set(("0", "Bulk elements benchmark"))
+    pool = BrowserPool()
+    page = pool.acquire()
+    try:
+        page.set_content(synthetic_table(args.elements))
+        block = BaseBlock(page.locator("xpath=//table[@id='courses']"))
+
+        results = {}
+        for name, func in (
+            ("per element", lambda: legacy_find_html_elements(block, ROW_XPATH)),
+            ("batched", lambda: block._find_html_elements(ROW_XPATH)),
+        ):
+            samples = [_timed_ms(func) for _ in range(args.repeat)]
+            results[name] = {
+                "elements": len(func()),
+                "min_ms": min(samples),
+                "max_ms": max(samples),
+            }
+    finally:
+        pool.release(page)
+        pool.close()
+        _current_test.reset(token)
+
+    print_results(f"_find_html_elements, {args.elements} matches", results)
+    save_results("bulk_elements", results)
+
+
+if __name__ == "__main__":
+    main()
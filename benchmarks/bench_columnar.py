@@ -0,0 +1,92 @@
+"""Size, write and read time of a worker file in the JSON and the .uicov formats.
+
+Usage:
+    python -m benchmarks.bench_columnar --pages 100 --xpaths-per-page 125 --tests-per-xpath 10
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import print_results, save_results
+from benchmarks.synthetic_coverage import generate_worker_data
+from utils.reporting.coverage_columnar import (
+    GZIP,
+    ZSTD,
+    ColumnarReader,
+    ColumnarWriter,
+    zstandard,
+)
+from utils.reporting.coverage_merge import read_coverage_pages
+
+
+def write_columnar(file_path: Path, data: dict, compression: str):
+    with ColumnarWriter(file_path, compression) as writer:
+        for page_url, xpaths in data.items():
+            for xpath, records in xpaths.items():
+                for x in records:
+                    writer.add(
+                        page_url,
+                        xpath,
+                        x["allure_id"],
+                        x["test_name"],
+                        x["is_block"],
+                        x["original_page_url"],
+                        x["outer_xpath"],
+                    )
+
+
+def write_json(file_path: Path, data: dict):
+    with open(file_path, "w") as file:
+        json.dump(data, file, indent=4, sort_keys=True)
+
+
+def run_case(file_path: Path, write) -> dict:
+    start = time.perf_counter()
+    write()
+    write_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    records = sum(
+        len(x) for _, xpaths in read_coverage_pages(file_path) for x in xpaths.values()
+    )
+    return {
+        "records": records,
+        "size_mb": file_path.stat().st_size / 1024 / 1024,
+        "write_seconds": write_seconds,
+        "read_seconds": time.perf_counter() - start,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--xpaths-per-page", type=int, default=125)
+    parser.add_argument("--tests-per-xpath", type=int, default=10)
+    parser.add_argument("--tests", type=int, default=5000)
+    args = parser.parse_args()
+
+    data = generate_worker_data(
+        0, args.pages, args.xpaths_per_page, args.tests_per_xpath, args.tests
+    )
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = Path(directory) / "used_locators_gw0.json"
+        results["json"] = run_case(file_path, lambda: write_json(file_path, data))
+
+        compressions = [GZIP] + ([ZSTD] if zstandard is not None else [])
+        for compression in compressions:
+            file_path = Path(directory) / f"used_locators_gw0_{compression}.uicov"
+            results[f"uicov_{compression}"] = run_case(
+                file_path, lambda: write_columnar(file_path, data, compression)
+            )
+            assert ColumnarReader(file_path).to_dict() == data
+
+    print_results("worker file formats", results)
+    save_results("columnar", results)
+
+
+if __name__ == "__main__":
+    main()
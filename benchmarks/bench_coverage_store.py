@@ -0,0 +1,127 @@
+"""Compare worker memory of the legacy used_locators dict with UsedLocatorsStore.
+The 'chain' variant records the xpaths as block chains, as record_locator does.
+
+Every variant runs in its own interpreter, so peak RSS values are not shared.
+
+Usage:
+    python -m benchmarks.bench_coverage_store --calls 1000000
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from typing import Iterator, Tuple
+
+from benchmarks.common import print_results, save_results
+from utils.reporting.coverage_store import UsedLocatorsStore
+
+VARIANTS = ("legacy", "store", "chain")
+
+
+def synthetic_calls(
+    calls: int, pages: int = 50, xpaths_per_page: int = 40, tests: int = 500
+) -> Iterator[Tuple[str, str, str, str, bool, str, None]]:
+    """Yield record_locator arguments of a suite that reuses the same locators a lot.
+    Every test visits three pages and touches all of their xpaths many times.
+    """
+    for i in range(calls):
+        test = (i * tests) // calls
+        page = (test + (i // xpaths_per_page) % 3) % pages
+        xpath = i % xpaths_per_page
+        yield (
+            f"https://example.com/section/{page}/page",
+            f"//div[@id='page-{page}']//div[@class='row']/span[{xpath}]",
+            str(test),
+            f"Check feature number {test}",
+            xpath % 5 == 0,
+            f"https://example.com/section/{page}/page?session={test}",
+            None,
+        )
+
+
+def run_legacy(calls: int) -> int:
+    used_locators = {}
+    for page_url, xpath, allure_id, test_name, is_block, url, outer in synthetic_calls(
+        calls
+    ):
+        used_locators.setdefault(page_url, {}).setdefault(xpath, []).append(
+            {
+                "allure_id": allure_id,
+                "is_block": is_block,
+                "test_name": test_name,
+                "original_page_url": url,
+                "outer_xpath": outer,
+            }
+        )
+    return sum(len(x) for xpaths in used_locators.values() for x in xpaths.values())
+
+
+def run_store(calls: int) -> int:
+    store = UsedLocatorsStore()
+    for args in synthetic_calls(calls):
+        store.add(*args)
+    return len(store)
+
+
+def run_chain(calls: int) -> int:
+    store = UsedLocatorsStore()
+    for page_url, xpath, *args in synthetic_calls(calls):
+        block, element = xpath.split("]//", 1)
+        store.add(page_url, (f"{block}]", f"//{element}"), *args)
+    return len(store)
+
+
+def run_variant(variant: str, calls: int) -> dict:
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    records = {"legacy": run_legacy, "store": run_store, "chain": run_chain}[variant](
+        calls
+    )
+    duration = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return {
+        "records": records,
+        "seconds": duration,
+        "peak_rss_mb": rss_after / 1024,
+        "workload_rss_mb": (rss_after - rss_before) / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--variant", choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(run_variant(args.variant, args.calls)))
+        return
+
+    results = {}
+    for variant in VARIANTS:
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_coverage_store",
+                "--calls",
+                str(args.calls),
+                "--variant",
+                variant,
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[variant] = json.loads(output)
+
+    print_results(f"used_locators memory, {args.calls} record_locator calls", results)
+    save_results("coverage_store", results)
+
+
+if __name__ == "__main__":
+    main()
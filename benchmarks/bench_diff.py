@@ -0,0 +1,89 @@
+"""Coverage diff of two runs against a comparison of the fully loaded files.
+
+The current run drops a share of the pages and of the records of the baseline.
+
+Usage:
+    python -m benchmarks.bench_diff --pages 100 --xpaths-per-page 125 --tests-per-xpath 10
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import print_results, save_results
+from benchmarks.synthetic_coverage import generate_worker_data
+from utils.reporting.coverage_diff import diff_coverage
+
+
+def full_load_diff(baseline_path: Path, current_path: Path) -> tuple:
+    """(removed, added, changed) locators of json.load-ed files"""
+    locators = []
+    for file_path in (baseline_path, current_path):
+        with open(file_path) as file:
+            pages = json.load(file)
+        locators.append(
+            {
+                (page_url, xpath): {(x["allure_id"], x["test_name"]) for x in records}
+                for page_url, xpaths in pages.items()
+                for xpath, records in xpaths.items()
+            }
+        )
+    baseline, current = locators
+    changed = [x for x in baseline.keys() & current.keys() if baseline[x] != current[x]]
+    return (
+        len(baseline.keys() - current.keys()),
+        len(current.keys() - baseline.keys()),
+        len(changed),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--xpaths-per-page", type=int, default=125)
+    parser.add_argument("--tests-per-xpath", type=int, default=10)
+    parser.add_argument("--tests", type=int, default=5000)
+    parser.add_argument("--drop-every", type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = generate_worker_data(
+        0, args.pages, args.xpaths_per_page, args.tests_per_xpath, args.tests
+    )
+    current = {}
+    for i, (page_url, xpaths) in enumerate(baseline.items()):
+        if i % args.drop_every:
+            current[page_url] = {
+                xpath: records[: len(records) - (j % args.drop_every == 0)]
+                for j, (xpath, records) in enumerate(xpaths.items())
+            }
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        baseline_path = Path(directory) / "baseline.json"
+        current_path = Path(directory) / "current.json"
+        for file_path, pages in ((baseline_path, baseline), (current_path, current)):
+            with open(file_path, "w") as file:
+                json.dump(pages, file)
+
+        start = time.perf_counter()
+        expected = full_load_diff(baseline_path, current_path)
+        results["full_load"] = {"seconds": time.perf_counter() - start}
+
+        start = time.perf_counter()
+        summary = diff_coverage(baseline_path, current_path).summary
+        results["streaming_diff"] = {
+            "seconds": time.perf_counter() - start,
+            "removed": summary.removed,
+            "added": summary.added,
+            "changed": summary.changed,
+        }
+        assert (summary.removed, summary.added, summary.changed) == expected
+
+    print_results("coverage diff", results)
+    save_results("diff", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Incremental merge (--incremental) against a full merge after typical input changes.
+
+Every step changes the input directory and runs both merges;
+the aggregates are checked to contain the same records.
+
+Usage:
+    python -m benchmarks.bench_incremental_merge --files 100 --pages 20
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import print_results, save_results
+from benchmarks.synthetic_coverage import write_worker_file
+from merge_ui_coverage_files import merge_ui_coverage_json_files
+from utils.reporting.coverage_merge import OUTPUT_FILENAME
+
+
+def _records(file_path: Path) -> dict:
+    with open(file_path) as file:
+        pages = json.load(file)
+    return {
+        (page_url, xpath, x["allure_id"]): x
+        for page_url, xpaths in pages.items()
+        for xpath, records in xpaths.items()
+        for x in records
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--xpaths-per-page", type=int, default=25)
+    parser.add_argument("--tests-per-xpath", type=int, default=5)
+    parser.add_argument("--tests", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        input_dir = Path(directory) / "input"
+        incremental_dir = Path(directory) / "incremental"
+        full_dir = Path(directory) / "full"
+        for path in (input_dir, incremental_dir, full_dir):
+            path.mkdir()
+
+        def write(name: str, worker: int):
+            write_worker_file(
+                input_dir / f"used_locators_{name}.json",
+                worker,
+                args.pages,
+                args.xpaths_per_page,
+                args.tests_per_xpath,
+                args.tests,
+            )
+
+        steps = {
+            "initial": lambda: [write(f"shard{i:04}", i) for i in range(args.files)],
+            "no_changes": lambda: None,
+            "new_shard": lambda: write("shard9999", 9999),
+            "rerun_shard": lambda: write("shard0001", 10001),
+            "removed_shard": lambda: os.remove(
+                input_dir / "used_locators_shard0002.json"
+            ),
+        }
+        results = {}
+        for step, change in steps.items():
+            change()
+            start = time.perf_counter()
+            summary = merge_ui_coverage_json_files(
+                input_dir, incremental_dir, incremental=True
+            )
+            incremental_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            merge_ui_coverage_json_files(input_dir, full_dir)
+            full_seconds = time.perf_counter() - start
+
+            assert _records(incremental_dir / OUTPUT_FILENAME) == _records(
+                full_dir / OUTPUT_FILENAME
+            ), step
+            results[step] = {
+                "records": summary.records,
+                "read_files": len(summary.added) + len(summary.changed),
+                "incremental_seconds": incremental_seconds,
+                "full_seconds": full_seconds,
+            }
+
+    print_results(f"incremental merge of {args.files} files", results)
+    save_results("incremental_merge", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Overhead of the latency instrumentation and accuracy of its percentiles.
+
+Usage:
+    python -m benchmarks.bench_latency
+"""
+
+import random
+
+import utils.reporting.latency as latency
+from benchmarks.common import measure, print_results, save_results
+from utils.reporting.latency import LatencyHistogram, LatencyRecorder
+
+PAGE_URL = "https://ultimateqa.com/"
+XPATH = "//div[@id='top-courses']//a"
+
+
+def _key(*_args, **_kwargs):
+    return PAGE_URL, XPATH
+
+
+def _lookup(value):
+    return value
+
+
+def _decorate(enabled: bool):
+    """Decorate _lookup the way page objects are decorated with the given setting"""
+    latency.UI_LATENCY_ENABLED = enabled
+    return latency.timed(_key, operation="find_element")(_lookup)
+
+
+def bench_overhead() -> dict:
+    disabled = _decorate(False)
+    enabled = _decorate(True)
+    latency.latency_recorder.clear()
+
+    return {
+        "undecorated": measure(lambda: _lookup(1), number=100_000),
+        "disabled": measure(lambda: disabled(1), number=100_000),
+        "enabled": measure(lambda: enabled(1), number=100_000),
+    }
+
+
+def bench_accuracy(samples: int = 200_000) -> dict:
+    """Compare histogram percentiles with exact ones on a log-normal distribution."""
+    rng = random.Random(42)
+    durations = sorted(rng.lognormvariate(3, 1) for _ in range(samples))
+
+    # split across 4 "workers" and merge, the same way worker files are merged
+    merged = LatencyRecorder()
+    for worker in range(4):
+        recorder = LatencyRecorder()
+        histogram = recorder.histograms[("find_element", PAGE_URL, XPATH)] = (
+            LatencyHistogram()
+        )
+        for duration in durations[worker::4]:
+            histogram.add(duration)
+        merged.merge(LatencyRecorder.from_dict(recorder.to_dict()))
+
+    histogram = merged.histograms[("find_element", PAGE_URL, XPATH)]
+    results = {}
+    for percent in latency.PERCENTILES:
+        exact = durations[max(0, int(samples * percent / 100) - 1)]
+        estimated = histogram.percentile(percent)
+        results[f"p{percent}"] = {
+            "exact_ms": exact,
+            "histogram_ms": estimated,
+            "error_percent": abs(estimated - exact) / exact * 100,
+        }
+    return results
+
+
+def main():
+    overhead = bench_overhead()
+    accuracy = bench_accuracy()
+    print_results("Call overhead (us per call)", overhead)
+    print_results("Percentiles of merged histograms", accuracy)
+    filepath = save_results("latency", {"overhead": overhead, "accuracy": accuracy})
+    print(f"\nResults saved to {filepath}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Scaling benchmark of merge_ui_coverage_files.py against worker count and file size.
+
+The legacy merge is quadratic in the number of records per xpath,
+so it is skipped for cases bigger than --legacy-limit records.
+
+Usage:
+    python -m benchmarks.bench_merge --workers 2,8,32 --tests-per-xpath 10,100
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import print_results, save_results
+from benchmarks.synthetic_coverage import write_worker_files
+from merge_ui_coverage_files import merge_ui_coverage_json_files
+from utils.reporting.coverage_merge import OUTPUT_FILENAME
+
+
+def legacy_merge(input_dir_path, output_dir_path):
+    """merge_ui_coverage_json_files before the linear rewrite."""
+    merged_data = {}
+    for filename in sorted(os.listdir(input_dir_path)):
+        if filename.endswith(".json"):
+            file_path = os.path.join(input_dir_path, filename)
+            with open(file_path, "r") as file:
+                data = json.load(file)
+                for url, xpaths_dict in data.items():
+                    if url in merged_data:
+                        for xpath, test_cases in xpaths_dict.items():
+                            if xpath in merged_data[url]:
+                                merged_data[url][xpath].extend(test_cases)
+                            else:
+                                merged_data[url][xpath] = test_cases
+                    else:
+                        merged_data[url] = xpaths_dict
+
+    # pylint: disable=consider-using-dict-items
+    for url in merged_data:
+        for xpath in merged_data[url]:
+            merged_data[url][xpath] = [
+                item
+                for i, item in enumerate(merged_data[url][xpath])
+                if item["allure_id"]
+                not in {x["allure_id"] for x in merged_data[url][xpath][:i]}
+            ]
+
+    output_file_path = os.path.join(output_dir_path, OUTPUT_FILENAME)
+    with open(output_file_path, "w") as output_file:
+        json.dump(merged_data, output_file, indent=4)
+
+
+def _timed(func, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def _int_list(value: str):
+    return [int(x) for x in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=_int_list, default=[2, 8, 32])
+    parser.add_argument("--tests-per-xpath", type=_int_list, default=[10, 100])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--xpaths-per-page", type=int, default=50)
+    parser.add_argument("--legacy-limit", type=int, default=2_000_000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    results = {}
+    for workers in args.workers:
+        for tests_per_xpath in args.tests_per_xpath:
+            records = workers * args.pages * args.xpaths_per_page * tests_per_xpath
+            with tempfile.TemporaryDirectory() as tmp:
+                input_dir = Path(tmp) / "ui_coverage"
+                legacy_dir, compact_dir, indent_dir = (
+                    Path(tmp) / name for name in ("legacy", "compact", "indent")
+                )
+                for directory in (legacy_dir, compact_dir, indent_dir):
+                    directory.mkdir()
+                files = write_worker_files(
+                    input_dir,
+                    workers,
+                    args.pages,
+                    args.xpaths_per_page,
+                    tests_per_xpath,
+                )
+                row = {
+                    "records": records,
+                    "input_mb": sum(f.stat().st_size for f in files) / 2**20,
+                    "linear_s": _timed(
+                        merge_ui_coverage_json_files, input_dir, compact_dir
+                    ),
+                    "parallel_s": _timed(
+                        merge_ui_coverage_json_files,
+                        input_dir,
+                        compact_dir,
+                        workers=args.processes,
+                    ),
+                }
+                merge_ui_coverage_json_files(input_dir, indent_dir, indent=4)
+                row["output_mb"] = (
+                    compact_dir / OUTPUT_FILENAME
+                ).stat().st_size / 2**20
+
+                if records <= args.legacy_limit:
+                    row["legacy_s"] = _timed(legacy_merge, input_dir, legacy_dir)
+                    legacy_bytes = (legacy_dir / OUTPUT_FILENAME).read_bytes()
+                    row["identical"] = (
+                        legacy_bytes == (indent_dir / OUTPUT_FILENAME).read_bytes()
+                    )
+            results[f"workers={workers} tests/xpath={tests_per_xpath}"] = row
+
+    print_results("Merge of used_locators worker files", results)
+    save_results("merge", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Latency and throughput of the page-object layer against the local fixture site.
+
+The landing page and the top courses block are served by benchmarks/fixture_site.py,
+so the numbers do not depend on the live site. Page variants are parametrized by
+the number of courses in the block and the number of unrelated (filler) DOM nodes.
+
+Results are saved to benchmarks/results/page_objects.json together with the git revision.
+Pass a previously saved file to --compare to print the change of the median latencies.
+
+Usage:
+    BROWSER_HEADLESS=true python -m benchmarks.bench_page_objects
+    BROWSER_HEADLESS=true python -m benchmarks.bench_page_objects \\
+        --courses 10 1000 --filler 0 10000 --calls 100 --compare old_page_objects.json
+"""
+
+import argparse
+import json
+import subprocess
+from typing import Dict
+
+from benchmarks.bench_browser_setup import measure_browser_pool
+from benchmarks.common import (
+    latency_stats,
+    print_results,
+    sample_calls_ms,
+    save_results,
+)
+from benchmarks.fixture_site import FixtureSite, course_name
+from utils.browser_pool import BrowserPool
+from utils.reporting.coverage_store import used_locators
+from utils.reporting.test_context import _current_test
+from utils.reporting.ui_coverage_helpers import record_locator
+
+COURSE_XPATH = "//div[contains(@class, 'et_pb_module')]//h4"
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def measure_variant(page, site: FixtureSite, courses: int, filler: int, calls: int):
+    app = site.app(page, courses=courses, filler=filler)
+    app.landing_page.open()
+    top_courses = app.landing_page.top_courses
+
+    cases = {
+        "find_element": lambda: app.landing_page.welcome_title,
+        "find_elements": lambda: top_courses._find_html_elements(COURSE_XPATH),
+        "is_course_displayed (last)": lambda: top_courses.is_course_displayed(
+            course_name(courses - 1)
+        ),
+        "is_course_displayed (missing)": lambda: top_courses.is_course_displayed(
+            "Missing course"
+        ),
+    }
+    # the first call of every case warms up the selector engines of the page
+    for func in cases.values():
+        func()
+    return {
+        name: latency_stats(sample_calls_ms(func, calls))
+        for name, func in cases.items()
+    }
+
+
+def measure_record_locator(page, calls: int) -> dict:
+    """Coverage recording only (no browser round trips)."""
+    locator = page.locator(f"xpath={COURSE_XPATH}").first
+    used_locators.clear()
+    stats = latency_stats(
+        sample_calls_ms(
+            lambda: record_locator(page.url, locator, is_block=False), calls
+        )
+    )
+    used_locators.clear()
+    return stats
+
+
+def compare(previous: dict, current: dict) -> Dict[str, dict]:
+    """Median latency of every case of the current run relative to the previous one."""
+    changes = {}
+    for variant, cases in current["variants"].items():
+        for name, stats in cases.items():
+            old = previous.get("variants", {}).get(variant, {}).get(name)
+            if old and old["median_ms"]:
+                changes[f"{variant} | {name}"] = {
+                    "old_median_ms": old["median_ms"],
+                    "new_median_ms": stats["median_ms"],
+                    "ratio": stats["median_ms"] / old["median_ms"],
+                }
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--courses", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--filler", type=int, nargs="+", default=[0, 10000])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--setup-tests", type=int, default=20)
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    args = parser.parse_args()
+
+    results = {"revision": _git_revision(), "variants": {}}
+    token = _current_test.set(("0", "Page objects benchmark"))
+    pool = BrowserPool()
+    page = pool.acquire()
+    try:
+        with FixtureSite() as site:
+            for courses in args.courses:
+                for filler in args.filler:
+                    variant = f"courses={courses} filler={filler}"
+                    results["variants"][variant] = measure_variant(
+                        page, site, courses, filler, args.calls
+                    )
+                    print_results(variant, results["variants"][variant])
+
+        results["record_locator"] = measure_record_locator(page, args.calls * 100)
+    finally:
+        pool.release(page)
+        pool.close()
+        _current_test.reset(token)
+
+    results["browser_setup"] = {
+        "context per test": measure_browser_pool(args.setup_tests),
+    }
+    print_results("record_locator", {"record_locator": results["record_locator"]})
+    print_results("Browser setup", results["browser_setup"])
+
+    if args.compare:
+        with open(args.compare) as file:
+            previous = json.load(file)
+        changes = compare(previous, results)
+        if changes:
+            print_results(
+                f"Compared with {previous.get('revision', args.compare)}", changes
+            )
+
+    filepath = save_results("page_objects", results)
+    print(f"\nResults saved to {filepath}")
+
+
+if __name__ == "__main__":
+    main()
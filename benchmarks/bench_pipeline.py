@@ -0,0 +1,183 @@
+"""Scaling harness of the coverage data pipeline:
+record_locator -> pytest_sessionfinish dump -> merge_ui_coverage_files.py
+
+For every scale (total number of records of all workers) the harness runs:
+* record + dump: one process per worker records its share of synthetic records
+  into UsedLocatorsStore and dumps it the same way pytest_sessionfinish does
+* merge: merge_ui_coverage_json_files() over all worker files
+
+Every step runs in a separate interpreter, so peak RSS values are not shared.
+Wall time, peak RSS and output size are saved to benchmarks/results/pipeline.json.
+
+Usage:
+    python -m benchmarks.bench_pipeline --scales 10k,1M,10M --workers 8
+"""
+
+import argparse
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import print_results, save_results
+from benchmarks.synthetic_coverage import iter_worker_records
+from merge_ui_coverage_files import merge_ui_coverage_json_files
+from utils.reporting.coverage_merge import OUTPUT_FILENAME
+from utils.reporting.coverage_store import UsedLocatorsStore
+from utils.reporting.url_normalizer import url_normalizer
+
+_SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+
+def parse_scale(value: str) -> int:
+    """'10k' -> 10000, '1M' -> 1000000"""
+    value = value.strip().lower()
+    if value[-1] in _SUFFIXES:
+        return int(float(value[:-1]) * _SUFFIXES[value[-1]])
+    return int(value)
+
+
+def workload_shape(records: int, workers: int, pages: int, tests_per_xpath: int):
+    """Pages and xpaths per page of every worker to get about `records` in total."""
+    per_worker = math.ceil(records / workers)
+    xpaths_per_page = math.ceil(per_worker / (pages * tests_per_xpath))
+    pages = math.ceil(per_worker / (xpaths_per_page * tests_per_xpath))
+    return pages, xpaths_per_page
+
+
+def _peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_record_and_dump(args) -> dict:
+    """Worker process: the calls record_locator makes, then the session finish dump."""
+    store = UsedLocatorsStore()
+    start = time.perf_counter()
+    for url, xpath, record in iter_worker_records(
+        args.worker, args.pages, args.xpaths_per_page, args.tests_per_xpath, args.tests
+    ):
+        store.add(
+            url_normalizer.normalize(record["original_page_url"]),
+            xpath,
+            allure_id=record["allure_id"],
+            test_name=record["test_name"],
+            is_block=record["is_block"],
+            original_page_url=record["original_page_url"],
+            outer_xpath=record["outer_xpath"],
+        )
+    record_seconds = time.perf_counter() - start
+    record_rss = _peak_rss_mb()
+
+    file_path = Path(args.directory) / f"used_locators_gw{args.worker}.json"
+    start = time.perf_counter()
+    store.dump(file_path)
+    return {
+        "records": len(store),
+        "record_s": record_seconds,
+        "record_peak_rss_mb": record_rss,
+        "dump_s": time.perf_counter() - start,
+        "dump_peak_rss_mb": _peak_rss_mb(),
+        "dump_bytes": file_path.stat().st_size,
+    }
+
+
+def run_merge(args) -> dict:
+    input_dir = Path(args.directory)
+    output_dir = input_dir / "merged"
+    output_dir.mkdir(exist_ok=True)
+    start = time.perf_counter()
+    merge_ui_coverage_json_files(input_dir, output_dir, workers=args.processes)
+    return {
+        "merge_s": time.perf_counter() - start,
+        "merge_peak_rss_mb": _peak_rss_mb(),
+        "merge_bytes": (output_dir / OUTPUT_FILENAME).stat().st_size,
+    }
+
+
+def _run_step(*step_args: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_pipeline", *step_args],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def measure_scale(records: int, args) -> dict:
+    pages, xpaths_per_page = workload_shape(
+        records, args.workers, args.pages, args.tests_per_xpath
+    )
+    shape = [
+        "--pages",
+        str(pages),
+        "--xpaths-per-page",
+        str(xpaths_per_page),
+        "--tests-per-xpath",
+        str(args.tests_per_xpath),
+        "--tests",
+        str(args.tests),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        workers = [
+            _run_step(
+                "--step", "record", "--directory", tmp, "--worker", str(x), *shape
+            )
+            for x in range(args.workers)
+        ]
+        merge = _run_step(
+            "--step", "merge", "--directory", tmp, "--processes", str(args.processes)
+        )
+
+    return {
+        "records": sum(x["records"] for x in workers),
+        "pages": pages,
+        "xpaths_per_page": xpaths_per_page,
+        # workers run in parallel, so the slowest one defines the wall time
+        "record_s": max(x["record_s"] for x in workers),
+        "record_peak_rss_mb": max(x["record_peak_rss_mb"] for x in workers),
+        "dump_s": max(x["dump_s"] for x in workers),
+        "dump_peak_rss_mb": max(x["dump_peak_rss_mb"] for x in workers),
+        "dump_bytes": sum(x["dump_bytes"] for x in workers),
+        **merge,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", default="10k,1M,10M")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--tests-per-xpath", type=int, default=10)
+    parser.add_argument("--tests", type=int, default=5000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    # options of the processes started by the harness
+    parser.add_argument("--step", choices=("record", "merge"), help=argparse.SUPPRESS)
+    parser.add_argument("--directory", help=argparse.SUPPRESS)
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--xpaths-per-page", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.step:
+        step = run_record_and_dump if args.step == "record" else run_merge
+        print(json.dumps(step(args)))
+        return
+
+    results = {}
+    for scale in args.scales.split(","):
+        results[scale] = measure_scale(parse_scale(scale), args)
+        print_results(
+            f"{scale} records, {args.workers} workers", {scale: results[scale]}
+        )
+
+    print_results("Coverage pipeline scaling", results)
+    save_results("pipeline", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Load time of CoverageQuery with and without the index sidecar and the latency
+of its lookups by xpath and by test against a scan of the parsed coverage file.
+
+Usage:
+    python -m benchmarks.bench_query --pages 100 --xpaths-per-page 125 --tests-per-xpath 10
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import (
+    latency_stats,
+    print_results,
+    sample_calls_ms,
+    save_results,
+)
+from benchmarks.synthetic_coverage import write_worker_file
+from utils.reporting.coverage_query import CoverageQuery
+
+
+def scan_tests_for_xpath(pages: dict, xpath: str) -> list:
+    return list(
+        dict.fromkeys(
+            (x["allure_id"], x["test_name"])
+            for xpaths in pages.values()
+            for x in xpaths.get(xpath, [])
+        )
+    )
+
+
+def scan_locators_for_test(pages: dict, allure_id: str) -> list:
+    return list(
+        dict.fromkeys(
+            (page_url, xpath)
+            for page_url, xpaths in pages.items()
+            for xpath, records in xpaths.items()
+            for x in records
+            if x["allure_id"] == allure_id
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--xpaths-per-page", type=int, default=125)
+    parser.add_argument("--tests-per-xpath", type=int, default=10)
+    parser.add_argument("--tests", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = Path(directory) / "used_locators.json"
+        write_worker_file(
+            file_path,
+            0,
+            args.pages,
+            args.xpaths_per_page,
+            args.tests_per_xpath,
+            args.tests,
+        )
+
+        start = time.perf_counter()
+        with open(file_path) as file:
+            pages = json.load(file)
+        results["json_load"] = {"seconds": time.perf_counter() - start}
+        for case, use_index in (("query_parse", False), ("query_sidecar", True)):
+            # the first load with use_index writes the sidecar
+            CoverageQuery.load(file_path, use_index=use_index)
+            start = time.perf_counter()
+            query = CoverageQuery.load(file_path, use_index=use_index)
+            results[case] = {"seconds": time.perf_counter() - start}
+
+        xpaths = sorted({x for xpaths in pages.values() for x in xpaths})
+        random.seed(0)
+        sample = [random.choice(xpaths) for _ in range(args.lookups)]
+        for xpath in sample:
+            assert query.tests_for_xpath(xpath) == scan_tests_for_xpath(pages, xpath)
+        lookups = iter(sample * 2)
+        results["scan_xpath_lookup"] = latency_stats(
+            sample_calls_ms(
+                lambda: scan_tests_for_xpath(pages, next(lookups)), args.lookups
+            )
+        )
+        results["index_xpath_lookup"] = latency_stats(
+            sample_calls_ms(lambda: query.tests_for_xpath(next(lookups)), args.lookups)
+        )
+
+        allure_ids = sorted(
+            {
+                x["allure_id"]
+                for xpaths in pages.values()
+                for records in xpaths.values()
+                for x in records
+            }
+        )
+        sample = [random.choice(allure_ids) for _ in range(args.lookups)]
+        for allure_id in sample[:10]:
+            assert query.locators_for_test(allure_id) == scan_locators_for_test(
+                pages, allure_id
+            )
+        lookups = iter(sample * 2)
+        results["scan_test_lookup"] = latency_stats(
+            sample_calls_ms(
+                lambda: scan_locators_for_test(pages, next(lookups)), args.lookups
+            )
+        )
+        results["index_test_lookup"] = latency_stats(
+            sample_calls_ms(
+                lambda: query.locators_for_test(next(lookups)), args.lookups
+            )
+        )
+
+    print_results(f"coverage queries over {len(query)} records", results)
+    save_results("query", results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Partitioned map/reduce merge of many machines against a merge of all worker files.
+
+Every machine is an archive with the worker files of its xdist workers;
+the merged files are checked to contain the same records.
+
+Usage:
+    python -m benchmarks.bench_reduce --machines 50 --workers-per-machine 4 --processes 4
+"""
+
+import argparse
+import json
+import tarfile
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import print_results, save_results
+from benchmarks.synthetic_coverage import write_worker_file
+from utils.reporting.coverage_merge import merge_coverage_files, write_coverage_file
+from utils.reporting.coverage_reduce import DEFAULT_PARTITIONS, reduce_coverage
+
+
+def _records(file_path: Path) -> dict:
+    with open(file_path) as file:
+        pages = json.load(file)
+    return {
+        (page_url, xpath, x["allure_id"]): x
+        for page_url, xpaths in pages.items()
+        for xpath, records in xpaths.items()
+        for x in records
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--machines", type=int, default=50)
+    parser.add_argument("--workers-per-machine", type=int, default=4)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--xpaths-per-page", type=int, default=25)
+    parser.add_argument("--tests-per-xpath", type=int, default=5)
+    parser.add_argument("--tests", type=int, default=300)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--partitions", type=int, default=DEFAULT_PARTITIONS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        archives, file_paths = [], []
+        for machine in range(args.machines):
+            machine_dir = directory / f"machine{machine:03}"
+            machine_dir.mkdir()
+            for worker in range(args.workers_per_machine):
+                file_path = machine_dir / f"used_locators_gw{worker}.json"
+                write_worker_file(
+                    file_path,
+                    machine * args.workers_per_machine + worker,
+                    args.pages,
+                    args.xpaths_per_page,
+                    args.tests_per_xpath,
+                    args.tests,
+                )
+                file_paths.append(file_path)
+            archive = directory / f"machine{machine:03}.tar.gz"
+            with tarfile.open(archive, "w:gz") as tar:
+                tar.add(machine_dir, arcname="ui_coverage")
+            archives.append(archive)
+
+        results = {}
+        start = time.perf_counter()
+        write_coverage_file(
+            merge_coverage_files(file_paths, workers=args.processes),
+            directory / "merged.json",
+        )
+        results["merge_all_files"] = {"seconds": time.perf_counter() - start}
+
+        start = time.perf_counter()
+        summary = reduce_coverage(
+            archives,
+            directory / "reduced.json",
+            workers=args.processes,
+            partitions=args.partitions,
+        )
+        results["reduce_archives"] = {
+            "seconds": time.perf_counter() - start,
+            **summary,
+        }
+        assert _records(directory / "reduced.json") == _records(
+            directory / "merged.json"
+        )
+
+    print_results(f"merge of {args.machines} machines", results)
+    save_results("reduce", results)
+
+
+if __name__ == "__main__":
+    main()
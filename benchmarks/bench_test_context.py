@@ -0,0 +1,71 @@
+"""Compare the stack walking test lookup with the hook-driven current test context.
+
+Usage:
+    python -m benchmarks.bench_test_context
+"""
+
+import allure
+import pytest
+
+from benchmarks.common import measure, print_results, save_results
+from utils.reporting.test_context import (
+    _current_test,
+    get_current_test,
+    resolve_test_identity,
+)
+from utils.reporting.ui_coverage_helpers import get_test_allure_id_and_title
+
+# Roughly the number of pluggy/pytest frames between a test and the
+# page object call that records a locator.
+STACK_DEPTH = 60
+
+
+@allure.id("3")
+@allure.title("Check Top Courses")
+@pytest.mark.parametrize("expected_course", ["Python"])
+def test_benchmark_function(expected_course: str):
+    return expected_course
+
+
+def _deep_call(depth: int, func):
+    if depth:
+        return _deep_call(depth - 1, func)
+    return func()
+
+
+def pytest_pyfunc_call(testfunction, lookup):
+    """Mimics the pytest frame that holds the 'testfunction' local."""
+    return test_benchmark_wrapper(lookup)
+
+
+def test_benchmark_wrapper(lookup):
+    # page object and block calls between the test and record_locator
+    return _deep_call(STACK_DEPTH // 4, lookup)
+
+
+def run_test(lookup):
+    return _deep_call(
+        STACK_DEPTH, lambda: pytest_pyfunc_call(test_benchmark_function, lookup)
+    )
+
+
+def main():
+    token = _current_test.set(resolve_test_identity(test_benchmark_function))
+    try:
+        assert run_test(get_test_allure_id_and_title) == run_test(get_current_test)
+
+        results = {
+            "stack walking": measure(
+                lambda: run_test(get_test_allure_id_and_title), number=200
+            ),
+            "context variable": measure(lambda: run_test(get_current_test), number=200),
+        }
+    finally:
+        _current_test.reset(token)
+
+    print_results("Current test lookup per recorded locator", results)
+    save_results("test_context", results)
+
+
+if __name__ == "__main__":
+    main()
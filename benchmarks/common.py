@@ -0,0 +1,70 @@
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import rootpath
+
+RESULTS_DIRECTORY = rootpath.detect() / Path("benchmarks") / Path("results")
+
+
+def measure(func: Callable, number: int = 1000, repeat: int = 5) -> Dict[str, float]:
+    """Run func `number` times per round and return per-call timings in microseconds."""
+    rounds: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number * 1_000_000)
+
+    return {
+        "min_us": min(rounds),
+        "median_us": statistics.median(rounds),
+        "max_us": max(rounds),
+        "calls": number * repeat,
+    }
+
+
+def latency_stats(samples_ms: List[float]) -> Dict[str, float]:
+    """Latency percentiles and throughput of individual calls measured in milliseconds."""
+    samples_ms = sorted(samples_ms)
+    total_ms = sum(samples_ms)
+    return {
+        "median_ms": statistics.median(samples_ms),
+        "p95_ms": samples_ms[max(0, int(len(samples_ms) * 0.95) - 1)],
+        "max_ms": samples_ms[-1],
+        "ops_per_s": len(samples_ms) / total_ms * 1000 if total_ms else 0.0,
+        "calls": len(samples_ms),
+    }
+
+
+def sample_calls_ms(func: Callable, number: int) -> List[float]:
+    """Call func `number` times and return the duration of every call in milliseconds."""
+    samples = []
+    for _ in range(number):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def print_results(title: str, results: Dict[str, Dict[str, float]]):
+    """Print a simple table with one row per measured case."""
+    print(f"\n{title}")
+    width = max(len(name) for name in results)
+    for name, row in results.items():
+        values = "  ".join(
+            f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in row.items()
+        )
+        print(f"  {name.ljust(width)}  {values}")
+
+
+def save_results(name: str, results: dict) -> Path:
+    """Store benchmark results as JSON so they can be compared between commits."""
+    RESULTS_DIRECTORY.mkdir(parents=True, exist_ok=True)
+    filepath = RESULTS_DIRECTORY / f"{name}.json"
+    with open(filepath, "w") as file:
+        json.dump(results, file, indent=4, sort_keys=True)
+    return filepath
@@ -0,0 +1,119 @@
+"""Local site serving synthetic copies of the UltimateQA landing page.
+
+Pages have the same structure as the parts of the live page used by LandingPage and
+TopCoursesBlock, so the page objects run unchanged against them.
+The shape of a page is encoded in its base URL:
+
+    http://127.0.0.1:<port>/courses-<courses>-filler-<filler>/fake-landing-page
+
+courses: number of course modules in the top courses block
+filler: number of unrelated DOM nodes added around them (page size)
+"""
+
+import re
+import threading
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ui.applications.ultimate_qa import UltimateQa
+
+_VARIANT_PATTERN = re.compile(r"^/courses-(\d+)-filler-(\d+)/fake-landing-page/?$")
+
+
+def course_name(index: int) -> str:
+    return f"Course {index}"
+
+
+@lru_cache(maxsize=32)
+def landing_page_html(courses: int, filler: int) -> str:
+    course_modules = "".join(
+        f"<div class='et_pb_module et_pb_blurb'><h4>{course_name(x)}</h4>"
+        f"<p>Description of {course_name(x)}</p></div>"
+        for x in range(courses)
+    )
+    filler_nodes = "".join(
+        f"<div class='filler'><span>Item {x}</span></div>" for x in range(filler)
+    )
+    return f"""<!DOCTYPE html>
+<html>
+<head><title>Fixture landing page</title></head>
+<body>
+<div class="et_pb_menu__menu"><a href="#">I want a free DISCOVERY SESSION</a></div>
+<div class="et_pb_row et_pb_row_0">
+    <div class="et_pb_text_inner"><h1>Welcome</h1></div>
+    <div class="et_pb_text_inner"><p>Welcome text</p></div>
+</div>
+<div class="et_pb_row">
+    <div class="et_pb_column">{filler_nodes}</div>
+    <div class="et_pb_column et-last-child">{course_modules}</div>
+</div>
+<a href="#">View Courses</a>
+</body>
+</html>"""
+
+
+class _FixtureSiteHandler(BaseHTTPRequestHandler):
+    def do_GET(self):  # pylint: disable=invalid-name
+        match = _VARIANT_PATTERN.match(self.path.split("?")[0])
+        if not match:
+            self.send_error(404)
+            return
+
+        body = landing_page_html(int(match[1]), int(match[2])).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class FixtureSite:
+    """HTTP server on a free local port running in a background thread.
+
+    Usage:
+        with FixtureSite() as site:
+            app = site.app(page, courses=50, filler=1000)
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), _FixtureSiteHandler)
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fixture-site", daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def base_url(self, courses: int, filler: int) -> str:
+        return f"{self.url}/courses-{courses}-filler-{filler}"
+
+    def app(self, page, courses: int, filler: int) -> UltimateQa:
+        """UltimateQa application pointed to the page variant of this site"""
+        base_url = self.base_url(courses, filler)
+
+        class FixtureSiteApp(UltimateQa):
+            @property
+            def base_url(self) -> str:
+                return base_url
+
+        return FixtureSiteApp(page)
+
+    def start(self) -> "FixtureSite":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self) -> "FixtureSite":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
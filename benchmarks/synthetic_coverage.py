@@ -0,0 +1,180 @@
+"""Generator of realistic used_locators worker data.
+
+Every worker covers the same pages and xpaths with a different random set of tests,
+so merged files have both overlapping keys and duplicated allure ids.
+Within a worker the tests of an xpath are distinct, as in files dumped by UsedLocatorsStore.
+
+Usage:
+    python -m benchmarks.synthetic_coverage --output-dir ui_coverage --workers 8 \\
+        --pages 100 --xpaths-per-page 125 --tests-per-xpath 10
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+
+def page_url(page: int) -> str:
+    """Page numbers are spelled with letters (0 -> 'a', 26 -> 'ba'),
+    so the URL normalizer does not merge the pages into one template.
+    """
+    name = ""
+    while True:
+        page, letter = divmod(page, 26)
+        name = chr(ord("a") + letter) + name
+        if not page:
+            break
+    return f"https://example.com/section-{name}/page"
+
+
+def generate_page_data(
+    worker: int,
+    page: int,
+    xpaths_per_page: int,
+    tests_per_xpath: int,
+    tests: int,
+    seed: int = 0,
+) -> Dict[str, List[dict]]:
+    """Build {xpath: [records]} of one page recorded by one xdist worker."""
+    rnd = random.Random(seed * 1_000_000_000 + worker * 1_000_000 + page)
+    url = page_url(page)
+    xpaths = {}
+    for xpath in range(xpaths_per_page):
+        block = f"//div[@id='block-{xpath % 10}']"
+        xpaths[f"{block}//span[@data-id='{xpath}']"] = [
+            {
+                "allure_id": str(test),
+                "is_block": xpath % 10 == 0,
+                "test_name": f"Check feature number {test}",
+                "original_page_url": f"{url}?session={worker}",
+                "outer_xpath": None,
+            }
+            for test in rnd.sample(range(tests), min(tests_per_xpath, tests))
+        ]
+    return xpaths
+
+
+def generate_worker_data(
+    worker: int,
+    pages: int,
+    xpaths_per_page: int,
+    tests_per_xpath: int,
+    tests: int,
+    seed: int = 0,
+) -> Dict[str, Dict[str, List[dict]]]:
+    """Build used_locators data of one xdist worker."""
+    return {
+        page_url(page): generate_page_data(
+            worker, page, xpaths_per_page, tests_per_xpath, tests, seed
+        )
+        for page in range(pages)
+    }
+
+
+def iter_worker_records(
+    worker: int,
+    pages: int,
+    xpaths_per_page: int,
+    tests_per_xpath: int,
+    tests: int,
+    seed: int = 0,
+) -> Iterator[Tuple[str, str, dict]]:
+    """Yield (page_url, xpath, record) of one worker without keeping all pages in memory."""
+    for page in range(pages):
+        url = page_url(page)
+        page_data = generate_page_data(
+            worker, page, xpaths_per_page, tests_per_xpath, tests, seed
+        )
+        for xpath, records in page_data.items():
+            for record in records:
+                yield url, xpath, record
+
+
+def write_worker_file(
+    file_path: Path,
+    worker: int,
+    pages: int,
+    xpaths_per_page: int,
+    tests_per_xpath: int,
+    tests: int = 5000,
+    seed: int = 0,
+    indent: int = 4,
+):
+    """Write one worker file page by page.
+    The output is the same as json.dump(data, file, indent=indent, sort_keys=True),
+    which is how pytest_sessionfinish dumps the store.
+    """
+    urls = sorted((page_url(page), page) for page in range(pages))
+    separator = ",\n" if indent is not None else ", "
+    nested = "\n" + " " * (indent or 0)
+    with open(file_path, "w") as file:
+        file.write("{" if indent is None else "{\n")
+        for i, (url, page) in enumerate(urls):
+            page_data = generate_page_data(
+                worker, page, xpaths_per_page, tests_per_xpath, tests, seed
+            )
+            page_json = json.dumps(page_data, indent=indent, sort_keys=True)
+            if indent is not None:
+                page_json = page_json.replace("\n", nested)
+            file.write(separator if i else "")
+            file.write(f"{' ' * (indent or 0)}{json.dumps(url)}: {page_json}")
+        file.write("}" if indent is None else "\n}")
+
+
+def write_worker_files(
+    directory: Path,
+    workers: int,
+    pages: int,
+    xpaths_per_page: int,
+    tests_per_xpath: int,
+    tests: int = 5000,
+    seed: int = 0,
+    indent: int = 4,
+) -> List[Path]:
+    """Write used_locators_gw<N>.json files the same way pytest_sessionfinish does."""
+    directory.mkdir(parents=True, exist_ok=True)
+    file_paths = []
+    for worker in range(workers):
+        file_path = directory / f"used_locators_gw{worker}.json"
+        write_worker_file(
+            file_path,
+            worker,
+            pages,
+            xpaths_per_page,
+            tests_per_xpath,
+            tests,
+            seed,
+            indent,
+        )
+        file_paths.append(file_path)
+    return file_paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output-dir", type=Path, default=Path("ui_coverage"))
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--xpaths-per-page", type=int, default=50)
+    parser.add_argument("--tests-per-xpath", type=int, default=10)
+    parser.add_argument("--tests", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    file_paths = write_worker_files(
+        args.output_dir,
+        args.workers,
+        args.pages,
+        args.xpaths_per_page,
+        args.tests_per_xpath,
+        args.tests,
+        args.seed,
+    )
+    records = args.workers * args.pages * args.xpaths_per_page * args.tests_per_xpath
+    print(f"{records} records written to {len(file_paths)} files in {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
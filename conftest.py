@@ -1,33 +1,131 @@
-import json
 import os
 from pathlib import Path
-from typing import Dict, List
 
+import pytest
 import rootpath
 
+from core.environment_variables_setup import (
+    UI_COVERAGE_COMPRESSION,
+    UI_COVERAGE_FORMAT,
+    UI_LATENCY_ENABLED,
+)
+from utils.har_archive import har_archives
+from utils.reporting.coverage_columnar import SUFFIX as COLUMNAR_SUFFIX
+from utils.reporting.coverage_journal import (
+    CoverageJournal,
+    journal_path,
+    start_session,
+)
+from utils.reporting.coverage_store import used_locators
+from utils.reporting.latency import (
+    attach_latency_report,
+    find_latency_files,
+    latency_file_path,
+    latency_recorder,
+    write_latency_report,
+)
+from utils.reporting.test_context import clear_current_test, set_current_test
+from utils.request_filter import request_filter
+
 pytest_plugins = [
     "utils.fixtures.driver",
     "utils.fixtures.applications",
+    "utils.plugins.duration_scheduler",
+    "utils.plugins.impact_selection",
+    "utils.plugins.adaptive_timeouts",
 ]
 
 # pylint: disable=unused-argument
-used_locators: Dict[str, List[str]] = {}
 directory = rootpath.detect() / Path("ui_coverage")
+latency_directory = rootpath.detect() / Path("ui_latency")
+# modules whose tests only read the pages: they share a loaded page (see the 'readonly' marker)
+READONLY_TEST_MODULES = ("tests/test_landing_page.py",)
+
+
+def get_worker_id() -> str:
+    """xdist worker id (e.g. 'gw0') or 'master' if the tests are run without xdist."""
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
 
 
 def pytest_sessionstart(session):
-    """Create the directory for storing used locators at the start of the session."""
+    """Create the directory for storing used locators at the start of the session.
+    All newly recorded locators are also written to the worker journal,
+    so the coverage is not lost if the worker crashes.
+    """
     os.makedirs(directory, exist_ok=True)
+    if get_worker_id() == "master":
+        # the controller starts before the workers: they inherit the session id
+        start_session(directory)
+        if har_archives.enabled:
+            har_archives.start_session()
+    if UI_LATENCY_ENABLED:
+        os.makedirs(latency_directory, exist_ok=True)
+        if get_worker_id() == "master":
+            # the controller starts before the workers: drop the files of the previous run
+            for filepath in find_latency_files(latency_directory):
+                filepath.unlink()
+
+    used_locators.journal = CoverageJournal(journal_path(directory, get_worker_id()))
+
+
+def pytest_collection_modifyitems(config, items):
+    readonly_paths = {config.rootpath / x for x in READONLY_TEST_MODULES}
+    for item in items:
+        if item.path in readonly_paths:
+            item.add_marker(pytest.mark.readonly)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """Resolve the allure_id and title of the test once, before its fixtures run.
+    Every locator recorded until the test is torn down is attributed to it.
+    """
+    set_current_test(item)
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_call(item):
+    set_current_test(item)
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_runtest_teardown(item, nextitem):
+    clear_current_test()
 
 
 def pytest_sessionfinish(session, exitstatus):
-    """This hook is used to create used_locators JSON files for each xdist worker.
-    All locators used in tests are stored in used_locators dictionary.
-    After the test session is finished (for each thread), its dictionary is dumped to a JSON file.
+    """This hook is used to create used_locators JSON files for each xdist worker
+    (or used_locators_master.json if tests are run without xdist).
+    All locators used in tests are stored in the used_locators store.
+    After the test session is finished (for each thread), the store is dumped to a JSON file
+    (or a .uicov file with UI_COVERAGE_FORMAT=uicov) and the journal is removed.
     """
-    worker_id = os.environ.get("PYTEST_XDIST_WORKER", None)
-    filepath = directory / f"used_locators_{worker_id}.json"
+    columnar = UI_COVERAGE_FORMAT == "uicov"
+    suffix = COLUMNAR_SUFFIX if columnar else ".json"
+    filepath = directory / f"used_locators_{get_worker_id()}{suffix}"
+
+    journal, used_locators.journal = used_locators.journal, None
+    if journal:
+        journal.close()
+
+    if used_locators and columnar:
+        used_locators.dump_columnar(filepath, UI_COVERAGE_COMPRESSION)
+    elif used_locators:
+        used_locators.dump(filepath)
+
+    if journal:
+        journal.remove()
+
+    request_filter.save_baseline(get_worker_id())
+
+    if har_archives.enabled and get_worker_id() == "master":
+        # the HAR parts recorded by all workers
+        har_archives.merge_recordings()
 
-    if used_locators and worker_id:
-        with open(filepath, "w") as file:
-            json.dump(used_locators, file, indent=4, sort_keys=True)
+    if UI_LATENCY_ENABLED:
+        if latency_recorder:
+            latency_recorder.dump(latency_file_path(latency_directory, get_worker_id()))
+        if get_worker_id() == "master":
+            # the controller finishes after all workers (or it is the only process)
+            if write_latency_report(latency_directory):
+                attach_latency_report(latency_directory)
@@ -8,6 +8,72 @@ env = Env()
 # Project settings
 ENVIRONMENT_NAME = env.str("ENVIRONMENT", default="stage_local")
 
+# Browser settings
+BROWSER_HEADLESS = env.bool("BROWSER_HEADLESS", default=False)
+# Empty channel runs the Chromium bundled with Playwright
+BROWSER_CHANNEL = env.str("BROWSER_CHANNEL", default="chrome") or None
+# Restart the worker browser after this number of tests (0 - never)
+BROWSER_RESTART_AFTER_TESTS = env.int("BROWSER_RESTART_AFTER_TESTS", default=0)
+# Number of pages of each application prepared in the background for the next tests
+BROWSER_WARM_CONTEXTS = env.int("BROWSER_WARM_CONTEXTS", default=1)
+
+# HAR record/replay of the page traffic (see utils/har_archive.py):
+# off, record, replay (no network) or refresh (re-record missing and stale archives)
+HAR_MODE = env.str("HAR_MODE", default="off")
+HAR_DIRECTORY = env.str("HAR_DIRECTORY", default=f"{rootpath.detect()}/har")
+# Archives older than this are re-recorded in the refresh mode (0 - never stale)
+HAR_MAX_AGE_HOURS = env.float("HAR_MAX_AGE_HOURS", default=168)
+
+# Request policies of the applications (see BaseApp.request_policy and utils/request_filter.py):
+# off, block (apply the policies) or baseline (measure the pages the savings are compared with)
+REQUEST_POLICY_MODE = env.str("REQUEST_POLICY_MODE", default="off")
+REQUEST_POLICY_BASELINE_DIRECTORY = env.str(
+    "REQUEST_POLICY_BASELINE_DIRECTORY", default=f"{rootpath.detect()}/request_policy"
+)
+
+# Order the tests across xdist workers by their historical durations (--dist=loadgroup)
+DURATION_SCHEDULER_ENABLED = env.bool("DURATION_SCHEDULER_ENABLED", default=True)
+TEST_DURATIONS_FILE = env.str(
+    "TEST_DURATIONS_FILE", default=f"{rootpath.detect()}/.test_durations.json"
+)
+TEST_DURATIONS_REPORT_FILE = env.str(
+    "TEST_DURATIONS_REPORT_FILE",
+    default=f"{rootpath.detect()}/test_durations_report.json",
+)
+
+# UI coverage settings
+# The journal is flushed to disk when any of the thresholds is reached
+UI_COVERAGE_JOURNAL_FLUSH_RECORDS = env.int(
+    "UI_COVERAGE_JOURNAL_FLUSH_RECORDS", default=500
+)
+UI_COVERAGE_JOURNAL_FLUSH_SECONDS = env.float(
+    "UI_COVERAGE_JOURNAL_FLUSH_SECONDS", default=2.0
+)
+# Format of the worker files: "json" or "uicov" (compressed columnar, see coverage_columnar.py)
+UI_COVERAGE_FORMAT = env.str("UI_COVERAGE_FORMAT", default="json")
+# Compression of the .uicov files: "zstd" (requires zstandard) or "gzip".
+# Defaults to zstd if zstandard is installed
+UI_COVERAGE_COMPRESSION = env.str("UI_COVERAGE_COMPRESSION", default="") or None
+
+# Record latency histograms of element lookups, waits and interactions
+# (see utils/reporting/latency.py). Has no overhead when disabled.
+UI_LATENCY_ENABLED = env.bool("UI_LATENCY_ENABLED", default=False)
+
+# Adaptive timeouts of element waits (see utils/reporting/adaptive_timeouts.py):
+# learned from the wait durations of previous runs per (normalized page URL, xpath)
+# as percentile * factor + margin, never longer than the timeout passed to the wait
+ADAPTIVE_TIMEOUTS_ENABLED = env.bool("ADAPTIVE_TIMEOUTS_ENABLED", default=False)
+ADAPTIVE_TIMEOUTS_DIRECTORY = env.str(
+    "ADAPTIVE_TIMEOUTS_DIRECTORY", default=f"{rootpath.detect()}/wait_durations"
+)
+ADAPTIVE_TIMEOUT_PERCENTILE = env.float("ADAPTIVE_TIMEOUT_PERCENTILE", default=99)
+ADAPTIVE_TIMEOUT_FACTOR = env.float("ADAPTIVE_TIMEOUT_FACTOR", default=2.0)
+ADAPTIVE_TIMEOUT_MARGIN_MS = env.float("ADAPTIVE_TIMEOUT_MARGIN_MS", default=2000)
+# Waits of locators with fewer recorded durations keep the fixed timeouts
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = env.int("ADAPTIVE_TIMEOUT_MIN_SAMPLES", default=20)
+# Older durations are halved once a locator has more, so the history follows the app
+ADAPTIVE_TIMEOUT_MAX_SAMPLES = env.int("ADAPTIVE_TIMEOUT_MAX_SAMPLES", default=1000)
+
 
 # Timeouts
 LONG_TIMEOUT = 60000
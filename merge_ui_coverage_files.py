@@ -1,43 +1,162 @@
+import argparse
 import json
 import os
 from pathlib import Path
 
 import rootpath
 
+from utils.reporting.coverage_columnar import SUFFIX as COLUMNAR_SUFFIX
+from utils.reporting.coverage_incremental import IncrementalMerger
+from utils.reporting.coverage_journal import compact_journals
+from utils.reporting.coverage_merge import (
+    OUTPUT_FILENAME,
+    find_coverage_files,
+    merge_coverage_files,
+    write_coverage_file,
+)
+from utils.reporting.coverage_reduce import (
+    DEFAULT_PARTITIONS,
+    is_archive,
+    reduce_coverage,
+)
 
-def merge_ui_coverage_json_files(input_dir_path, output_dir_path):
-    merged_data = {}
-    for filename in os.listdir(input_dir_path):
-        if filename.endswith(".json"):
-            file_path = os.path.join(input_dir_path, filename)
-            with open(file_path, "r") as file:
-                data = json.load(file)
-                for url, xpaths_dict in data.items():
-                    if url in merged_data:
-                        # Merge XPath keys and their corresponding lists of dictionaries
-                        for xpath, test_cases in xpaths_dict.items():
-                            if xpath in merged_data[url]:
-                                merged_data[url][xpath].extend(test_cases)
-                            else:
-                                merged_data[url][xpath] = test_cases
-                    else:
-                        merged_data[url] = xpaths_dict
-
-    # remove duplicates allure_id
-    # pylint: disable=consider-using-dict-items
-    for url in merged_data:
-        for xpath in merged_data[url]:
-            merged_data[url][xpath] = [
-                item
-                for i, item in enumerate(merged_data[url][xpath])
-                if item["allure_id"]
-                not in {x["allure_id"] for x in merged_data[url][xpath][:i]}
-            ]
+
+def _output_file_path(output_dir_path, output_format: str) -> str:
+    filename = OUTPUT_FILENAME
+    if output_format == "uicov":
+        filename = Path(OUTPUT_FILENAME).with_suffix(COLUMNAR_SUFFIX).name
+    return os.path.join(output_dir_path, filename)
+
+
+def merge_ui_coverage_json_files(
+    input_dir_path,
+    output_dir_path,
+    indent: int = None,
+    workers: int = 1,
+    output_format: str = "json",
+    incremental: bool = False,
+):
+    """Merge the worker files of the input directory into used_locators.json.
+    With incremental=True only new and changed files are read (see coverage_incremental.py)
+    and the merge summary is returned.
+    """
+    # restore coverage of workers that crashed before writing their JSON file
+    compact_journals(input_dir_path)
+
+    output_file_path = _output_file_path(output_dir_path, output_format)
+    file_paths = find_coverage_files(input_dir_path, exclude=output_file_path)
+
+    if incremental:
+        merger = IncrementalMerger(output_dir_path)
+        summary = merger.update(file_paths)
+        if merger.modified or not os.path.exists(output_file_path):
+            write_coverage_file(merger.pages(), output_file_path, indent=indent)
+        # saved after the aggregate, so a failed write is redone by the next run
+        merger.save()
+        return summary
+
+    merged_data = merge_coverage_files(file_paths, workers=workers)
 
     # Write the merged data to a new JSON file
-    output_file_path = os.path.join(output_dir_path, "used_locators.json")
-    with open(output_file_path, "w") as output_file:
-        json.dump(merged_data, output_file, indent=4)
+    write_coverage_file(merged_data, output_file_path, indent=indent)
+    return None
+
+
+def reduce_ui_coverage_sources(
+    sources,
+    output_dir_path,
+    indent: int = None,
+    workers: int = 1,
+    output_format: str = "json",
+    partitions: int = DEFAULT_PARTITIONS,
+) -> dict:
+    """Merge the input directories and archives of many machines
+    with partitioned map/reduce (see coverage_reduce.py)."""
+    output_file_path = _output_file_path(output_dir_path, output_format)
+    return reduce_coverage(
+        sources, output_file_path, workers=workers, partitions=partitions, indent=indent
+    )
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Merge used_locators JSON files of all xdist workers"
+    )
+    parser.add_argument(
+        "--input-dir",
+        nargs="+",
+        default=[rootpath.detect() / Path("ui_coverage")],
+        help="Directory with used_locators_<worker>.json (or .uicov) files. "
+        "Several directories or .zip/.tar.gz archives (one per CI machine) "
+        "are merged with partitioned map/reduce",
+    )
+    parser.add_argument(
+        "--output-dir",
+        default=rootpath.detect(),
+        help=f"Directory to write {OUTPUT_FILENAME} to",
+    )
+    parser.add_argument(
+        "--indent",
+        type=int,
+        default=None,
+        help="Indent the output JSON (e.g. 4). Compact JSON is written by default",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes used to parse worker files (e.g. the number of CPUs "
+        "for many big files)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("json", "uicov"),
+        default="json",
+        help="Write the ui-coverage plugin JSON or the compressed columnar .uicov file",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Fold in only new and changed files using the manifest in the output directory",
+    )
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        default=None,
+        help="Number of page URL partitions of the map/reduce merge "
+        f"(default {DEFAULT_PARTITIONS}), enables it for a single input directory",
+    )
+    args = parser.parse_args()
+    args.reduce = (
+        len(args.input_dir) > 1
+        or any(is_archive(x) for x in args.input_dir)
+        or args.partitions is not None
+    )
+    if args.reduce and args.incremental:
+        parser.error("--incremental merges a single input directory")
+    return args
 
 
-merge_ui_coverage_json_files(rootpath.detect() / Path("ui_coverage"), rootpath.detect())
+if __name__ == "__main__":
+    args = parse_arguments()
+    if args.reduce:
+        merge_summary = reduce_ui_coverage_sources(
+            args.input_dir,
+            args.output_dir,
+            indent=args.indent,
+            workers=args.workers,
+            output_format=args.format,
+            partitions=args.partitions or DEFAULT_PARTITIONS,
+        )
+    else:
+        merge_summary = merge_ui_coverage_json_files(
+            args.input_dir[0],
+            args.output_dir,
+            indent=args.indent,
+            workers=args.workers,
+            output_format=args.format,
+            incremental=args.incremental,
+        )
+        merge_summary = merge_summary and merge_summary.as_dict()
+    if merge_summary:
+        print(json.dumps(merge_summary))
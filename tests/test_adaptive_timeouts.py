@@ -0,0 +1,49 @@
+import random
+
+from utils.reporting.adaptive_timeouts import AdaptiveTimeouts
+from utils.reporting.latency import LatencyHistogram
+
+KEY = ("https://ultimateqa.com/", "//a")
+
+
+def _waits() -> LatencyHistogram:
+    """985 fast waits and 15 rare slow ones"""
+    random.seed(0)
+    histogram = LatencyHistogram()
+    for _ in range(985):
+        histogram.add(random.uniform(90, 110))
+    for _ in range(15):
+        histogram.add(random.uniform(3000, 9000))
+    return histogram
+
+
+def test_decay_keeps_slow_waits():
+    histogram = _waits()
+    p99 = histogram.percentile(99)
+
+    histogram.decay()
+
+    assert histogram.percentile(99) >= p99
+    assert histogram.count == sum(histogram.buckets.values())
+
+
+def test_merge_history_does_not_lower_learned_timeout():
+    timeouts = AdaptiveTimeouts(
+        percentile=99, factor=1.0, margin_ms=0, min_samples=20, max_samples=1000
+    )
+    timeouts.merge_history({KEY: _waits()})
+    learned = timeouts.learned_timeout(KEY)
+
+    timeouts.merge_history({KEY: _waits()})
+
+    assert timeouts.history[KEY].count <= 1000 + 15
+    assert timeouts.learned_timeout(KEY) >= learned
+
+
+def test_merge_history_of_a_run_bigger_than_max_samples():
+    timeouts = AdaptiveTimeouts(min_samples=20, max_samples=100)
+    timeouts.merge_history({KEY: _waits()})
+
+    timeouts.merge_history({KEY: _waits()})
+
+    assert timeouts.history[KEY].count > 1000
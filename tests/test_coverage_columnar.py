@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from utils.reporting import coverage_columnar
+from utils.reporting.coverage_columnar import (
+    GZIP,
+    NONE,
+    ZSTD,
+    ColumnarReader,
+    ColumnarWriter,
+    export_json,
+)
+
+RECORDS = [
+    ("https://a.com/", "//div", "1", "First", True, "https://a.com/?x=1", None),
+    ("https://a.com/", "//div//a", "1", "First", False, "https://a.com/", None),
+    ("https://a.com/", "//div//a", None, "No id", False, "https://a.com/", "//nav"),
+    ("https://b.com/", "//h1", "2", "Second", False, "https://b.com/", None),
+    ("https://b.com/", "//h1", "3", "Third", False, "https://b.com/", None),
+]
+
+CODECS = [
+    NONE,
+    GZIP,
+    pytest.param(
+        ZSTD,
+        marks=pytest.mark.skipif(
+            coverage_columnar.zstandard is None, reason="zstandard is not installed"
+        ),
+    ),
+]
+
+
+def _write(path, records, compression=GZIP, block_records=2):
+    with ColumnarWriter(path, compression, block_records=block_records) as writer:
+        for record in records:
+            writer.add(*record)
+    return ColumnarReader(path)
+
+
+@pytest.mark.parametrize("compression", CODECS)
+def test_round_trip(tmp_path, compression):
+    reader = _write(tmp_path / "gw0.uicov", RECORDS, compression)
+
+    assert reader.compression == compression
+    assert len(reader) == len(RECORDS)
+    assert len(reader.blocks) == 3
+    assert list(reader) == RECORDS
+
+
+def test_pages_in_the_plugin_json_structure(tmp_path):
+    reader = _write(tmp_path / "gw0.uicov", RECORDS)
+
+    pages = dict(reader.iter_pages())
+
+    assert reader.grouped
+    assert list(pages) == ["https://a.com/", "https://b.com/"]
+    assert pages["https://a.com/"]["//div//a"][1] == {
+        "allure_id": None,
+        "is_block": False,
+        "test_name": "No id",
+        "original_page_url": "https://a.com/",
+        "outer_xpath": "//nav",
+    }
+    assert reader.to_dict() == pages
+
+
+def test_non_contiguous_pages_are_yielded_once(tmp_path):
+    records = [RECORDS[0], RECORDS[3], RECORDS[1], RECORDS[4], RECORDS[2]]
+    reader = _write(tmp_path / "gw0.uicov", records)
+
+    pages = list(reader.iter_pages())
+
+    assert not reader.grouped
+    assert [x for x, _ in pages] == ["https://a.com/", "https://b.com/"]
+    assert dict(pages) == _write(tmp_path / "grouped.uicov", RECORDS).to_dict()
+
+
+def test_empty_file(tmp_path):
+    reader = _write(tmp_path / "gw0.uicov", [])
+
+    assert len(reader) == 0
+    assert not list(reader.iter_pages())
+
+
+def test_export_json(tmp_path):
+    _write(tmp_path / "gw0.uicov", RECORDS)
+
+    export_json(tmp_path / "gw0.uicov", tmp_path / "gw0.json")
+
+    pages = json.loads((tmp_path / "gw0.json").read_text())
+    assert pages == ColumnarReader(tmp_path / "gw0.uicov").to_dict()
+
+
+def test_invalid_files(tmp_path):
+    path = tmp_path / "gw0.uicov"
+    path.write_text("{}")
+    with pytest.raises(ValueError):
+        ColumnarReader(path)
+    with pytest.raises(ValueError):
+        ColumnarWriter(tmp_path / "gw1.uicov", "lz4")
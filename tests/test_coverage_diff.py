@@ -0,0 +1,160 @@
+import json
+
+import pytest
+
+from utils.reporting.coverage_diff import (
+    DiffSummary,
+    diff_coverage,
+    exceeded_limits,
+    load_locator_tests,
+)
+
+A = "https://a.com/"
+
+
+def _record(allure_id, test_name):
+    return {
+        "allure_id": allure_id,
+        "test_name": test_name,
+        "is_block": False,
+        "original_page_url": A,
+        "outer_xpath": None,
+    }
+
+
+BASELINE = {
+    A: {
+        "//kept": [_record("1", "First")],
+        "//removed": [_record("1", "First"), _record("2", "Second")],
+        "//changed": [_record("1", "First"), _record(None, "No id")],
+    }
+}
+CURRENT = {
+    A: {
+        "//kept": [_record("1", "First")],
+        "//changed": [_record("1", "First"), _record("3", "Third")],
+        "//added": [_record("3", "Third")],
+    }
+}
+
+
+def _write(path, data):
+    path.write_text(json.dumps(data))
+    return path
+
+
+def _write_pages(path, pages):
+    """A file that was not merged, the page of every (page_url, xpaths) is repeated"""
+    body = ",".join(f"{json.dumps(url)}:{json.dumps(xpaths)}" for url, xpaths in pages)
+    path.write_text("{" + body + "}")
+    return path
+
+
+def _pad(path):
+    """Make the file the bigger one, which is streamed while the other one is loaded"""
+    path.write_text(path.read_text() + " " * 1000)
+
+
+@pytest.fixture(params=["baseline", "current"])
+def files(request, tmp_path):
+    paths = {
+        "baseline": _write(tmp_path / "baseline.json", BASELINE),
+        "current": _write(tmp_path / "current.json", CURRENT),
+    }
+    _pad(paths[request.param])
+    return paths["baseline"], paths["current"]
+
+
+def test_diff(files):
+    diff = diff_coverage(*files)
+
+    assert diff.summary == DiffSummary(
+        removed=1, added=1, changed=1, unchanged=1, lost_tests=3
+    )
+    assert diff.removed == [
+        {
+            "page_url": A,
+            "xpath": "//removed",
+            "tests": [
+                {"allure_id": "1", "test_name": "First"},
+                {"allure_id": "2", "test_name": "Second"},
+            ],
+        }
+    ]
+    assert diff.added == [
+        {
+            "page_url": A,
+            "xpath": "//added",
+            "tests": [{"allure_id": "3", "test_name": "Third"}],
+        }
+    ]
+    assert diff.changed == [
+        {
+            "page_url": A,
+            "xpath": "//changed",
+            "lost_tests": [{"allure_id": None, "test_name": "No id"}],
+            "new_tests": [{"allure_id": "3", "test_name": "Third"}],
+        }
+    ]
+
+
+def test_same_files(tmp_path):
+    baseline = _write(tmp_path / "baseline.json", BASELINE)
+    current = _write(tmp_path / "current.json", BASELINE)
+
+    diff = diff_coverage(baseline, current)
+
+    assert diff.summary == DiffSummary(unchanged=3)
+
+
+def test_repeated_locators_are_unioned(tmp_path):
+    path = _write_pages(
+        tmp_path / "used_locators.json",
+        [
+            (A, {"//a": [_record("1", "First")]}),
+            ("https://b.com/", {"//b": [_record("2", "Second")]}),
+            (A, {"//a": [_record("2", "Second")]}),
+        ],
+    )
+
+    assert load_locator_tests(path) == {
+        (A, "//a"): {("1", "First"), ("2", "Second")},
+        ("https://b.com/", "//b"): {("2", "Second")},
+    }
+
+
+@pytest.mark.parametrize("bigger", ["baseline", "current"])
+@pytest.mark.parametrize("concatenated", ["baseline", "current"])
+def test_diff_of_concatenated_file(tmp_path, concatenated, bigger):
+    """Both the loaded and the streamed side may repeat locators"""
+    pages = [
+        (A, {"//a": [_record("1", "First")]}),
+        ("https://b.com/", {"//b": [_record("2", "Second")]}),
+        (A, {"//a": [_record("2", "Second")]}),
+    ]
+    merged = {
+        A: {"//a": [_record("1", "First"), _record("2", "Second")]},
+        "https://b.com/": {"//b": [_record("2", "Second")]},
+    }
+    paths = {
+        "baseline": tmp_path / "baseline.json",
+        "current": tmp_path / "current.json",
+    }
+    for name, path in paths.items():
+        if name == concatenated:
+            _write_pages(path, pages)
+        else:
+            _write(path, merged)
+    _pad(paths[bigger])
+
+    diff = diff_coverage(paths["baseline"], paths["current"])
+
+    assert diff.summary == DiffSummary(unchanged=2)
+
+
+def test_exceeded_limits():
+    summary = DiffSummary(removed=2, lost_tests=5)
+
+    assert exceeded_limits(summary) == []
+    assert exceeded_limits(summary, max_removed=2, max_lost_tests=5) == []
+    assert len(exceeded_limits(summary, max_removed=1, max_lost_tests=4)) == 2
@@ -0,0 +1,107 @@
+import json
+import os
+
+from benchmarks.synthetic_coverage import generate_worker_data
+from utils.reporting.coverage_incremental import IncrementalMerger
+from utils.reporting.coverage_merge import merge_coverage_files
+
+
+def _write(path, pages):
+    path.write_text(json.dumps(pages))
+    return path
+
+
+def _record(allure_id, test_name="Test"):
+    return {
+        "allure_id": allure_id,
+        "is_block": False,
+        "test_name": test_name,
+        "original_page_url": "https://a.com/",
+        "outer_xpath": None,
+    }
+
+
+def _records(pages):
+    """The records of the pages, the incremental merge does not keep their order"""
+    return {
+        (page_url, xpath, x["allure_id"], x["test_name"], x["original_page_url"])
+        for page_url, xpaths in pages.items()
+        for xpath, records in xpaths.items()
+        for x in records
+    }
+
+
+def _update(state_dir, paths):
+    merger = IncrementalMerger(state_dir)
+    summary = merger.update(paths)
+    merger.save()
+    return merger, summary
+
+
+def test_equals_full_merge_after_every_update(tmp_path):
+    inputs = tmp_path / "inputs"
+    inputs.mkdir()
+    paths = [
+        _write(
+            inputs / f"used_locators_gw{x}.json", generate_worker_data(x, 3, 4, 2, 6)
+        )
+        for x in range(3)
+    ]
+    state_dir = tmp_path / "state"
+
+    merger, summary = _update(state_dir, paths)
+    assert summary.added == [x.name for x in paths]
+    assert _records(merger.pages()) == _records(merge_coverage_files(paths))
+
+    # replaced worker file: its old records are retracted
+    _write(paths[0], generate_worker_data(0, 2, 4, 2, 6, seed=1))
+    merger, summary = _update(state_dir, paths)
+    assert summary.changed == [paths[0].name]
+    assert summary.unchanged == 2
+    assert _records(merger.pages()) == _records(merge_coverage_files(paths))
+
+    # removed worker file
+    merger, summary = _update(state_dir, paths[1:])
+    assert summary.removed == [paths[0].name]
+    assert _records(merger.pages()) == _records(merge_coverage_files(paths[1:]))
+    assert summary.records == len(merger)
+
+
+def test_retracted_record_is_replaced_by_the_next_input(tmp_path):
+    first = _write(
+        tmp_path / "used_locators_gw0.json",
+        {"https://a.com/": {"//a": [_record("1", "From gw0"), _record("2")]}},
+    )
+    second = _write(
+        tmp_path / "used_locators_gw1.json",
+        {"https://a.com/": {"//a": [_record("1", "From gw1")]}},
+    )
+    state_dir = tmp_path / "state"
+    merger, _ = _update(state_dir, [first, second])
+    assert merger.pages()["https://a.com/"]["//a"][0]["test_name"] == "From gw0"
+
+    _write(first, {"https://a.com/": {"//h1": [_record("2")]}})
+    merger, _ = _update(state_dir, [first, second])
+
+    assert merger.pages() == {
+        "https://a.com/": {
+            "//a": [_record("1", "From gw1")],
+            "//h1": [_record("2")],
+        }
+    }
+
+
+def test_unchanged_inputs_do_not_load_the_state(tmp_path):
+    path = _write(
+        tmp_path / "used_locators_gw0.json", {"https://a.com/": {"//a": [_record("1")]}}
+    )
+    state_dir = tmp_path / "state"
+    _update(state_dir, [path])
+    # touched, but the content is the same
+    os.utime(path, ns=(0, 0))
+
+    merger = IncrementalMerger(state_dir)
+    summary = merger.update([path])
+
+    assert not merger.modified
+    assert (summary.unchanged, summary.records) == (1, 1)
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from utils.reporting.coverage_journal import (
+    CoverageJournal,
+    compact_journal,
+    compact_journals,
+    journal_path,
+    read_journal,
+    start_session,
+)
+from utils.reporting.coverage_store import UsedLocatorsStore
+
+PAGE = "https://ultimateqa.com/"
+
+
+def _record(store: UsedLocatorsStore, allure_id: str, xpath=("//div", "//a")):
+    store.add(PAGE, xpath, allure_id, f"Test {allure_id}", False, PAGE)
+
+
+def _journal(path, session_id="current") -> CoverageJournal:
+    return CoverageJournal(
+        path, flush_records=2, flush_seconds=60, session_id=session_id
+    )
+
+
+def test_journal_round_trip(tmp_path):
+    store = UsedLocatorsStore()
+    store.journal = _journal(tmp_path / "used_locators_gw0.ndjson")
+    for allure_id in ("1", "2", "3"):
+        _record(store, allure_id)
+    _record(store, "1", xpath="//h1")
+    # duplicates are not journaled
+    _record(store, "1")
+    store.journal.close()
+
+    assert read_journal(store.journal.path).to_dict() == store.to_dict()
+
+
+def test_partially_written_line_is_ignored(tmp_path):
+    store = UsedLocatorsStore()
+    store.journal = _journal(tmp_path / "used_locators_gw0.ndjson")
+    _record(store, "1")
+    store.journal.close()
+    with open(store.journal.path, "a") as file:
+        file.write('["https://ultimateqa.com/", "//a", "2", "Te')
+
+    assert len(read_journal(store.journal.path)) == 1
+
+
+def test_idle_journal_leaves_no_file(tmp_path):
+    journal = _journal(tmp_path / "used_locators_gw0.ndjson")
+    journal.close()
+
+    assert not journal.path.exists()
+
+
+def test_compaction_writes_the_worker_file(tmp_path):
+    store = UsedLocatorsStore()
+    store.journal = _journal(journal_path(tmp_path, "gw0"))
+    _record(store, "1")
+    store.journal.close()
+
+    output_path = compact_journal(store.journal.path)
+
+    assert output_path == tmp_path / "used_locators_gw0.json"
+    assert json.loads(output_path.read_text()) == store.to_dict()
+    assert not store.journal.path.exists()
+
+
+def test_compaction_skips_journals_of_earlier_sessions(tmp_path, monkeypatch):
+    monkeypatch.delenv("UI_COVERAGE_SESSION", raising=False)
+    session_id = start_session(tmp_path)
+    for worker, journal_session_id in (
+        ("gw0", "earlier"),
+        ("gw1", None),
+        ("gw2", session_id),
+    ):
+        store = UsedLocatorsStore()
+        store.journal = _journal(journal_path(tmp_path, worker), journal_session_id)
+        _record(store, worker)
+        store.journal.close()
+
+    with pytest.warns(UserWarning, match="earlier test session"):
+        compacted = compact_journals(tmp_path)
+
+    # journals of unknown sessions (written before the sessions were tracked) are kept
+    assert [x.name for x in compacted] == [
+        "used_locators_gw1.json",
+        "used_locators_gw2.json",
+    ]
+    assert journal_path(tmp_path, "gw0").exists()
@@ -0,0 +1,129 @@
+import io
+import json
+
+import pytest
+
+from benchmarks.synthetic_coverage import generate_worker_data
+from utils.reporting.coverage_merge import (
+    CoverageMerger,
+    find_coverage_files,
+    iter_coverage_pages,
+    merge_coverage_files,
+    read_coverage_pages,
+    write_coverage_file,
+)
+
+
+def baseline_merge(files_data: list) -> dict:
+    """The merge of merge_ui_coverage_files.py before the streaming rewrite"""
+    merged_data = {}
+    for data in files_data:
+        for url, xpaths_dict in data.items():
+            if url in merged_data:
+                for xpath, test_cases in xpaths_dict.items():
+                    if xpath in merged_data[url]:
+                        merged_data[url][xpath].extend(test_cases)
+                    else:
+                        merged_data[url][xpath] = test_cases
+            else:
+                merged_data[url] = xpaths_dict
+    for url in merged_data:
+        for xpath in merged_data[url]:
+            merged_data[url][xpath] = [
+                item
+                for i, item in enumerate(merged_data[url][xpath])
+                if item["allure_id"]
+                not in {x["allure_id"] for x in merged_data[url][xpath][:i]}
+            ]
+    return merged_data
+
+
+@pytest.fixture
+def worker_files(tmp_path):
+    paths = []
+    for worker in range(3):
+        path = tmp_path / f"used_locators_gw{worker}.json"
+        path.write_text(json.dumps(generate_worker_data(worker, 4, 6, 3, 8)))
+        paths.append(path)
+    return paths
+
+
+def _load(paths):
+    return [json.loads(x.read_text()) for x in paths]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_merge_equals_baseline(worker_files, workers):
+    merged = merge_coverage_files(worker_files, workers=workers)
+
+    assert merged == baseline_merge(_load(worker_files))
+    # the order of the records is kept as well
+    assert json.dumps(merged) == json.dumps(baseline_merge(_load(worker_files)))
+
+
+def test_merge_keeps_tests_without_allure_id_apart():
+    merger = CoverageMerger()
+    record = {
+        "allure_id": None,
+        "is_block": False,
+        "original_page_url": "https://a.com/",
+        "outer_xpath": None,
+    }
+    merger.add_page("https://a.com/", {"//a": [{**record, "test_name": "First"}]})
+    merger.add_page(
+        "https://a.com/",
+        {"//a": [{**record, "test_name": "Second"}, {**record, "test_name": "First"}]},
+    )
+
+    assert [x["test_name"] for x in merger.pages["https://a.com/"]["//a"]] == [
+        "First",
+        "Second",
+    ]
+
+
+class _ShortReads(io.StringIO):
+    """Returns at most `size` characters per read, like a slow pipe"""
+
+    def __init__(self, text: str, size: int):
+        super().__init__(text)
+        self.size = size
+
+    def read(self, size=-1):
+        return super().read(self.size)
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 1 << 20])
+def test_iter_coverage_pages_across_chunk_boundaries(read_size):
+    pages = generate_worker_data(0, 3, 2, 2, 4)
+    text = json.dumps(pages, indent=4)
+
+    assert dict(iter_coverage_pages(_ShortReads(text, read_size))) == pages
+
+
+@pytest.mark.parametrize("text", ["[]", '{"a": 1', '{"a" 1}', '{"a": 1 "b": 2}'])
+def test_iter_coverage_pages_rejects_invalid_files(text):
+    with pytest.raises(ValueError):
+        list(iter_coverage_pages(io.StringIO(text)))
+
+
+def test_iter_coverage_pages_of_an_empty_file():
+    assert not list(iter_coverage_pages(io.StringIO(" { } ")))
+
+
+@pytest.mark.parametrize("name", ["used_locators.json", "used_locators.uicov"])
+def test_write_and_read_coverage_file(worker_files, tmp_path, name):
+    merged = merge_coverage_files(worker_files)
+    output = tmp_path / "out" / name
+    output.parent.mkdir()
+
+    write_coverage_file(merged, output)
+
+    assert dict(read_coverage_pages(output)) == merged
+
+
+def test_find_coverage_files_excludes_the_output(worker_files, tmp_path):
+    (tmp_path / "notes.txt").write_text("")
+
+    found = find_coverage_files(tmp_path, exclude=worker_files[0])
+
+    assert found == worker_files[1:]
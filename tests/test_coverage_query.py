@@ -0,0 +1,137 @@
+import os
+
+import pytest
+
+from utils.reporting.coverage_merge import write_coverage_file
+from utils.reporting.coverage_query import INDEX_SUFFIX, CoverageQuery, PageSummary
+
+A, B = "https://a.com/", "https://b.com/"
+OK = "//button[@id='ok']"
+OK_DOUBLE_QUOTES = '//button[@id="ok"]'
+
+RECORDS = [
+    (A, OK, "1", "First", False, A, None),
+    (A, OK, "2", "Second", False, A, None),
+    (A, "//nav", "1", "First", True, A, None),
+    (A, "//nav//a", "1", "First", False, A, "//nav"),
+    (B, OK_DOUBLE_QUOTES, "3", "Third", False, B, None),
+    (B, "//h1", None, "No id", False, B + "?x=1", None),
+    (B, "//h1", None, "Other without id", False, B, None),
+]
+
+
+def _pages(records):
+    pages = {}
+    for page_url, xpath, allure_id, test_name, is_block, original, outer in records:
+        pages.setdefault(page_url, {}).setdefault(xpath, []).append(
+            {
+                "allure_id": allure_id,
+                "test_name": test_name,
+                "is_block": is_block,
+                "original_page_url": original,
+                "outer_xpath": outer,
+            }
+        )
+    return pages
+
+
+@pytest.fixture
+def query():
+    return CoverageQuery(RECORDS)
+
+
+@pytest.fixture(params=["used_locators.json", "used_locators.uicov"])
+def coverage_file(request, tmp_path):
+    path = tmp_path / request.param
+    write_coverage_file(_pages(RECORDS), path)
+    return path
+
+
+def test_find_by_one_column(query):
+    assert list(query.find(page_url=B)) == RECORDS[4:]
+    assert list(query.find(allure_id="1")) == [RECORDS[0], RECORDS[2], RECORDS[3]]
+    assert list(query.find(is_block=True)) == [RECORDS[2]]
+    assert list(query.find(test_name="Missing")) == []
+
+
+def test_find_by_several_columns(query):
+    assert list(query.find(page_url=A, allure_id="1", is_block=False)) == [
+        RECORDS[0],
+        RECORDS[3],
+    ]
+    assert list(query.find(page_url=B, allure_id="1")) == []
+    assert list(query.find()) == RECORDS
+
+
+def test_find_rejects_unknown_filters(query):
+    with pytest.raises(ValueError, match="outer_xpath"):
+        list(query.find(outer_xpath="//nav"))
+
+
+def test_xpath_lookup_matches_differently_written_xpaths(query):
+    expected = [RECORDS[0], RECORDS[1], RECORDS[4]]
+
+    assert list(query.find(xpath=OK)) == expected
+    assert list(query.find(xpath=OK_DOUBLE_QUOTES)) == expected
+    assert list(query.find(xpath="//button[ @id = 'ok' ]")) == expected
+
+
+def test_tests_for_xpath(query):
+    assert query.tests_for_xpath(OK) == [
+        ("1", "First"),
+        ("2", "Second"),
+        ("3", "Third"),
+    ]
+    assert query.tests_for_xpath(OK, page_url=B) == [("3", "Third")]
+    assert query.tests_for_xpath("//h1") == [
+        (None, "No id"),
+        (None, "Other without id"),
+    ]
+
+
+def test_locators_for_test(query):
+    assert query.locators_for_test(allure_id=1) == [
+        (A, OK),
+        (A, "//nav"),
+        (A, "//nav//a"),
+    ]
+    assert query.locators_for_test(test_name="No id") == [(B, "//h1")]
+    with pytest.raises(ValueError):
+        query.locators_for_test()
+
+
+def test_pages(query):
+    assert query.pages() == [
+        PageSummary(A, locators=3, block_locators=1, records=4, tests=2),
+        PageSummary(B, locators=2, block_locators=0, records=3, tests=3),
+    ]
+
+
+def test_from_file(coverage_file):
+    query = CoverageQuery.from_file(coverage_file)
+
+    assert query.records == RECORDS
+    assert len(query) == len(RECORDS)
+
+
+def test_index_sidecar(coverage_file):
+    index_path = coverage_file.with_name(coverage_file.name + INDEX_SUFFIX)
+
+    built = CoverageQuery.load(coverage_file, use_index=True)
+    assert index_path.exists()
+    loaded = CoverageQuery.load(coverage_file, use_index=True)
+
+    assert loaded.records == built.records == RECORDS
+    assert list(loaded.find(xpath=OK_DOUBLE_QUOTES)) == list(built.find(xpath=OK))
+
+
+def test_index_sidecar_is_rebuilt_when_the_file_changes(coverage_file):
+    CoverageQuery.load(coverage_file, use_index=True)
+    write_coverage_file(_pages(RECORDS[:2]), coverage_file)
+    stat = coverage_file.stat()
+    # a rewrite in the same tick must not keep the sidecar either
+    os.utime(coverage_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    query = CoverageQuery.load(coverage_file, use_index=True)
+
+    assert query.records == RECORDS[:2]
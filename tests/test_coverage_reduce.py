@@ -0,0 +1,126 @@
+import json
+import tarfile
+import zipfile
+
+import pytest
+
+from benchmarks.synthetic_coverage import generate_worker_data
+from utils.reporting.coverage_columnar import ColumnarReader
+from utils.reporting.coverage_merge import (
+    find_coverage_files,
+    merge_coverage_files,
+    write_coverage_file,
+)
+from utils.reporting.coverage_reduce import (
+    is_archive,
+    map_source,
+    partition_of,
+    reduce_coverage,
+)
+
+
+def _write_machine(directory, machine, workers=2):
+    """Worker files of one CI machine, overlapping with the other machines"""
+    directory.mkdir()
+    for worker in range(workers):
+        data = generate_worker_data(worker, 5, 4, 2, 6, seed=machine)
+        write_coverage_file(data, directory / f"used_locators_gw{worker}.json")
+    return directory
+
+
+@pytest.fixture
+def machines(tmp_path):
+    return [_write_machine(tmp_path / f"machine{x}", x) for x in range(3)]
+
+
+def _expected(sources):
+    return merge_coverage_files([x for s in sources for x in find_coverage_files(s)])
+
+
+def test_partition_is_stable_and_in_range():
+    urls = [f"https://example.com/page/{x}" for x in range(100)]
+
+    partitions = [partition_of(x, 7) for x in urls]
+
+    assert partitions == [partition_of(x, 7) for x in urls]
+    assert set(partitions) <= set(range(7))
+    assert len(set(partitions)) > 1
+
+
+def test_map_source_puts_every_page_in_one_partition(machines, tmp_path):
+    spill_dir = tmp_path / "spill"
+    for partition in range(4):
+        (spill_dir / f"part{partition:04}").mkdir(parents=True)
+
+    records = map_source(machines[0], 0, spill_dir, 4)
+
+    partitions_of_pages = {}
+    spilled = 0
+    for partition in range(4):
+        for spill_path in (spill_dir / f"part{partition:04}").iterdir():
+            for page_url, xpaths in ColumnarReader(spill_path).iter_pages():
+                partitions_of_pages.setdefault(page_url, set()).add(partition)
+                spilled += sum(len(x) for x in xpaths.values())
+    assert spilled == records
+    assert all(len(x) == 1 for x in partitions_of_pages.values())
+    assert all(
+        partition_of(url, 4) == x.pop() for url, x in partitions_of_pages.items()
+    )
+
+
+@pytest.mark.parametrize("partitions", [1, 3, 16])
+def test_reduce_equals_merge(machines, tmp_path, partitions):
+    output = tmp_path / "used_locators.json"
+
+    stats = reduce_coverage(machines, output, partitions=partitions)
+
+    expected = _expected(machines)
+    assert json.loads(output.read_text()) == expected
+    assert stats["records"] == sum(
+        len(x) for xpaths in expected.values() for x in xpaths.values()
+    )
+    assert stats["input_records"] >= stats["records"]
+
+
+def test_reduce_in_processes(machines, tmp_path):
+    output = tmp_path / "used_locators.json"
+
+    reduce_coverage(machines, output, workers=2, partitions=4, indent=2)
+
+    assert json.loads(output.read_text()) == _expected(machines)
+
+
+def test_reduce_to_columnar(machines, tmp_path):
+    output = tmp_path / "used_locators.uicov"
+
+    reduce_coverage(machines, output, partitions=4)
+
+    assert ColumnarReader(output).to_dict() == _expected(machines)
+
+
+def test_reduce_archives(machines, tmp_path):
+    zip_path = tmp_path / "machine0.zip"
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        for file_path in find_coverage_files(machines[0]):
+            archive.write(file_path, f"results/{file_path.name}")
+    tar_path = tmp_path / "machine1.tar.gz"
+    with tarfile.open(tar_path, "w:gz") as archive:
+        for file_path in find_coverage_files(machines[1]):
+            archive.add(file_path, f"results/{file_path.name}")
+    output = tmp_path / "used_locators.json"
+
+    reduce_coverage([zip_path, tar_path, machines[2]], output, partitions=4)
+
+    assert is_archive(zip_path) and is_archive(tar_path)
+    assert not is_archive(machines[2])
+    assert json.loads(output.read_text()) == _expected(machines)
+
+
+def test_reduce_empty_source(tmp_path):
+    (tmp_path / "empty").mkdir()
+    output = tmp_path / "used_locators.json"
+
+    stats = reduce_coverage([tmp_path / "empty"], output, partitions=4, indent=2)
+
+    assert json.loads(output.read_text()) == {}
+    assert stats == {"input_records": 0, "records": 0}
@@ -0,0 +1,93 @@
+from utils.reporting.coverage_store import UsedLocatorsStore
+
+PAGE = "https://ultimateqa.com/"
+
+
+def _add(store, xpath, allure_id="1", test_name="Test", is_block=False, **kwargs):
+    return store.add(
+        PAGE,
+        xpath,
+        allure_id=allure_id,
+        test_name=test_name,
+        is_block=is_block,
+        original_page_url=f"{PAGE}?utm=1",
+        **kwargs,
+    )
+
+
+def test_same_usage_is_stored_once():
+    store = UsedLocatorsStore()
+
+    assert _add(store, ("//div", "//a"))
+    assert not _add(store, ("//div", "//a"), test_name="Renamed")
+    assert _add(store, ("//div", "//a"), allure_id="2")
+    assert _add(store, ("//div", "//a"), is_block=True)
+    assert _add(store, ("//div", "//a"), outer_xpath="//footer")
+
+    assert len(store) == 4
+
+
+def test_tests_without_allure_id_are_kept_apart():
+    store = UsedLocatorsStore()
+
+    assert _add(store, "//a", allure_id=None, test_name="First")
+    assert _add(store, "//a", allure_id=None, test_name="Second")
+    assert not _add(store, "//a", allure_id=None, test_name="First")
+
+    records = store.to_dict()[PAGE]["//a"]
+    assert [x["test_name"] for x in records] == ["First", "Second"]
+
+
+def test_equivalent_xpaths_are_stored_once_with_the_first_spelling():
+    store = UsedLocatorsStore()
+
+    _add(store, ("//div[contains(@class, 'row')]", '//a[. = "View"]'))
+    assert not _add(store, ("//div[contains(@class,'row')]", "//a[.='View']"))
+    # the same full xpath recorded without the block chain
+    _add(store, "//div[contains(@class,'row')]//a[.='View']", allure_id="2")
+
+    assert store.to_dict() == {
+        PAGE: {
+            "//div[contains(@class, 'row')]//a[. = \"View\"]": [
+                {
+                    "allure_id": x,
+                    "is_block": False,
+                    "test_name": "Test",
+                    "original_page_url": f"{PAGE}?utm=1",
+                    "outer_xpath": None,
+                }
+                for x in ("1", "2")
+            ]
+        }
+    }
+
+
+def test_rollup_of_a_block():
+    store = UsedLocatorsStore()
+    _add(store, ("//div",), is_block=True)
+    _add(store, ("//div", "//a"))
+    _add(store, ("//div", "//a"), allure_id="2", test_name="Other")
+    _add(store, ("//div", "//span"))
+    _add(store, ("//footer", "//a"), allure_id="3")
+
+    rollup = store.rollup(PAGE, ("//div",))
+
+    assert (rollup.locators, rollup.records) == (3, 4)
+    assert rollup.tests == {("1", "Test"), ("2", "Other")}
+    assert store.rollup(PAGE, ("//header",)).locators == 0
+    assert store.rollup("https://other.com/", ("//div",)).locators == 0
+
+
+def test_items_and_clear():
+    store = UsedLocatorsStore()
+    _add(store, ("//div", "//a"))
+    _add(store, "//h1", allure_id="2")
+
+    assert [(x, record.test) for _, x, record in store.items()] == [
+        ("//div//a", ("1", "Test")),
+        ("//h1", ("2", "Test")),
+    ]
+
+    store.clear()
+    assert not store
+    assert store.to_dict() == {}
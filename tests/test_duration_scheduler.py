@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+from utils.plugins.duration_scheduler import (
+    DEFAULT_DURATION,
+    DurationHistory,
+    DurationLoadGroupScheduling,
+    DurationTracker,
+    lpt_partition,
+)
+
+UNITS = {"a": 10.0, "b": 7.0, "c": 5.0, "d": 3.0, "e": 1.0}
+
+
+class _Config:
+    def getvalue(self, name):
+        assert name == "tx"
+        return ["2*popen"]
+
+
+class _Node:
+    def __init__(self, worker):
+        self.gateway = SimpleNamespace(id=worker)
+        self.sent = []
+
+    def send_runtest_some(self, indexes):
+        self.sent.append(indexes)
+
+
+def test_lpt_partition():
+    plan = lpt_partition(UNITS, ["gw0", "gw1"])
+
+    assert plan == {"gw0": ["a", "d"], "gw1": ["b", "c", "e"]}
+
+
+def test_lpt_partition_balances_the_loads():
+    units = {f"unit{x}": float(x % 7 + 1) for x in range(50)}
+
+    plan = lpt_partition(units, ["gw0", "gw1", "gw2"])
+
+    loads = [sum(units[x] for x in scopes) for scopes in plan.values()]
+    assert sorted(x for scopes in plan.values() for x in scopes) == sorted(units)
+    # the LPT bound: no worker is behind by more than the longest unit
+    assert max(loads) - min(loads) <= max(units.values())
+    for scopes in plan.values():
+        durations = [units[x] for x in scopes]
+        assert durations == sorted(durations, reverse=True)
+
+
+def test_lpt_partition_with_more_workers_than_units():
+    plan = lpt_partition({"a": 1.0}, ["gw0", "gw1"])
+
+    assert plan == {"gw0": ["a"], "gw1": []}
+
+
+def test_history_predict(tmp_path):
+    history = DurationHistory(tmp_path / "durations.json")
+    assert history.predict("test_a.py::test_x") == DEFAULT_DURATION
+
+    history.update("test_a.py::test_x[1]", "7", 4.0)
+    history.update("test_a.py::test_x[2]", None, 2.0)
+    history.update("test_b.py::test_y", "8", 10.0)
+    history.update("test_b.py::test_y", "8", 20.0)
+
+    # smoothed duration of the test
+    assert history.predict("test_b.py::test_y") == 15.0
+    # mean of the other parameter sets
+    assert history.predict("test_a.py::test_x[3]") == 3.0
+    # mean of the tests with the allure id
+    assert history.predict("test_c.py::test_z", "7") == 4.0
+    # median of all tests
+    assert history.predict("test_c.py::test_z") == 4.0
+
+
+def test_history_is_saved(tmp_path):
+    history = DurationHistory(tmp_path / "durations.json")
+    history.update("test_a.py::test_x", "7", 4.0)
+    history.save()
+
+    assert DurationHistory(tmp_path / "durations.json").tests == {
+        "test_a.py::test_x": {"allure_id": "7", "duration": 4.0, "runs": 1}
+    }
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    history = DurationHistory(tmp_path / "durations.json")
+    for scope, duration in UNITS.items():
+        history.update(f"test_{scope}.py::test", None, duration)
+    scheduler = DurationLoadGroupScheduling(_Config(), DurationTracker(history))
+    collection = [f"test_{x}.py::test" for x in UNITS]
+    scheduler.workqueue = OrderedDict(
+        (f"test_{x}.py", {f"test_{x}.py::test": False}) for x in UNITS
+    )
+    scheduler.nodes_by_id = {}
+    for worker in ("gw0", "gw1"):
+        node = _Node(worker)
+        scheduler.assigned_work[node] = {}
+        scheduler.registered_collections[node] = collection
+        scheduler.nodes_by_id[worker] = node
+    return scheduler
+
+
+def _assign(scheduler, worker):
+    node = scheduler.nodes_by_id[worker]
+    before = set(scheduler.assigned_work[node])
+    scheduler._assign_work_unit(node)
+    (scope,) = set(scheduler.assigned_work[node]) - before
+    return scope
+
+
+def test_assign_work_unit_follows_the_plan(scheduler):
+    assert _assign(scheduler, "gw0") == "test_a.py"
+    assert _assign(scheduler, "gw1") == "test_b.py"
+    assert _assign(scheduler, "gw1") == "test_c.py"
+    assert _assign(scheduler, "gw0") == "test_d.py"
+    assert _assign(scheduler, "gw1") == "test_e.py"
+
+    assert scheduler.tracker.predicted_loads == {"gw0": 13.0, "gw1": 13.0}
+    assert scheduler.nodes_by_id["gw0"].sent == [[0], [3]]
+    assert not scheduler.workqueue
+
+
+def test_worker_done_with_its_plan_takes_the_longest_unit_left(scheduler):
+    assert _assign(scheduler, "gw0") == "test_a.py"
+    assert _assign(scheduler, "gw0") == "test_d.py"
+    # gw0 is done with its plan, the units planned for gw1 are left
+    assert _assign(scheduler, "gw0") == "test_b.py"
+    # the unit taken by gw0 is skipped in the plan of gw1
+    assert _assign(scheduler, "gw1") == "test_c.py"
+    assert _assign(scheduler, "gw1") == "test_e.py"
+
+
+def test_worker_without_a_plan_takes_the_longest_unit(scheduler):
+    assert _assign(scheduler, "gw0") == "test_a.py"
+    # a worker that replaces a crashed one was not in the plan
+    node = _Node("gw2")
+    scheduler.assigned_work[node] = {}
+    scheduler.registered_collections[node] = scheduler.registered_collections[
+        scheduler.nodes_by_id["gw0"]
+    ]
+    scheduler.nodes_by_id["gw2"] = node
+
+    assert _assign(scheduler, "gw2") == "test_b.py"
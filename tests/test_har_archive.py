@@ -0,0 +1,105 @@
+import json
+import os
+
+import pytest
+
+from utils.har_archive import RECORD, HarArchives
+
+
+class _App:
+    pass
+
+
+def _entry(url, body, method="GET"):
+    return {
+        "pageref": "page@1",
+        "request": {"method": method, "url": url},
+        "response": {"status": 200, "content": {"text": body}},
+    }
+
+
+def _write_part(path, entries, mtime):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(
+            {
+                "log": {
+                    "version": "1.2",
+                    "pages": [{"id": "page@1", "title": "Page"}],
+                    "entries": entries,
+                }
+            }
+        )
+    )
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def archives(tmp_path):
+    return HarArchives(RECORD, tmp_path, worker_id="gw0")
+
+
+def _part(archives, worker, archive_path):
+    """The part the worker records the archive into"""
+    worker_archives = HarArchives(RECORD, archives.directory, worker_id=worker)
+    return worker_archives._part_path(archive_path)
+
+
+def test_parts_of_all_workers_are_merged(archives):
+    path = archives.archive_path(_App, "https://example.com/items/1")
+    _write_part(
+        _part(archives, "gw0", path),
+        [_entry("https://example.com/items/1", "old"), _entry("https://cdn/a.js", "a")],
+        mtime=1000,
+    )
+    _write_part(
+        _part(archives, "gw1", path),
+        [_entry("https://example.com/items/1", "new"), _entry("https://cdn/b.js", "b")],
+        mtime=2000,
+    )
+
+    assert archives.merge_recordings() == 1
+
+    entries = json.loads(path.read_text())["log"]["entries"]
+    bodies = {x["request"]["url"]: x["response"]["content"]["text"] for x in entries}
+    assert bodies == {
+        "https://example.com/items/1": "new",
+        "https://cdn/a.js": "a",
+        "https://cdn/b.js": "b",
+    }
+    assert not archives.recording_directory.exists()
+
+
+def test_parts_of_different_pages_stay_apart(archives):
+    first = archives.archive_path(_App, "https://example.com/a")
+    second = archives.archive_path(_App, "https://example.com/b")
+    _write_part(archives._part_path(first), [_entry("https://x/1", "1")], 1000)
+    _write_part(archives._part_path(second), [_entry("https://x/2", "2")], 1000)
+
+    assert archives.merge_recordings() == 2
+
+    assert len(json.loads(first.read_text())["log"]["entries"]) == 1
+    assert len(json.loads(second.read_text())["log"]["entries"]) == 1
+
+
+def test_requests_with_other_bodies_are_kept(archives):
+    path = archives.archive_path(_App, "https://example.com/search")
+    post = _entry("https://example.com/api", "found", method="POST")
+    other = _entry("https://example.com/api", "not found", method="POST")
+    post["request"]["postData"] = {"text": "q=1"}
+    other["request"]["postData"] = {"text": "q=2"}
+    _write_part(_part(archives, "gw0", path), [post, other], 1000)
+
+    archives.merge_recordings()
+
+    assert len(json.loads(path.read_text())["log"]["entries"]) == 2
+
+
+def test_start_session_drops_the_parts_of_a_crashed_run(archives):
+    path = archives.archive_path(_App, "https://example.com/items/1")
+    _write_part(_part(archives, "gw0", path), [_entry("https://x/1", "1")], 1000)
+
+    archives.start_session()
+
+    assert archives.merge_recordings() == 0
+    assert not path.exists()
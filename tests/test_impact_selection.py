@@ -0,0 +1,131 @@
+import json
+
+from utils.plugins.impact_selection import (
+    CoverageIndex,
+    parse_diff,
+    select_tests,
+    xpath_pattern,
+)
+
+XPATH_DIFF = """\
+diff --git a/ui/pages/landing_page.py b/ui/pages/landing_page.py
+--- a/ui/pages/landing_page.py
++++ b/ui/pages/landing_page.py
+@@ -21,7 +21,7 @@ class LandingPage(BasePage):
+     def is_view_courses_button_visible(self):
+-        return self._is_html_element_displayed("//a[.='View Courses']")
++        return self._is_html_element_displayed("//a[.='All Courses']")
+ 
+"""
+
+WAIT_DIFF = """\
+diff --git a/ui/pages/landing_page.py b/ui/pages/landing_page.py
+--- a/ui/pages/landing_page.py
++++ b/ui/pages/landing_page.py
+@@ -5,3 +5,3 @@ class LandingPage(BasePage):
+     def open(self):
+-        self.page.wait_for_timeout(100)
++        self.page.wait_for_timeout(5000)
+"""
+
+TEST_FILE_DIFF = """\
+diff --git a/tests/test_landing_page.py b/tests/test_landing_page.py
+--- a/tests/test_landing_page.py
++++ b/tests/test_landing_page.py
+@@ -1,1 +1,2 @@
++# a comment
+"""
+
+
+def _coverage_file(tmp_path, pages: dict):
+    file_path = tmp_path / "used_locators.json"
+    file_path.write_text(json.dumps(pages))
+    return file_path
+
+
+def _record(allure_id, test_name):
+    return {
+        "allure_id": allure_id,
+        "is_block": False,
+        "test_name": test_name,
+        "original_page_url": "https://ultimateqa.com/",
+        "outer_xpath": None,
+    }
+
+
+def test_parse_diff_xpaths_of_added_and_removed_lines():
+    impact = parse_diff(XPATH_DIFF)
+
+    assert impact.xpaths == {"//a[.='View Courses']", "//a[.='All Courses']"}
+    assert not impact.full_suite_files
+    assert not impact.test_files
+
+
+def test_parse_diff_page_object_without_xpaths_requires_full_suite():
+    impact = parse_diff(WAIT_DIFF)
+
+    assert impact.full_suite_files == {"ui/pages/landing_page.py"}
+
+
+def test_parse_diff_changed_code_next_to_xpaths_requires_full_suite():
+    diff = XPATH_DIFF + "+        self.page.wait_for_timeout(5000)\n"
+
+    impact = parse_diff(diff)
+
+    assert impact.full_suite_files == {"ui/pages/landing_page.py"}
+
+
+def test_parse_diff_ignores_comments_and_blank_lines():
+    diff = XPATH_DIFF + "+        # the button was renamed\n+\n"
+
+    assert not parse_diff(diff).full_suite_files
+
+
+def test_parse_diff_test_files_and_base_classes():
+    diff = TEST_FILE_DIFF + "diff --git a/ui/base/page.py b/ui/base/page.py\n"
+
+    impact = parse_diff(diff)
+
+    assert impact.test_files == {"tests/test_landing_page.py"}
+    assert impact.full_suite_files == {"ui/base/page.py"}
+
+
+def test_xpath_pattern_matches_recorded_full_xpaths():
+    pattern = xpath_pattern("//a[.='View Courses']")
+
+    assert pattern.search("//div[@class='et_pb_row']//a[.='View Courses']")
+    assert not pattern.search("//a[.='All Courses']")
+
+
+def test_xpath_pattern_placeholders_match_any_text():
+    pattern = xpath_pattern("//h4[.='{course_name}']/..")
+
+    assert pattern.search("//div//h4[.='Python']/..")
+    assert not pattern.search("//div//h3[.='Python']/..")
+
+
+def test_affected_tests(tmp_path):
+    file_path = _coverage_file(
+        tmp_path,
+        {
+            "https://ultimateqa.com/": {
+                "//div[@class='row']//h4[.='Python']/..": [_record("1", "Courses")],
+                "//a[.='View Courses']": [_record("2", "View"), _record(None, "No id")],
+                "//h1": [_record("3", "Title")],
+            }
+        },
+    )
+    index = CoverageIndex.load(file_path)
+
+    assert index.affected_tests(["//h4[.='{course_name}']/.."]) == {("1", "Courses")}
+    assert index.affected_tests(['//a[. = "View Courses"]']) == {
+        ("2", "View"),
+        (None, "No id"),
+    }
+    assert not index.affected_tests(["//h2"])
+
+
+def test_select_tests_runs_all_tests_without_xpaths(tmp_path):
+    file_path = _coverage_file(tmp_path, {})
+
+    assert select_tests(WAIT_DIFF, file_path).tests is None
@@ -0,0 +1,28 @@
+import asyncio
+
+import allure
+
+TOP_COURSES = ["Web Development", "Python", "UX Design", "HTML & CSS"]
+
+
+@allure.id("5")
+@allure.title("Check Top Courses Concurrently")
+def test_top_courses_concurrently(async_ultimate_qa_app, run_async):
+    """Check all expected courses at once using the async page objects"""
+
+    with allure.step("Open the landing page"):
+        run_async(async_ultimate_qa_app.landing_page.open())
+
+    async def get_displayed_courses():
+        top_courses = await async_ultimate_qa_app.landing_page.top_courses()
+        displayed = await asyncio.gather(
+            *(top_courses.is_course_displayed(x) for x in TOP_COURSES)
+        )
+        return dict(zip(TOP_COURSES, displayed))
+
+    with allure.step("Check if all expected courses are in the list"):
+        displayed_courses = run_async(get_displayed_courses())
+        missing_courses = [x for x, shown in displayed_courses.items() if not shown]
+        assert (
+            not missing_courses
+        ), f"Expected courses {missing_courses} are not in the list"
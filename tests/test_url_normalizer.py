@@ -0,0 +1,87 @@
+import pytest
+
+from utils.reporting.url_normalizer import UrlNormalizer
+
+TEMPLATES = [
+    "https://example.com/",
+    "https://example.com/items/{}/details",
+    "https://example.com/items/new",
+    "https://example.com/users/{user_id}",
+]
+
+
+@pytest.fixture
+def normalizer():
+    normalizer = UrlNormalizer()
+    for template in TEMPLATES:
+        normalizer.register(template)
+    return normalizer
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        # page templates
+        ("https://example.com/", "https://example.com"),
+        ("https://example.com", "https://example.com"),
+        ("https://example.com/items/42/details", "https://example.com/items/X/details"),
+        (
+            "https://example.com/items/abc/details",
+            "https://example.com/items/X/details",
+        ),
+        ("https://example.com/items/new", "https://example.com/items/new"),
+        ("https://example.com/users/jane-doe", "https://example.com/users/X"),
+        # query and fragment are dropped
+        (
+            "https://example.com/items/42/details?tab=2#reviews",
+            "https://example.com/items/X/details",
+        ),
+        # templates are matched per host, other hosts fall back to the rules
+        ("https://other.com/items/42/details", "https://other.com/items/X/details"),
+        ("https://other.com/items/abc/details", "https://other.com/items/abc/details"),
+        # segment rules
+        (
+            "https://example.com/orders/3f2b8c1e-8a4d-4c1e-9b7a-2d6f1e0c9a11",
+            "https://example.com/orders/X",
+        ),
+        ("https://example.com/news/2024-06-01", "https://example.com/news/X"),
+        ("https://example.com/news/20240601", "https://example.com/news/X"),
+        ("https://example.com/commit/deadbeef1", "https://example.com/commit/X"),
+        # a hex word without digits is kept
+        ("https://example.com/commit/deadbeef", "https://example.com/commit/deadbeef"),
+        # digits in the other segments
+        ("https://example.com/path/item/1/", "https://example.com/path/item/X"),
+        ("https://example.com/page2/list", "https://example.com/pageX/list"),
+    ],
+)
+def test_normalize(normalizer, url, expected):
+    assert normalizer.normalize(url) == expected
+
+
+def test_exact_segment_wins_over_wildcard(normalizer):
+    normalizer.register("https://example.com/items/{}")
+
+    assert normalizer.normalize("https://example.com/items/new") == (
+        "https://example.com/items/new"
+    )
+    assert normalizer.normalize("https://example.com/items/7") == (
+        "https://example.com/items/X"
+    )
+
+
+def test_register_clears_the_cache():
+    normalizer = UrlNormalizer()
+    url = "https://example.com/products/shoes"
+    assert normalizer.normalize(url) == url
+
+    normalizer.register("https://example.com/products/{slug}")
+
+    assert normalizer.normalize(url) == "https://example.com/products/X"
+
+
+def test_cache_is_bounded():
+    normalizer = UrlNormalizer(cache_size=2)
+    for x in range(5):
+        normalizer.normalize(f"https://example.com/items/{x}")
+
+    assert normalizer.cache_info().currsize == 2
@@ -0,0 +1,68 @@
+import pytest
+
+from utils.reporting.xpath_normalizer import XpathNormalizer
+
+CANONICAL = "//div[contains(@class,'et_pb_row')]//a[.='View']"
+
+
+@pytest.fixture
+def normalizer():
+    return XpathNormalizer()
+
+
+@pytest.mark.parametrize(
+    "xpath, expected",
+    [
+        (CANONICAL, CANONICAL),
+        ("//div[ contains(@class, \"et_pb_row\") ]///a[. = 'View']/", CANONICAL),
+        (
+            "//div[contains(@class,'et_pb_row')]/descendant-or-self::node()/a[.='View']",
+            CANONICAL,
+        ),
+        # abbreviated steps and slashes
+        ("//div/./a", "//div/a"),
+        ("//div/self::node()/a", "//div/a"),
+        ("//div/", "//div"),
+        ("/", "/"),
+        ("//", "//"),
+        # whitespace and operators
+        ("  //div  ", "//div"),
+        ("//a[@ id='x']", "//a[@id='x']"),
+        ('//a[@id = "x" and @class != "y"]', "//a[@id='x' and @class!='y']"),
+        ("//a | //b", "//a|//b"),
+        ("(//div)[1]", "(//div)[1]"),
+        # literals are kept as is, in single quotes where possible
+        ('//a[@title=" a  b "]', "//a[@title=' a  b ']"),
+        ('//a[text()="it\'s"]', '//a[text()="it\'s"]'),
+        ("//a[text()='a / b']", "//a[text()='a / b']"),
+    ],
+)
+def test_normalize(normalizer, xpath, expected):
+    assert normalizer.normalize(xpath) == expected
+
+
+def test_normalize_is_idempotent(normalizer):
+    xpath = "//div[ contains(@class, \"et_pb_row\") ]///a[. = 'View']/"
+
+    normalized = normalizer.normalize(xpath)
+
+    assert normalizer.normalize(normalized) == normalized
+
+
+@pytest.mark.parametrize(
+    "selector, expected",
+    [
+        ("//div", ("//div",)),
+        ("xpath=//div >> nth=0 >> xpath=//a", ("//div", "//a")),
+        ('xpath=//div[ @id="a" ] >> //a/', ('//div[ @id="a" ]', "//a/")),
+    ],
+)
+def test_selector_xpaths(selector, expected):
+    assert XpathNormalizer.selector_xpaths(selector) == expected
+
+
+def test_split_selector(normalizer):
+    assert normalizer.split_selector('xpath=//div[ @id="a" ] >> nth=2 >> //a/') == (
+        "//div[@id='a']",
+        "//a",
+    )
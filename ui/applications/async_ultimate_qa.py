@@ -0,0 +1,18 @@
+from playwright.async_api import Browser, Page
+
+from ui.base.async_app import AsyncBaseApp
+from ui.pages.async_landing_page import AsyncLandingPage
+
+
+class AsyncUltimateQa(AsyncBaseApp):
+    def __init__(self, page: Page, browser: Browser = None):
+        super().__init__(page, browser)
+        self._main_page = AsyncLandingPage(page, self.base_url)
+
+    @property
+    def base_url(self) -> str:
+        return "https://ultimateqa.com"
+
+    @property
+    def landing_page(self) -> AsyncLandingPage:
+        return self._main_page
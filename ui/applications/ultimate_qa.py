@@ -1,10 +1,27 @@
 from playwright.sync_api import Playwright
 
 from ui.base.app import BaseApp
+from ui.base.request_policy import RequestPolicy
 from ui.pages.landing_page import LandingPage
 
 
 class UltimateQa(BaseApp):
+    # applied with REQUEST_POLICY_MODE=block: no locator of the app depends
+    # on images, media, fonts or third-party widgets
+    request_policy = RequestPolicy(
+        blocked_resource_types=["image", "media", "font"],
+        blocked_domains=[
+            "google-analytics.com",
+            "googletagmanager.com",
+            "doubleclick.net",
+            "facebook.net",
+            "hotjar.com",
+            "clarity.ms",
+            "youtube.com",
+            "vimeo.com",
+        ],
+    )
+
     def __init__(self, page, playwright: Playwright = None):
         super().__init__(page, playwright)
         self._main_page = LandingPage(page, self.base_url)
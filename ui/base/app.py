@@ -1,8 +1,12 @@
 from abc import ABCMeta, abstractmethod
+from pathlib import Path
+from typing import Optional, Union
 
 from playwright.sync_api import Browser, Page
 
 from core.helpers.string_formatters import camelcase_name_to_words
+from ui.base.element_cache import invalidate_page
+from ui.base.request_policy import RequestPolicy
 
 
 # pylint: disable=unnecessary-dunder-call
@@ -11,6 +15,15 @@ from core.helpers.string_formatters import camelcase_name_to_words
 class BaseApp(metaclass=ABCMeta):
     """The base abstract class from which every application should inherit"""
 
+    # Storage state (cookies and local storage) all pages of the app start with.
+    # Path to a file or a dict in the format of BrowserContext.storage_state().
+    # If it is None, it is captured after prepare_storage_state() is run once per worker.
+    storage_state: Optional[Union[str, Path, dict]] = None
+
+    # Requests (images, trackers, etc.) the pages of the app do not need.
+    # They are blocked in every test context of the app.
+    request_policy: Optional[RequestPolicy] = None
+
     def __init__(self, page: Page, browser: Browser = None):
         self.page = page
         self.browser = browser
@@ -28,5 +41,19 @@ class BaseApp(metaclass=ABCMeta):
     def base_url(self) -> str:
         raise NotImplementedError()
 
+    @classmethod
+    def prepare_storage_state(cls, page: Page):
+        """Override to run the setup UI flow (accept cookie consent, log in, etc.)
+        whose result every new page of the app should start with.
+        """
+
+    @classmethod
+    def has_storage_state_setup(cls) -> bool:
+        return (
+            cls.prepare_storage_state.__func__
+            is not BaseApp.prepare_storage_state.__func__
+        )
+
     def refresh_browser(self):
         self.page.reload()
+        invalidate_page(self.page)
@@ -0,0 +1,21 @@
+from playwright.async_api import Page
+
+from ui.base.app import BaseApp
+
+
+class AsyncBaseApp(BaseApp):
+    """The base abstract class for applications built on playwright.async_api"""
+
+    @classmethod
+    async def prepare_storage_state(cls, page: Page):
+        """Async counterpart of BaseApp.prepare_storage_state(), run with an async page."""
+
+    @classmethod
+    def has_storage_state_setup(cls) -> bool:
+        return (
+            cls.prepare_storage_state.__func__
+            is not AsyncBaseApp.prepare_storage_state.__func__
+        )
+
+    async def refresh_browser(self):
+        await self.page.reload()
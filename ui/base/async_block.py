@@ -0,0 +1,146 @@
+from abc import ABCMeta
+from typing import List
+
+from playwright.async_api import TimeoutError as TimeoutErr
+
+from core.environment_variables_setup import DEFAULT_TIMEOUT, NO_TIMEOUT
+from ui.base.async_html_element import AsyncHtmlElement
+from ui.base.locator_helpers import resolve_elements_async, wait_and_highlight_async
+from utils.reporting.latency import timed
+from utils.reporting.ui_coverage_helpers import locator_latency_key, record_locator
+
+
+# pylint: disable=too-many-arguments
+
+
+def _lookup_latency_key(
+    block, xpath: str, *_args, outer_search: bool = False, **_kwargs
+):
+    page_url, block_xpath = locator_latency_key(block.element)
+    return page_url, xpath if outer_search else f"{block_xpath}{xpath}"
+
+
+class AsyncBaseBlock(AsyncHtmlElement, metaclass=ABCMeta):
+    """Async counterpart of BaseBlock. Lookups of one block can run concurrently:
+
+    results = await asyncio.gather(*(block.is_course_displayed(x) for x in names))
+    """
+
+    @timed(_lookup_latency_key, operation="find_element")
+    async def _find_html_element(
+        self,
+        xpath: str,
+        timeout: int = DEFAULT_TIMEOUT,
+        element_class: AsyncHtmlElement = AsyncHtmlElement,
+        highlight: bool = True,
+        visible: bool = True,
+        outer_search: bool = False,
+    ) -> AsyncHtmlElement:
+        """Find element or a block by XPATH and cast it to specified class.
+        See BaseBlock._find_html_element for the parameters.
+        """
+        root = self.page if outer_search else self.element
+        pw_locator = root.locator(f"xpath={xpath}").first
+
+        record_locator(
+            self.page.url,
+            pw_locator,
+            is_block=issubclass(element_class, AsyncBaseBlock),
+            outer_search=outer_search,
+            outer_xpath=xpath,
+        )
+        # noinspection PyCallingNonCallable
+        element = element_class(pw_locator)
+
+        if visible:
+            await wait_and_highlight_async(
+                pw_locator, timeout=timeout, highlight=highlight
+            )
+        elif highlight:
+            await element.highlight()
+
+        return element
+
+    @timed(_lookup_latency_key, operation="find_elements")
+    async def _find_html_elements(
+        self,
+        xpath: str,
+        timeout: int = DEFAULT_TIMEOUT,
+        element_class: AsyncHtmlElement = AsyncHtmlElement,
+        highlight: bool = True,
+        visible: bool = True,
+        outer_search: bool = False,
+        force_wait: bool = False,
+    ) -> List[AsyncHtmlElement]:
+        """Find elements or blocks by XPATH and cast them to specified class.
+        See BaseBlock._find_html_elements for the parameters.
+        """
+        root = self.page if outer_search else self.element
+        pw_locator = root.locator(f"xpath={xpath}")
+
+        if force_wait:
+            state = "visible" if visible else "attached"
+            await pw_locator.first.wait_for(timeout=timeout, state=state)
+
+        # count, highlight and visibility of all elements are resolved in one call
+        visibility = await resolve_elements_async(pw_locator, highlight=highlight)
+
+        if visibility:
+            record_locator(
+                self.page.url,
+                pw_locator,
+                is_block=issubclass(element_class, AsyncBaseBlock),
+                outer_search=outer_search,
+                outer_xpath=xpath,
+            )
+        if visibility and visible and not visibility[0]:
+            await pw_locator.first.wait_for(timeout=timeout)
+
+        # noinspection PyCallingNonCallable
+        return [element_class(pw_locator.nth(x)) for x in range(len(visibility))]
+
+    async def _wait_element_to_appear(
+        self,
+        xpath: str,
+        timeout: int = DEFAULT_TIMEOUT,
+        message: str = None,
+        outer_search: bool = False,
+    ):
+        element = await self._find_html_element(
+            xpath, timeout=NO_TIMEOUT, visible=False, outer_search=outer_search
+        )
+        await element.to_be_visible(timeout=timeout, message=message)
+
+    async def _wait_element_to_disappear(
+        self,
+        xpath: str,
+        timeout: int = DEFAULT_TIMEOUT,
+        message: str = None,
+        outer_search: bool = False,
+    ):
+        element = await self._find_html_element(
+            xpath, timeout=NO_TIMEOUT, visible=False, outer_search=outer_search
+        )
+        await element.not_to_be_visible(timeout=timeout, message=message)
+
+    async def _is_html_element_displayed(
+        self, xpath: str, timeout: int = None, outer_search: bool = False
+    ) -> bool:
+        """Check if element is displayed
+
+        :param xpath:
+            Locator value (e.g. '"//div[contains(@class, 'graph-and-table-container')]"')
+        :param timeout:
+            Set timeout > 0.01 to wait for element to be displayed. Defaults to 0.
+        """
+        element = await self._find_html_element(
+            xpath, timeout=NO_TIMEOUT, visible=False, outer_search=outer_search
+        )
+        if timeout and timeout != NO_TIMEOUT:
+            try:
+                await element.to_be_visible(timeout=timeout)
+                return True
+            except (TimeoutErr, AssertionError):
+                return False
+
+        return await element.is_displayed()
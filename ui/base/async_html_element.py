@@ -0,0 +1,156 @@
+import re
+from typing import Union
+
+from playwright.async_api import Locator, expect
+from playwright.async_api import TimeoutError as TimeoutErr
+
+from core.environment_variables_setup import (
+    DEFAULT_TIMEOUT,
+    LONG_TIMEOUT,
+    MIN_TIMEOUT,
+    NO_TIMEOUT,
+)
+from core.reporting.allure_helpers import attach_text_to_allure
+from ui.base.locator_helpers import highlight_elements_async
+from utils.reporting.latency import timed
+from utils.reporting.ui_coverage_helpers import locator_latency_key
+
+
+def _element_latency_key(element, *_args, **_kwargs):
+    return locator_latency_key(element.element)
+
+
+class AsyncHtmlElement:
+    """Async counterpart of HtmlElement built on playwright.async_api.
+    Properties of HtmlElement (text, value, etc.) are coroutines here.
+    Every simple async web element must inherit from this class.
+    """
+
+    def __init__(self, locator: Locator):
+        self.element = locator
+
+    @property
+    def page(self):
+        return self.element.page
+
+    async def value(self):
+        return await self.element.get_attribute("value")
+
+    async def text(self) -> str:
+        return await self.element.inner_text()
+
+    async def text_content(self):
+        """Returns the text content of the element, including its descendants.
+        Note: Use for React elements like: svg, text, g, etc.
+        """
+        return await self.element.text_content()
+
+    async def bounding_box(self):
+        return await self.element.bounding_box()
+
+    @timed(_element_latency_key)
+    async def highlight(self):
+        """Adding red highlighting to found element on the web-page"""
+        await highlight_elements_async(self.element)
+
+    @timed(_element_latency_key)
+    async def click(self, timeout=LONG_TIMEOUT, no_wait_after=False, **kwargs):
+        try:
+            await self.element.click(
+                timeout=timeout, no_wait_after=no_wait_after, **kwargs
+            )
+        except TimeoutErr as e:
+            attach_text_to_allure(str(e), "exception_text")
+            xpath = e.message.split("waiting for locator")[1].split("\n")[0].strip()
+            raise TimeoutErr(
+                f"Error while clicking on element (timeout={timeout / 1000}s). "
+                f"Xpath:\n{xpath}"
+            ) from e
+
+    @timed(_element_latency_key)
+    async def hover(self, timeout=LONG_TIMEOUT, no_wait_after=False, **kwargs):
+        try:
+            await self.element.hover(
+                timeout=timeout, no_wait_after=no_wait_after, **kwargs
+            )
+        except TimeoutErr as e:
+            attach_text_to_allure(str(e), "exception_text")
+            xpath = e.message.split("waiting for locator")[1].split("\n")[0].strip()
+            raise TimeoutErr(
+                f"Error while hovering over the element (timeout={timeout / 1000}s)."
+                f" Xpath:\n{xpath}"
+            ) from e
+
+    async def get_attribute(self, attribute_name: str):
+        return await self.element.get_attribute(attribute_name)
+
+    @timed(_element_latency_key)
+    async def fill(self, value: str, force=False):
+        await self.element.fill(str(value), force=force)
+
+    async def is_displayed(self):
+        """Returns True if the element is visible, False otherwise.
+        https://playwright.dev/python/docs/api/class-page#page-is-visible
+        """
+        return await self.element.is_visible()
+
+    async def is_checked(self):
+        return await self.element.is_checked(timeout=DEFAULT_TIMEOUT)
+
+    @timed(_element_latency_key)
+    async def select_option(self, value: str):
+        await self.element.select_option(value)
+
+    @timed(_element_latency_key, operation="expect.to_have_css_attribute")
+    async def to_have_css_attribute(
+        self, name: str, value: Union[str, re.Pattern], timeout: int = NO_TIMEOUT
+    ) -> bool:
+        try:
+            await expect(self.element).to_have_css(name, value, timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    @timed(_element_latency_key, operation="expect.to_be_checked")
+    async def to_be_checked(self, timeout=MIN_TIMEOUT) -> None:
+        await expect(self.element).to_be_checked(timeout=timeout)
+
+    @timed(_element_latency_key, operation="expect.not_to_be_checked")
+    async def not_to_be_checked(self, timeout=MIN_TIMEOUT) -> None:
+        await expect(self.element).not_to_be_checked(timeout=timeout)
+
+    @timed(_element_latency_key, operation="expect.not_to_be_visible")
+    async def not_to_be_visible(self, timeout=MIN_TIMEOUT, message: str = None) -> None:
+        try:
+            await expect(self.element).not_to_be_visible(timeout=timeout)
+        except (TimeoutErr, AssertionError) as e:
+            message = (
+                message
+                if message
+                else f"Element is still visible after {timeout} ms: {self.element}"
+            )
+            raise AssertionError(message) from e
+
+    @timed(_element_latency_key, operation="expect.to_be_visible")
+    async def to_be_visible(self, timeout=MIN_TIMEOUT, message: str = None) -> None:
+        try:
+            await expect(self.element).to_be_visible(timeout=timeout)
+        except (TimeoutErr, AssertionError) as e:
+            message = (
+                message
+                if message
+                else f"Element is not visible after {timeout} ms: {self.element}"
+            )
+            raise AssertionError(message) from e
+
+    @timed(_element_latency_key, operation="expect.to_be_disabled")
+    async def to_be_disabled(self, timeout=MIN_TIMEOUT, message: str = None) -> None:
+        try:
+            await expect(self.element).to_be_disabled(timeout=timeout)
+        except (TimeoutErr, AssertionError) as e:
+            message = (
+                message
+                if message
+                else f"Element is not disabled after {timeout} ms: {self.element}"
+            )
+            raise AssertionError(message) from e
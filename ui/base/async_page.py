@@ -0,0 +1,144 @@
+from abc import ABCMeta, abstractmethod
+
+from playwright.async_api import Page
+from playwright.async_api import TimeoutError as TimeoutErr
+
+from core.environment_variables_setup import DEFAULT_TIMEOUT, NO_TIMEOUT
+from core.helpers.string_formatters import camelcase_name_to_words
+from ui.base.async_block import AsyncBaseBlock
+from ui.base.async_html_element import AsyncHtmlElement
+from ui.base.locator_helpers import wait_and_highlight_async
+from utils.reporting.latency import timed
+from utils.reporting.ui_coverage_helpers import record_locator
+from utils.reporting.url_normalizer import url_normalizer
+
+
+# pylint: disable=too-many-arguments
+
+
+def _lookup_latency_key(page, xpath: str, *_args, **_kwargs):
+    return page.url, xpath
+
+
+class AsyncBasePage(metaclass=ABCMeta):
+    """Async counterpart of BasePage built on playwright.async_api"""
+
+    def __init__(self, page: Page, base_url: str):
+        self._base_url = base_url
+        self._driver = page
+        # used to map live URLs of this page to its template in the coverage report
+        url_normalizer.register(self.url)
+
+    def __repr__(self):
+        page_name = camelcase_name_to_words(self.__class__.__name__)
+        return page_name
+
+    @property
+    @abstractmethod
+    def path(self) -> str:
+        raise NotImplementedError()
+
+    @property
+    def url(self):
+        return f"{self._base_url}{self.path}"
+
+    @property
+    def is_current_page(self):
+        return self.url == self.get_current_url()
+
+    async def wait_for_url(
+        self, url: str, timeout: int = DEFAULT_TIMEOUT, message: str = None
+    ):
+        """Wait until the current URL matches the exact string or specified pattern"""
+        try:
+            await self._driver.wait_for_url(url, timeout=timeout)
+        except TimeoutErr as err:
+            raise AssertionError(
+                message
+                or f"Current URL is not '{url}' after {int(timeout / 1000)} seconds."
+                f"\nActual URL is '{self.get_current_url()}'\n"
+            ) from err
+
+    async def open(self, timeout: int = DEFAULT_TIMEOUT):
+        await self._driver.goto(self.url, timeout=timeout)
+        await self.wait_for_url(self.url, timeout=timeout)
+
+    @timed(_lookup_latency_key, operation="find_element")
+    async def _find_html_element(
+        self,
+        xpath: str,
+        timeout: int = DEFAULT_TIMEOUT,
+        element_class=AsyncHtmlElement,
+        highlight: bool = True,
+        visible=True,
+    ) -> AsyncHtmlElement:
+        """Find element or block by XPATH and cast it to specified class.
+        See BasePage._find_html_element for the parameters.
+        """
+        pw_locator = self._driver.locator(f"xpath={xpath}").first
+
+        record_locator(
+            self.url,
+            pw_locator,
+            is_block=issubclass(element_class, AsyncBaseBlock),
+        )
+
+        element = element_class(pw_locator)
+
+        if visible:
+            await wait_and_highlight_async(
+                pw_locator, timeout=timeout, highlight=highlight
+            )
+        elif highlight:
+            await element.highlight()
+
+        return element
+
+    async def _wait_element_to_appear(
+        self,
+        xpath: str,
+        timeout: int = DEFAULT_TIMEOUT,
+        message: str = None,
+    ) -> None:
+        element = await self._find_html_element(
+            xpath, timeout=NO_TIMEOUT, visible=False
+        )
+        await element.to_be_visible(timeout=timeout, message=message)
+
+    async def _wait_element_to_disappear(
+        self,
+        xpath: str,
+        timeout: int = DEFAULT_TIMEOUT,
+        message: str = None,
+    ) -> None:
+        element = await self._find_html_element(
+            xpath, timeout=NO_TIMEOUT, visible=False
+        )
+        await element.not_to_be_visible(timeout=timeout, message=message)
+
+    async def _is_html_element_displayed(
+        self,
+        xpath: str,
+        timeout: int = None,
+    ) -> bool:
+        """Check if element is displayed
+
+        :param xpath:
+            Locator value (e.g. '"//div[contains(@class, 'graph-and-table-container')]"')
+        :param timeout:
+            Set timeout > 0.01 to wait for element to be displayed. Defaults to 0.
+        """
+        element = await self._find_html_element(
+            xpath, timeout=NO_TIMEOUT, visible=False
+        )
+        if timeout and timeout != NO_TIMEOUT:
+            try:
+                await element.to_be_visible(timeout=timeout)
+                return True
+            except (TimeoutErr, AssertionError):
+                return False
+
+        return await element.is_displayed()
+
+    def get_current_url(self):
+        return self._driver.url
@@ -4,19 +4,40 @@ from typing import List
 from playwright.sync_api import TimeoutError as TimeoutErr
 
 from core.environment_variables_setup import DEFAULT_TIMEOUT, NO_TIMEOUT
+from ui.base.element_cache import ElementCache
 from ui.base.html_element import HtmlElement
-from utils.reporting.ui_coverage_helpers import record_locator
+from ui.base.locator_helpers import resolve_elements, wait_and_highlight
+from utils.reporting.latency import timed
+from utils.reporting.ui_coverage_helpers import locator_latency_key, record_locator
 
 
 # pylint: disable=too-many-arguments
 
 
+def _lookup_latency_key(
+    block, xpath: str, *_args, outer_search: bool = False, **_kwargs
+):
+    page_url, block_xpath = locator_latency_key(block.element)
+    return page_url, xpath if outer_search else f"{block_xpath}{xpath}"
+
+
 class BaseBlock(HtmlElement, metaclass=ABCMeta):
     """The base abstract class from which every block of HTML elements must inherit.
     Also, simple elements that contain HtmlElements (e.g. BaseFilter,
     MarketSelector, etc.) must inherit this class.
     """
 
+    # Set to True to reuse found elements until the page navigates, reloads
+    # or a frame is detached (see ui/base/element_cache.py)
+    cache_elements: bool = False
+
+    def _get_element_cache(self) -> ElementCache:
+        cache = self.__dict__.get("_element_cache")
+        if cache is None:
+            cache = self._element_cache = ElementCache(self.page)
+        return cache
+
+    @timed(_lookup_latency_key, operation="find_element")
     def _find_html_element(
         self,
         xpath: str,
@@ -54,17 +75,26 @@ class BaseBlock(HtmlElement, metaclass=ABCMeta):
             outer_search=outer_search,
             outer_xpath=xpath,
         )
-        if visible:
-            pw_locator.wait_for(timeout=timeout)
+        if self.cache_elements:
+            cache_key = (xpath, element_class, outer_search, visible)
+            element = self._get_element_cache().get(cache_key)
+            if element is not None:
+                return element
 
         # noinspection PyCallingNonCallable
         element = element_class(pw_locator)
 
-        if highlight:
+        if visible:
+            wait_and_highlight(pw_locator, timeout=timeout, highlight=highlight)
+        elif highlight:
             element.highlight()
 
+        if self.cache_elements:
+            self._get_element_cache().put(cache_key, element)
+
         return element
 
+    @timed(_lookup_latency_key, operation="find_elements")
     def _find_html_elements(
         self,
         xpath: str,
@@ -107,28 +137,23 @@ class BaseBlock(HtmlElement, metaclass=ABCMeta):
             state = "visible" if visible else "attached"
             pw_locator.first.wait_for(timeout=timeout, state=state)
 
-        pw_elements = [pw_locator.nth(x) for x in range(pw_locator.count())]
+        # count, highlight and visibility of all elements are resolved in one call
+        visibility = resolve_elements(pw_locator, highlight=highlight)
 
-        _ = [
+        if visibility:
+            # nth() is not a part of the recorded xpath, so it is recorded once
             record_locator(
                 self.page.url,
-                pw_elem,
+                pw_locator,
                 is_block=issubclass(element_class, BaseBlock),
                 outer_search=outer_search,
                 outer_xpath=xpath,
             )
-            for pw_elem in pw_elements
-        ]
-        if pw_elements and visible:
+        if visibility and visible and not visibility[0]:
             pw_locator.first.wait_for(timeout=timeout)
 
         # noinspection PyCallingNonCallable
-        elements = [element_class(el) for el in pw_elements]
-
-        if highlight:
-            _ = [x.highlight() for x in elements]
-
-        return elements
+        return [element_class(pw_locator.nth(x)) for x in range(len(visibility))]
 
     def _wait_element_to_appear(
         self,
@@ -0,0 +1,75 @@
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Hashable, Tuple
+from weakref import WeakKeyDictionary
+
+from playwright.sync_api import Page
+
+
+@dataclass
+class ElementCacheStats:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+element_cache_stats = ElementCacheStats()
+
+# Playwright page -> number of navigations, reloads and frame detaches seen so far
+_navigation_epochs: "WeakKeyDictionary[Page, list]" = WeakKeyDictionary()
+
+
+def navigation_epoch(page: Page) -> int:
+    """Return the navigation counter of the page. Starts tracking the page on first call."""
+    epoch = _navigation_epochs.get(page)
+    if epoch is None:
+        epoch = _navigation_epochs[page] = [0]
+
+        def bump(*_):
+            epoch[0] += 1
+            element_cache_stats.invalidations += 1
+
+        page.on("framenavigated", bump)
+        page.on("framedetached", bump)
+        page.on("close", bump)
+    return epoch[0]
+
+
+def invalidate_page(page: Page):
+    """Drop all cached elements of the page (e.g. right after a reload)."""
+    if page in _navigation_epochs:
+        _navigation_epochs[page][0] += 1
+        element_cache_stats.invalidations += 1
+
+
+class ElementCache:
+    """Cache of the elements found by a page object or a block.
+
+    Entries are valid only while the page stays on the same document:
+    any navigation, reload or frame detach of the page invalidates them.
+    """
+
+    def __init__(self, page: Page):
+        self._page = page
+        self._entries: Dict[Hashable, Tuple[int, str, Any]] = {}
+
+    def get(self, key: Hashable):
+        entry = self._entries.get(key)
+        if (
+            entry is not None
+            and entry[0] == navigation_epoch(self._page)
+            and entry[1] == self._page.url
+        ):
+            element_cache_stats.hits += 1
+            return entry[2]
+
+        element_cache_stats.misses += 1
+        return None
+
+    def put(self, key: Hashable, element):
+        self._entries[key] = (navigation_epoch(self._page), self._page.url, element)
+
+    def clear(self):
+        self._entries.clear()
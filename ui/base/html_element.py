@@ -12,6 +12,13 @@ from core.environment_variables_setup import (
     DEFAULT_TIMEOUT,
 )
 from core.reporting.allure_helpers import attach_text_to_allure
+from ui.base.locator_helpers import highlight_elements
+from utils.reporting.latency import timed
+from utils.reporting.ui_coverage_helpers import locator_latency_key
+
+
+def _element_latency_key(element, *_args, **_kwargs):
+    return locator_latency_key(element.element)
 
 
 class HtmlElementWrappedProperties:
@@ -50,10 +57,12 @@ class HtmlElementWrappedMethods:
     def __init__(self, locator: Locator):
         self.element = locator
 
+    @timed(_element_latency_key)
     def highlight(self):
         """Adding red highlighting to found element on the web-page"""
-        self.element.highlight()
+        highlight_elements(self.element)
 
+    @timed(_element_latency_key)
     def click(self, timeout=LONG_TIMEOUT, no_wait_after=False, **kwargs):
         try:
             self.element.click(timeout=timeout, no_wait_after=no_wait_after, **kwargs)
@@ -65,6 +74,7 @@ class HtmlElementWrappedMethods:
                 f"Xpath:\n{xpath}"
             ) from e
 
+    @timed(_element_latency_key)
     def hover(self, timeout=LONG_TIMEOUT, no_wait_after=False, **kwargs):
         try:
             self.element.hover(timeout=timeout, no_wait_after=no_wait_after, **kwargs)
@@ -76,6 +86,7 @@ class HtmlElementWrappedMethods:
                 f" Xpath:\n{xpath}"
             ) from e
 
+    @timed(_element_latency_key)
     def double_click(self, timeout=LONG_TIMEOUT, no_wait_after=False, **kwargs):
         try:
             self.element.dblclick(
@@ -97,9 +108,11 @@ class HtmlElementWrappedMethods:
     def get_attribute(self, attribute_name: str):
         return self.element.get_attribute(attribute_name)
 
+    @timed(_element_latency_key)
     def fill(self, value: str, force=False):
         self.element.fill(str(value), force=force)
 
+    @timed(_element_latency_key)
     def upload_file(
         self,
         file_path: Union[
@@ -118,15 +131,18 @@ class HtmlElementWrappedMethods:
         """
         return self.element.is_visible()
 
+    @timed(_element_latency_key)
     def move_to(self):
         self.element.scroll_into_view_if_needed()
 
     def is_checked(self):
         return self.element.is_checked(timeout=DEFAULT_TIMEOUT)
 
+    @timed(_element_latency_key)
     def select_option(self, value: str):
         self.element.select_option(value)
 
+    @timed(_element_latency_key)
     def click_with_javascript(self):
         self.element.evaluate(
             """(element) => {
@@ -142,6 +158,7 @@ class HtmlElementExpect:
     def __init__(self, locator: Locator):
         self.element = locator
 
+    @timed(_element_latency_key, operation="expect.to_have_css_attribute")
     def to_have_css_attribute(
         self, name: str, value: Union[str, re.Pattern], timeout: int = NO_TIMEOUT
     ) -> bool:
@@ -151,12 +168,15 @@ class HtmlElementExpect:
         except Exception:
             return False
 
+    @timed(_element_latency_key, operation="expect.to_be_checked")
     def to_be_checked(self, timeout=MIN_TIMEOUT) -> None:
         expect(self.element).to_be_checked(timeout=timeout)
 
+    @timed(_element_latency_key, operation="expect.not_to_be_checked")
     def not_to_be_checked(self, timeout=MIN_TIMEOUT) -> None:
         expect(self.element).not_to_be_checked(timeout=timeout)
 
+    @timed(_element_latency_key, operation="expect.not_to_be_visible")
     def not_to_be_visible(self, timeout=MIN_TIMEOUT, message: str = None) -> None:
         """Wait for the element to be hidden.
         Use only in combination with elements properties having "visible=False".
@@ -189,6 +209,7 @@ class HtmlElementExpect:
             )
             raise AssertionError(message) from e
 
+    @timed(_element_latency_key, operation="expect.to_be_visible")
     def to_be_visible(self, timeout=MIN_TIMEOUT, message: str = None) -> None:
         try:
             expect(self.element).to_be_visible(timeout=timeout)
@@ -200,6 +221,7 @@ class HtmlElementExpect:
             )
             raise AssertionError(message) from e
 
+    @timed(_element_latency_key, operation="expect.to_be_disabled")
     def to_be_disabled(self, timeout=MIN_TIMEOUT, message: str = None) -> None:
         try:
             expect(self.element).to_be_disabled(timeout=timeout)
@@ -0,0 +1,128 @@
+import time
+from typing import List
+
+from playwright.async_api import Locator as AsyncLocator
+from playwright.sync_api import Locator, Page
+
+from utils.reporting.adaptive_timeouts import adaptive_timeout
+from utils.reporting.latency import timed
+from utils.reporting.ui_coverage_helpers import locator_latency_key
+
+# Same visibility rules as Playwright: non-empty bounding box and not 'visibility: hidden'
+_IS_VISIBLE_JS = """(element) => {
+    const rect = element.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0
+        && window.getComputedStyle(element).visibility !== 'hidden';
+}"""
+
+HIGHLIGHT_OVERLAY_TAG = "ui-highlight-overlay"
+
+# Red boxes over the elements in an overlay of the document (like Locator.highlight()),
+# the styles of the elements are not changed. The boxes of the previous call are replaced.
+_HIGHLIGHT_JS = f"""(elements) => {{
+    let overlay = document.querySelector('{HIGHLIGHT_OVERLAY_TAG}');
+    if (!overlay) {{
+        overlay = document.createElement('{HIGHLIGHT_OVERLAY_TAG}');
+        overlay.style.cssText = 'position: absolute; top: 0; left: 0; width: 0; height: 0;'
+            + ' pointer-events: none; z-index: 2147483647;';
+        overlay.attachShadow({{mode: 'open'}});
+        document.documentElement.appendChild(overlay);
+    }}
+    const boxes = document.createDocumentFragment();
+    for (const element of elements) {{
+        const rect = element.getBoundingClientRect();
+        const box = document.createElement('div');
+        box.style.cssText = 'position: absolute; box-sizing: border-box;'
+            + ' border: 2px solid red; background: rgba(255, 0, 0, 0.1);'
+            + ` left: ${{rect.left + window.scrollX}}px; top: ${{rect.top + window.scrollY}}px;`
+            + ` width: ${{rect.width}}px; height: ${{rect.height}}px;`;
+        boxes.appendChild(box);
+    }}
+    overlay.shadowRoot.replaceChildren(boxes);
+}}"""
+
+HIDE_HIGHLIGHT_JS = f"""() => {{
+    document.querySelectorAll('{HIGHLIGHT_OVERLAY_TAG}').forEach((x) => x.remove());
+}}"""
+
+RESOLVE_ELEMENT_JS = f"""(element, highlight) => {{
+    const isVisible = {_IS_VISIBLE_JS};
+    if (highlight) ({_HIGHLIGHT_JS})([element]);
+    return isVisible(element);
+}}"""
+
+RESOLVE_ELEMENTS_JS = f"""(elements, highlight) => {{
+    const isVisible = {_IS_VISIBLE_JS};
+    if (highlight) ({_HIGHLIGHT_JS})(elements);
+    return elements.map(isVisible);
+}}"""
+
+
+def _remaining_ms(timeout: float, start: float) -> float:
+    """Time left of the timeout started at `start` (perf_counter).
+    Never 0, which means no timeout for Playwright."""
+    if not timeout:
+        return timeout
+    return max(timeout - (time.perf_counter() - start) * 1000, 1)
+
+
+def highlight_elements(pw_locator: Locator):
+    """Highlight the matched elements in the overlay without waiting for them.
+    All highlights (see wait_and_highlight) go through the overlay, so hide_highlight
+    removes every one of them."""
+    pw_locator.evaluate_all(_HIGHLIGHT_JS)
+
+
+async def highlight_elements_async(pw_locator: AsyncLocator):
+    """Async version of highlight_elements."""
+    await pw_locator.evaluate_all(_HIGHLIGHT_JS)
+
+
+def hide_highlight(page: Page):
+    """Remove the highlight boxes, e.g. before the page is reused by the next test."""
+    page.evaluate(HIDE_HIGHLIGHT_JS)
+
+
+@timed(locator_latency_key, operation="wait_and_highlight")
+@adaptive_timeout(locator_latency_key)
+def wait_and_highlight(pw_locator: Locator, timeout: float, highlight: bool):
+    """Wait until the element is visible and highlight it in a single browser call.
+    A separate wait is done only if the attached element is not visible yet,
+    both calls share the timeout.
+    The timeout may be shortened by the adaptive timeouts (see adaptive_timeouts.py).
+    """
+    start = time.perf_counter()
+    is_visible = pw_locator.evaluate(RESOLVE_ELEMENT_JS, highlight, timeout=timeout)
+    if not is_visible:
+        pw_locator.wait_for(timeout=_remaining_ms(timeout, start))
+
+
+@timed(locator_latency_key, operation="resolve_elements")
+def resolve_elements(pw_locator: Locator, highlight: bool) -> List[bool]:
+    """Count, highlight and check visibility of all matched elements in one call.
+
+    :return: visibility flag of every element matched by the locator
+    """
+    return pw_locator.evaluate_all(RESOLVE_ELEMENTS_JS, highlight)
+
+
+@timed(locator_latency_key, operation="wait_and_highlight")
+@adaptive_timeout(locator_latency_key)
+async def wait_and_highlight_async(
+    pw_locator: AsyncLocator, timeout: float, highlight: bool
+):
+    """Async version of wait_and_highlight."""
+    start = time.perf_counter()
+    is_visible = await pw_locator.evaluate(
+        RESOLVE_ELEMENT_JS, highlight, timeout=timeout
+    )
+    if not is_visible:
+        await pw_locator.wait_for(timeout=_remaining_ms(timeout, start))
+
+
+@timed(locator_latency_key, operation="resolve_elements")
+async def resolve_elements_async(
+    pw_locator: AsyncLocator, highlight: bool
+) -> List[bool]:
+    """Async version of resolve_elements."""
+    return await pw_locator.evaluate_all(RESOLVE_ELEMENTS_JS, highlight)
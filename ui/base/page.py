@@ -11,19 +11,41 @@ from core.environment_variables_setup import (
 )
 from core.helpers.string_formatters import camelcase_name_to_words
 from ui.base.block import BaseBlock
+from ui.base.element_cache import ElementCache
 from ui.base.html_element import HtmlElement
+from ui.base.locator_helpers import hide_highlight, wait_and_highlight
+from ui.base.shared_pages import is_shared
+from utils.har_archive import har_archives
+from utils.reporting.latency import timed
 from utils.reporting.ui_coverage_helpers import record_locator
+from utils.reporting.url_normalizer import url_normalizer
 
 
 # pylint: disable=too-many-arguments
 
+_RESET_PAGE_JS = """() => {
+    window.scrollTo(0, 0);
+    if (document.activeElement) document.activeElement.blur();
+}"""
+
+
+def _lookup_latency_key(page, xpath: str, *_args, **_kwargs):
+    return page.url, xpath
+
 
 class BasePage(metaclass=ABCMeta):
     """The base abstract class from which every Page Object must inherit"""
 
+    # Set to True to reuse found elements until the page navigates, reloads
+    # or a frame is detached (see ui/base/element_cache.py)
+    cache_elements: bool = False
+
     def __init__(self, page: Page, base_url: str):
         self._base_url = base_url
         self._driver = page
+        self._element_cache = ElementCache(page)
+        # used to map live URLs of this page to its template in the coverage report
+        url_normalizer.register(self.url)
 
     def __repr__(self):
         page_name = camelcase_name_to_words(self.__class__.__name__)
@@ -43,6 +65,7 @@ class BasePage(metaclass=ABCMeta):
         return self.url == self.get_current_url()
 
     def open_url(self, url: str):
+        har_archives.route(self._driver, url)
         self._driver.goto(url, timeout=LONG_TIMEOUT * 2)
 
     def wait_for_url(
@@ -78,9 +101,32 @@ class BasePage(metaclass=ABCMeta):
             raise AssertionError(msg) from err
 
     def open(self, timeout: int = DEFAULT_TIMEOUT):
+        if is_shared(self._driver) and self.get_current_url() == self.url:
+            # a previous read-only test left this page loaded
+            self.reset()
+            if self.revalidate():
+                return
+
+        # served from the HAR archive of the page in the replay mode
+        har_archives.route(self._driver, self.url)
         self._driver.goto(self.url, timeout=timeout)
         self.wait_for_url(self.url, timeout=timeout)
 
+    def reset(self):
+        """Bring the loaded page back to its initial state between read-only tests
+        sharing it (see the 'readonly' marker). Override to close popups, clear filters, etc.
+        """
+        # the highlights of the previous test
+        hide_highlight(self._driver)
+        self._driver.evaluate(_RESET_PAGE_JS)
+
+    def revalidate(self) -> bool:
+        """Check that the page shared by read-only tests can be used without reloading.
+        If False is returned, the page is opened again.
+        """
+        return self._driver.evaluate("() => document.readyState === 'complete'")
+
+    @timed(_lookup_latency_key, operation="find_element")
     def _find_html_element(
         self,
         xpath: str,
@@ -106,7 +152,6 @@ class BasePage(metaclass=ABCMeta):
         """
 
         pw_locator = self._driver.locator(f"xpath={xpath}").first
-        element = element_class(pw_locator)
 
         record_locator(
             self.url,
@@ -114,11 +159,22 @@ class BasePage(metaclass=ABCMeta):
             is_block=issubclass(element_class, BaseBlock),
         )
 
+        if self.cache_elements:
+            cache_key = (xpath, element_class, False, visible)
+            element = self._element_cache.get(cache_key)
+            if element is not None:
+                return element
+
+        element = element_class(pw_locator)
+
         if visible:
-            pw_locator.wait_for(timeout=timeout)
-        if highlight:
+            wait_and_highlight(pw_locator, timeout=timeout, highlight=highlight)
+        elif highlight:
             element.highlight()
 
+        if self.cache_elements:
+            self._element_cache.put(cache_key, element)
+
         return element
 
     def _wait_element_to_appear(
@@ -0,0 +1,63 @@
+import re
+from typing import Iterable, Optional
+
+# host of the URL: scheme://[user@]host[:port]/...
+_HOST = re.compile(r"^[a-z][a-z0-9+.-]*://(?:[^@/]*@)?([^:/?#]+)", re.I)
+
+
+class RequestPolicy:
+    """Requests a BaseApp subclass does not need to be loaded for its pages.
+
+    :param blocked_resource_types:
+        Playwright resource types to block (e.g. "image", "font", "media")
+    :param blocked_domains:
+        Domains to block, including their subdomains (e.g. "google-analytics.com")
+    :param blocked_url_patterns:
+        Regular expressions of URLs to block
+    :param allowed_url_patterns:
+        Regular expressions of URLs that are never blocked, even if a block rule matches
+
+    Example:
+        class UltimateQa(BaseApp):
+            request_policy = RequestPolicy(
+                blocked_resource_types=["image", "font"],
+                blocked_domains=["googletagmanager.com"],
+                allowed_url_patterns=[r"/logo\\.png$"],
+            )
+    """
+
+    def __init__(
+        self,
+        blocked_resource_types: Iterable[str] = (),
+        blocked_domains: Iterable[str] = (),
+        blocked_url_patterns: Iterable[str] = (),
+        allowed_url_patterns: Iterable[str] = (),
+    ):
+        self.blocked_resource_types = frozenset(blocked_resource_types)
+        self.blocked_domains = tuple(x.lower().lstrip(".") for x in blocked_domains)
+        self._blocked_urls = [re.compile(x) for x in blocked_url_patterns]
+        self._allowed_urls = [re.compile(x) for x in allowed_url_patterns]
+
+    def _blocked_domain(self, url: str) -> Optional[str]:
+        match = _HOST.match(url)
+        if not match:
+            return None
+        host = match[1].lower()
+        for domain in self.blocked_domains:
+            if host == domain or host.endswith(f".{domain}"):
+                return domain
+        return None
+
+    def blocked_rule(self, url: str, resource_type: str) -> Optional[str]:
+        """Return the name of the rule blocking the request or None if it is allowed."""
+        if any(x.search(url) for x in self._allowed_urls):
+            return None
+        if resource_type in self.blocked_resource_types:
+            return f"type:{resource_type}"
+        domain = self._blocked_domain(url) if self.blocked_domains else None
+        if domain:
+            return f"domain:{domain}"
+        for pattern in self._blocked_urls:
+            if pattern.search(url):
+                return f"pattern:{pattern.pattern}"
+        return None
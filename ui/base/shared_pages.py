@@ -0,0 +1,14 @@
+from weakref import WeakSet
+
+from playwright.sync_api import Page
+
+# Pages kept loaded between the read-only tests of a worker (see BrowserPool.acquire_shared)
+_shared_pages: "WeakSet[Page]" = WeakSet()
+
+
+def mark_shared(page: Page):
+    _shared_pages.add(page)
+
+
+def is_shared(page: Page) -> bool:
+    return page in _shared_pages
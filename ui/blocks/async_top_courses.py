@@ -0,0 +1,10 @@
+from ui.base.async_block import AsyncBaseBlock
+from ui.blocks.top_courses import TopCoursesBlock
+
+
+class AsyncTopCoursesBlock(AsyncBaseBlock):
+
+    async def is_course_displayed(self, course_name: str) -> bool:
+        return await self._is_html_element_displayed(
+            TopCoursesBlock.COURSE.format(course_name=course_name)
+        )
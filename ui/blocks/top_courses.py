@@ -2,8 +2,10 @@ from ui.base.block import BaseBlock
 
 
 class TopCoursesBlock(BaseBlock):
+    # shared with AsyncTopCoursesBlock
+    COURSE = "//div[contains(@class, 'et_pb_module')]//h4[.='{course_name}']"
 
     def is_course_displayed(self, course_name: str) -> bool:
         return self._is_html_element_displayed(
-            f"//div[contains(@class, 'et_pb_module')]//h4[.='{course_name}']"
+            self.COURSE.format(course_name=course_name)
         )
@@ -0,0 +1,29 @@
+from ui.base.async_page import AsyncBasePage
+from ui.blocks.async_top_courses import AsyncTopCoursesBlock
+from ui.pages.landing_page import LandingPage
+
+
+class AsyncLandingPage(AsyncBasePage):
+    """Async version of LandingPage with the same locators"""
+
+    @property
+    def path(self) -> str:
+        return "/fake-landing-page"
+
+    async def discovery_session_link(self):
+        return await self._find_html_element(LandingPage.DISCOVERY_SESSION_LINK)
+
+    async def top_courses(self) -> AsyncTopCoursesBlock:
+        return await self._find_html_element(
+            LandingPage.TOP_COURSES,
+            element_class=AsyncTopCoursesBlock,
+        )
+
+    async def is_view_courses_button_visible(self):
+        return await self._is_html_element_displayed(LandingPage.VIEW_COURSES_BUTTON)
+
+    async def welcome_title(self):
+        return await self._find_html_element(LandingPage.WELCOME_TITLE)
+
+    async def welcome_text(self):
+        return await self._find_html_element(LandingPage.WELCOME_TEXT)
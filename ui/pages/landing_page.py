@@ -3,34 +3,41 @@ from ui.blocks.top_courses import TopCoursesBlock
 
 
 class LandingPage(BasePage):
+    # shared with AsyncLandingPage, so both stacks use and record the same locators
+    DISCOVERY_SESSION_LINK = (
+        "//div[@class='et_pb_menu__menu']//a[.='I want a free DISCOVERY SESSION']"
+    )
+    TOP_COURSES = "//div[@class='et_pb_row']/div[contains(@class, 'et-last-child')]"
+    VIEW_COURSES_BUTTON = "//a[.='View Courses']"
+    WELCOME_TITLE = (
+        "//div[contains(@class, 'et_pb_row_0')]//div[@class='et_pb_text_inner']/h1"
+    )
+    WELCOME_TEXT = (
+        "(//div[contains(@class, 'et_pb_row_0')]//div[@class='et_pb_text_inner'])[2]"
+    )
+
     @property
     def path(self) -> str:
         return "/fake-landing-page"
 
     @property
     def discovery_session_link(self):
-        return self._find_html_element(
-            "//div[@class='et_pb_menu__menu']//a[.='I want a free DISCOVERY SESSION']"
-        )
+        return self._find_html_element(self.DISCOVERY_SESSION_LINK)
 
     @property
     def top_courses(self) -> TopCoursesBlock:
         return self._find_html_element(
-            "//div[@class='et_pb_row']/div[contains(@class, 'et-last-child')]",
+            self.TOP_COURSES,
             element_class=TopCoursesBlock,
         )
 
     def is_view_courses_button_visible(self):
-        return self._is_html_element_displayed("//a[.='View Courses']")
+        return self._is_html_element_displayed(self.VIEW_COURSES_BUTTON)
 
     @property
     def welcome_title(self):
-        return self._find_html_element(
-            "//div[contains(@class, 'et_pb_row_0')]//div[@class='et_pb_text_inner']/h1"
-        )
+        return self._find_html_element(self.WELCOME_TITLE)
 
     @property
     def welcome_text(self):
-        return self._find_html_element(
-            "(//div[contains(@class, 'et_pb_row_0')]//div[@class='et_pb_text_inner'])[2]"
-        )
+        return self._find_html_element(self.WELCOME_TEXT)
@@ -0,0 +1,400 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Deque, Dict, Optional, Type
+
+from playwright._impl._sync_base import mapping
+from playwright.async_api import Browser as AsyncBrowser
+from playwright.async_api import Page as AsyncPage
+from playwright.sync_api import Browser, Page
+
+from core.environment_variables_setup import (
+    BROWSER_CHANNEL,
+    BROWSER_HEADLESS,
+    BROWSER_RESTART_AFTER_TESTS,
+    BROWSER_WARM_CONTEXTS,
+    LONG_TIMEOUT,
+)
+from ui.base.app import BaseApp
+from ui.base.async_app import AsyncBaseApp
+from ui.base.shared_pages import mark_shared
+from utils.har_archive import har_archives
+from utils.playwright import PlaywrightAsyncEngine, PlaywrightSyncEngine
+from utils.reporting.allure_helpers import setup_allure_environment_file
+from utils.request_filter import request_filter
+
+VIEW_PORT = {"width": 1440, "height": 900}
+PERMISSIONS = ["notifications", "clipboard-read", "clipboard-write"]
+
+AppClass = Optional[Type[BaseApp]]
+AsyncAppClass = Optional[Type[AsyncBaseApp]]
+
+
+@dataclass
+class BrowserPoolMetrics:
+    # pages taken from the warm pool and pages created while the test waited
+    hits: int = 0
+    misses: int = 0
+    # time the tests waited for their pages (a warm page may still be in progress)
+    wait_seconds: float = 0.0
+    launches: int = 0
+    storage_state_snapshots: int = 0
+    shared_page_reuses: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class _BackgroundPage:
+    """A page created in the event loop of the sync Playwright API.
+
+    The sync API runs its loop while a Playwright call of the test waits
+    (navigation, waits for elements, etc.), so the context of the next test
+    is set up during the waits of the current one.
+    """
+
+    def __init__(self, browser: Browser, storage_state: Optional[dict]):
+        self._browser = browser
+        impl = browser._impl_obj
+
+        async def create():
+            context = await impl.new_context(
+                viewport=VIEW_PORT, permissions=PERMISSIONS, storageState=storage_state
+            )
+            return await context.new_page()
+
+        self._task = browser._loop.create_task(create())
+
+    def result(self) -> Page:
+        """Wait until the page is created (if it is not yet) and return it."""
+
+        async def wait():
+            return await self._task
+
+        return mapping.from_impl(self._browser._sync(wait()))
+
+    def discard(self):
+        """Close the page. The pages of a closed (crashed) browser are gone with it."""
+        if not self._task.done():
+            self._task.cancel()
+        elif self._task.exception() is None and self._browser.is_connected():
+            mapping.from_impl(self._task.result()).context.close()
+
+
+class BrowserPool:
+    """Keeps one browser per xdist worker and creates a fresh context for every test.
+
+    The browser is launched on the first request and relaunched if it was closed
+    or crashed, or after `restart_after` tests (0 - never).
+    Pages of an application start with its storage state (see BaseApp.storage_state).
+
+    When a test gets its page, `warm_contexts` pages of the application are started
+    in the background (see _BackgroundPage) and the next tests take them instead of
+    waiting for a new context. The pages left by the last test are closed with the pool.
+    """
+
+    def __init__(
+        self,
+        headless: bool = BROWSER_HEADLESS,
+        channel: Optional[str] = BROWSER_CHANNEL,
+        restart_after: int = BROWSER_RESTART_AFTER_TESTS,
+        warm_contexts: int = BROWSER_WARM_CONTEXTS,
+    ):
+        self.headless = headless
+        self.channel = channel
+        self.restart_after = restart_after
+        self.warm_contexts = warm_contexts
+        self.metrics = BrowserPoolMetrics()
+        self._browser: Optional[Browser] = None
+        self._tests_since_launch = 0
+        self._storage_states: Dict[AppClass, Optional[dict]] = {}
+        self._warm: Dict[AppClass, Deque[_BackgroundPage]] = {}
+        self._shared: Dict[AppClass, Page] = {}
+
+    def _launch(self) -> Browser:
+        self._shared.clear()
+        self._discard_warm()
+        pw_engine = PlaywrightSyncEngine().engine
+        self._browser = pw_engine.chromium.launch(
+            channel=self.channel, headless=self.headless
+        )
+        self._tests_since_launch = 0
+        self.metrics.launches += 1
+        return self._browser
+
+    @property
+    def browser(self) -> Browser:
+        if self._browser is None or not self._browser.is_connected():
+            return self._launch()
+        return self._browser
+
+    def _get_storage_state(self, app_class: AppClass):
+        """Storage state of the application, prepared once per worker."""
+        if app_class is None:
+            return None
+        if app_class not in self._storage_states:
+            state = app_class.storage_state
+            if state is None and app_class.has_storage_state_setup():
+                context = self.browser.new_context(
+                    viewport=VIEW_PORT, permissions=PERMISSIONS
+                )
+                try:
+                    page = context.new_page()
+                    page.set_default_timeout(LONG_TIMEOUT)
+                    page.set_default_navigation_timeout(LONG_TIMEOUT)
+                    app_class.prepare_storage_state(page)
+                    state = context.storage_state()
+                    self.metrics.storage_state_snapshots += 1
+                finally:
+                    context.close()
+            self._storage_states[app_class] = state
+        return self._storage_states[app_class]
+
+    def _create_page(self, app_class: AppClass) -> Page:
+        browser = self.browser
+        storage_state = self._get_storage_state(app_class)
+        try:
+            context = browser.new_context(
+                viewport=VIEW_PORT, permissions=PERMISSIONS, storage_state=storage_state
+            )
+        except Exception:
+            if browser.is_connected():
+                raise
+            # the browser crashed between the tests
+            browser = self._launch()
+            context = browser.new_context(
+                viewport=VIEW_PORT, permissions=PERMISSIONS, storage_state=storage_state
+            )
+        return context.new_page()
+
+    def _configure_page(self, page: Page, app_class: AppClass):
+        page.set_default_timeout(LONG_TIMEOUT)
+        page.set_default_navigation_timeout(LONG_TIMEOUT)
+        har_archives.register_page(page, app_class)
+        if app_class is not None:
+            # registered after the HAR routes, so blocked requests are not counted as misses
+            request_filter.install(page, app_class.request_policy)
+
+    def _is_usable(self, page: Page) -> bool:
+        return (
+            not page.is_closed()
+            and page.context.browser is self._browser
+            and self._browser.is_connected()
+        )
+
+    def _take_warm(self, app_class: AppClass) -> Optional[Page]:
+        warm = self._warm.get(app_class)
+        while warm:
+            try:
+                page = warm.popleft().result()
+            except Exception:
+                # the browser crashed while the page was created
+                continue
+            if self._is_usable(page):
+                return page
+        return None
+
+    def _get_page(self, app_class: AppClass) -> Page:
+        start = time.perf_counter()
+        page = self._take_warm(app_class)
+        if page is not None:
+            self.metrics.hits += 1
+        else:
+            self.metrics.misses += 1
+            page = self._create_page(app_class)
+        self._configure_page(page, app_class)
+        self.metrics.wait_seconds += time.perf_counter() - start
+
+        if self._tests_since_launch == 0:
+            setup_allure_environment_file(page.context.browser, page)
+        return page
+
+    def warm_up(self, app_class: AppClass = None):
+        """Start creating the pages of the next tests of the application in the background."""
+        if self.restart_after and self._tests_since_launch + 1 >= self.restart_after:
+            # the browser is restarted before the next test
+            return
+        warm = self._warm.setdefault(app_class, deque())
+        while len(warm) < self.warm_contexts:
+            warm.append(
+                _BackgroundPage(self.browser, self._get_storage_state(app_class))
+            )
+
+    def acquire(self, app_class: AppClass = None) -> Page:
+        """Return an isolated (incognito) page for the test.
+
+        :param app_class:
+            BaseApp subclass the page is created for. Defines the storage state.
+        """
+        page = self._get_page(app_class)
+        self.warm_up(app_class)
+        return page
+
+    def release(self, page: Page):
+        """Close the test context and restart the browser if it is time to."""
+        try:
+            page.context.close()
+        except Exception:
+            if self._browser is not None and self._browser.is_connected():
+                raise
+
+        self._tests_since_launch += 1
+        if self.restart_after and self._tests_since_launch >= self.restart_after:
+            self.close()
+
+    def acquire_shared(self, app_class: AppClass = None) -> Page:
+        """Return the page shared by the read-only tests of the application.
+
+        The page is created on the first use and kept loaded between the tests,
+        so BasePage.open() navigates only if the page is not at its URL yet.
+        There is one shared page per application: the page a test is going to open
+        is not known when its fixtures run. A read-only test of another page of the
+        application navigates the shared page away, so the navigation is skipped
+        only for consecutive tests of the same page.
+        """
+        page = self._shared.get(app_class)
+        if page is not None and self._is_usable(page):
+            self.metrics.shared_page_reuses += 1
+            return page
+
+        # no pages are warmed up: the page is reused by the next read-only tests
+        page = self._shared[app_class] = self._get_page(app_class)
+        mark_shared(page)
+        return page
+
+    def release_shared(self, page: Page):
+        """The shared page stays open for the next read-only test."""
+        self._tests_since_launch += 1
+        if self.restart_after and self._tests_since_launch >= self.restart_after:
+            self.close()
+
+    def _discard_warm(self):
+        for warm in self._warm.values():
+            for pending in warm:
+                pending.discard()
+        self._warm.clear()
+
+    def close(self):
+        self._discard_warm()
+        for page in self._shared.values():
+            if self._is_usable(page):
+                page.context.close()
+        self._shared.clear()
+        if self._browser is not None and self._browser.is_connected():
+            self._browser.close()
+        self._browser = None
+
+
+class AsyncBrowserPool:
+    """Async counterpart of BrowserPool: one browser per worker, a context per test.
+    Coroutines must be run in the PlaywrightAsyncEngine loop (PlaywrightAsyncEngine().run).
+    The pages of the next tests are created by tasks of the loop while the test runs.
+    """
+
+    def __init__(
+        self,
+        headless: bool = BROWSER_HEADLESS,
+        channel: Optional[str] = BROWSER_CHANNEL,
+        warm_contexts: int = BROWSER_WARM_CONTEXTS,
+    ):
+        self.headless = headless
+        self.channel = channel
+        self.warm_contexts = warm_contexts
+        self.metrics = BrowserPoolMetrics()
+        self._browser: Optional[AsyncBrowser] = None
+        self._storage_states: Dict[AsyncAppClass, Optional[dict]] = {}
+        self._storage_state_lock = asyncio.Lock()
+        self._warm: Dict[AsyncAppClass, Deque["asyncio.Task[AsyncPage]"]] = {}
+
+    async def browser(self) -> AsyncBrowser:
+        if self._browser is None or not self._browser.is_connected():
+            self._warm.clear()
+            pw_engine = PlaywrightAsyncEngine().engine
+            self._browser = await pw_engine.chromium.launch(
+                channel=self.channel, headless=self.headless
+            )
+            self.metrics.launches += 1
+        return self._browser
+
+    async def _get_storage_state(self, app_class: AsyncAppClass):
+        """Storage state of the application, prepared once per worker."""
+        if app_class is None:
+            return None
+        # concurrent tests wait for the state prepared by the first one
+        async with self._storage_state_lock:
+            if app_class not in self._storage_states:
+                state = app_class.storage_state
+                if state is None and app_class.has_storage_state_setup():
+                    browser = await self.browser()
+                    context = await browser.new_context(
+                        viewport=VIEW_PORT, permissions=PERMISSIONS
+                    )
+                    try:
+                        page = await context.new_page()
+                        page.set_default_timeout(LONG_TIMEOUT)
+                        page.set_default_navigation_timeout(LONG_TIMEOUT)
+                        await app_class.prepare_storage_state(page)
+                        state = await context.storage_state()
+                        self.metrics.storage_state_snapshots += 1
+                    finally:
+                        await context.close()
+                self._storage_states[app_class] = state
+        return self._storage_states[app_class]
+
+    async def _create_page(self, app_class: AsyncAppClass) -> AsyncPage:
+        storage_state = await self._get_storage_state(app_class)
+        browser = await self.browser()
+        context = await browser.new_context(
+            viewport=VIEW_PORT, permissions=PERMISSIONS, storage_state=storage_state
+        )
+        return await context.new_page()
+
+    async def _take_warm(self, app_class: AsyncAppClass) -> Optional[AsyncPage]:
+        warm = self._warm.get(app_class)
+        while warm:
+            try:
+                page = await warm.popleft()
+            except Exception:
+                # the browser crashed while the page was created
+                continue
+            if not page.is_closed():
+                return page
+        return None
+
+    def warm_up(self, app_class: AsyncAppClass = None):
+        """Start creating the pages of the next tests of the application."""
+        warm = self._warm.setdefault(app_class, deque())
+        while len(warm) < self.warm_contexts:
+            warm.append(asyncio.ensure_future(self._create_page(app_class)))
+
+    async def acquire(self, app_class: AsyncAppClass = None) -> AsyncPage:
+        """Return an isolated (incognito) page. Several pages can be used concurrently."""
+        start = time.perf_counter()
+        page = await self._take_warm(app_class)
+        if page is not None:
+            self.metrics.hits += 1
+        else:
+            self.metrics.misses += 1
+            page = await self._create_page(app_class)
+
+        page.set_default_timeout(LONG_TIMEOUT)
+        page.set_default_navigation_timeout(LONG_TIMEOUT)
+
+        self.metrics.wait_seconds += time.perf_counter() - start
+        self.warm_up(app_class)
+        return page
+
+    async def release(self, page: AsyncPage):
+        await page.context.close()
+
+    async def close(self):
+        for warm in self._warm.values():
+            for task in warm:
+                task.cancel()
+            # the contexts of the created pages are closed with the browser
+            await asyncio.gather(*warm, return_exceptions=True)
+        self._warm.clear()
+        if self._browser is not None and self._browser.is_connected():
+            await self._browser.close()
+        self._browser = None
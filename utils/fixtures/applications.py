@@ -1,10 +1,45 @@
+import json
+
 import pytest
 
+from core.reporting.allure_helpers import attach_text_to_allure
+from ui.applications.async_ultimate_qa import AsyncUltimateQa
 from ui.applications.ultimate_qa import UltimateQa
+from utils.request_filter import request_filter
 
 
 @pytest.fixture(params=[UltimateQa])
-def ultimate_qa_app(driver):
-    app = UltimateQa(driver.page, driver.browser)
+def ultimate_qa_app(request, browser_pool):
+    app_class = request.param
+    # read-only tests of the app share one loaded page in the worker
+    readonly = request.node.get_closest_marker("readonly") is not None
+    # the page starts with the storage state of the app
+    if readonly:
+        page = browser_pool.acquire_shared(app_class)
+    else:
+        page = browser_pool.acquire(app_class)
+    app = app_class(page, page.context.browser)
+
+    yield app
+
+    # the shared page keeps collecting the stats of the next tests from zero
+    request_stats = request_filter.finish(page, keep=readonly)
+    if request_stats is not None:
+        attach_text_to_allure(
+            json.dumps(request_stats.as_dict(), indent=4), "request_policy_stats"
+        )
+    if readonly:
+        browser_pool.release_shared(page)
+    else:
+        browser_pool.release(page)
+
+
+@pytest.fixture(params=[AsyncUltimateQa])
+def async_ultimate_qa_app(request, async_engine, async_browser_pool):
+    app_class = request.param
+    page = async_engine.run(async_browser_pool.acquire(app_class))
+    app = app_class(page, page.context.browser)
+
+    yield app
 
-    return app
+    async_engine.run(async_browser_pool.release(page))
@@ -1,10 +1,19 @@
+import json
 from dataclasses import dataclass
 
 import pytest
 from playwright.sync_api import Browser, BrowserContext, Page
 
-from core.environment_variables_setup import LONG_TIMEOUT
-from utils.playwright import PlaywrightSyncEngine
+from core.environment_variables_setup import (
+    BROWSER_CHANNEL,
+    BROWSER_HEADLESS,
+    LONG_TIMEOUT,
+)
+from core.reporting.allure_helpers import attach_text_to_allure
+from ui.base.element_cache import element_cache_stats
+from utils.browser_pool import PERMISSIONS, VIEW_PORT, AsyncBrowserPool, BrowserPool
+from utils.har_archive import har_archives
+from utils.playwright import PlaywrightAsyncEngine, PlaywrightSyncEngine
 from utils.reporting.allure_helpers import setup_allure_environment_file
 
 
@@ -15,14 +24,18 @@ class PwDriver:
 
 
 def get_driver() -> tuple[Page, Browser]:
+    """Launch a separate browser with a single page.
+    Tests use the worker browser from `browser_pool` instead.
+    """
     # Run local browser in incognito mode
     pw_engine = PlaywrightSyncEngine().engine
-    browser = pw_engine.chromium.launch(channel="chrome", headless=False)
-    view_port = {"width": 1440, "height": 900}
+    browser = pw_engine.chromium.launch(
+        channel=BROWSER_CHANNEL, headless=BROWSER_HEADLESS
+    )
 
     context: BrowserContext = browser.new_context(
-        viewport=view_port,
-        permissions=["notifications", "clipboard-read", "clipboard-write"],
+        viewport=VIEW_PORT,
+        permissions=PERMISSIONS,
     )
     page = context.new_page()
 
@@ -34,10 +47,59 @@ def get_driver() -> tuple[Page, Browser]:
     return page, browser
 
 
+@pytest.fixture(scope="session")
+def browser_pool() -> BrowserPool:
+    """One browser per xdist worker (the session scope is per worker)."""
+    pool = BrowserPool()
+
+    yield pool
+
+    attach_text_to_allure(
+        json.dumps(pool.metrics.as_dict(), indent=4), "browser_pool_metrics"
+    )
+    attach_text_to_allure(
+        json.dumps(element_cache_stats.as_dict(), indent=4), "element_cache_stats"
+    )
+    if har_archives.enabled:
+        attach_text_to_allure(
+            json.dumps(har_archives.metrics.as_dict(), indent=4), "har_metrics"
+        )
+    pool.close()
+
+
 @pytest.fixture
-def driver() -> PwDriver:
-    page, browser = get_driver()
+def driver(browser_pool) -> PwDriver:
+    page = browser_pool.acquire()
+
+    yield PwDriver(page=page, browser=page.context.browser)
+
+    browser_pool.release(page)
+
 
-    yield PwDriver(page=page, browser=browser)
+@pytest.fixture(scope="session")
+def async_engine() -> PlaywrightAsyncEngine:
+    """Async Playwright running in its own event loop thread of the worker."""
+    engine = PlaywrightAsyncEngine()
+
+    yield engine
+
+    engine.stop()
+
+
+@pytest.fixture(scope="session")
+def async_browser_pool(async_engine) -> AsyncBrowserPool:
+    pool = AsyncBrowserPool()
+
+    yield pool
+
+    async_engine.run(pool.close())
+
+
+@pytest.fixture
+def run_async(async_engine):
+    """Run a coroutine of the async page objects and return its result.
 
-    browser.close()
+    Example:
+        run_async(app.landing_page.open())
+    """
+    return async_engine.run
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import weakref
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Type
+
+from playwright.sync_api import Page, Route
+
+from core.environment_variables_setup import (
+    HAR_DIRECTORY,
+    HAR_MAX_AGE_HOURS,
+    HAR_MODE,
+)
+from ui.base.app import BaseApp
+from utils.reporting.url_normalizer import url_normalizer
+
+OFF = "off"
+# capture the traffic of every opened page into its archive
+RECORD = "record"
+# serve the traffic from the archives, requests missing in them are aborted
+REPLAY = "replay"
+# replay fresh archives, record missing and stale ones
+REFRESH = "refresh"
+
+MODES = (OFF, RECORD, REPLAY, REFRESH)
+
+# <directory>/.recording/<worker>/<App>/<archive name>.<n>.har
+RECORDING_DIRECTORY = ".recording"
+
+_UNSAFE_CHARACTERS = re.compile(r"[^A-Za-z0-9]+")
+
+
+@dataclass
+class HarMetrics:
+    replayed_archives: int = 0
+    recorded_archives: int = 0
+    missing_archives: int = 0
+    misses: int = 0
+    missed_urls: Counter = field(default_factory=Counter)
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["missed_urls"] = dict(self.missed_urls.most_common())
+        return data
+
+
+class HarArchives:
+    """HAR record/replay of the page loads, so UI tests can run without network.
+
+    Archives are stored per application and page:
+    <directory>/<BaseApp subclass>/<normalized page URL>.har
+    An archive holds the traffic of the page from BasePage.open() until the test ends.
+
+    Requests that are not found in the archives are counted as misses
+    (see `metrics`). They are aborted in the replay mode
+    and go to the network in the refresh mode.
+
+    xdist workers may record the same page at the same time, so every test context
+    records into its own part under <directory>/.recording/<worker>/. The controller
+    merges the parts into the archives at the end of the session (merge_recordings).
+    """
+
+    def __init__(
+        self,
+        mode: str = HAR_MODE,
+        directory: Path = HAR_DIRECTORY,
+        max_age_hours: float = HAR_MAX_AGE_HOURS,
+        worker_id: Optional[str] = None,
+    ):
+        if mode not in MODES:
+            raise ValueError(f"Unknown HAR mode '{mode}'. Expected one of {MODES}")
+        self.mode = mode
+        self.directory = Path(directory)
+        self.max_age_hours = max_age_hours
+        self.worker_id = worker_id or os.environ.get("PYTEST_XDIST_WORKER", "master")
+        self.metrics = HarMetrics()
+        self._recorded_parts = 0
+        self._page_apps: "weakref.WeakKeyDictionary[Page, Type[BaseApp]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._routed: "weakref.WeakKeyDictionary[Page, Set[Path]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != OFF
+
+    def archive_path(self, app_class: Type[BaseApp], url: str) -> Path:
+        page_url = url_normalizer.normalize(url)
+        name = _UNSAFE_CHARACTERS.sub("_", page_url).strip("_")[:100]
+        digest = hashlib.sha1(page_url.encode()).hexdigest()[:8]
+        return self.directory / app_class.__name__ / f"{name}-{digest}.har"
+
+    def is_stale(self, path: Path) -> bool:
+        age_hours = (time.time() - path.stat().st_mtime) / 3600
+        return bool(self.max_age_hours) and age_hours > self.max_age_hours
+
+    def register_page(self, page: Page, app_class: Optional[Type[BaseApp]]):
+        """Called for every new page of the browser pool."""
+        if not self.enabled or app_class is None:
+            return
+        self._page_apps[page] = app_class
+        if self.mode in (REPLAY, REFRESH):
+            # page routes (route_from_har) are tried first and fall back to this one
+            page.context.route("**/*", self._on_miss)
+
+    def _on_miss(self, route: Route):
+        self.metrics.misses += 1
+        self.metrics.missed_urls[url_normalizer.normalize(route.request.url)] += 1
+        if self.mode == REPLAY:
+            route.abort("internetdisconnected")
+        else:
+            route.continue_()
+
+    def _should_record(self, path: Path) -> bool:
+        if self.mode == RECORD:
+            return True
+        if self.mode == REFRESH:
+            return not path.exists() or self.is_stale(path)
+        return False
+
+    def route(self, page: Page, url: str):
+        """Record or replay the traffic of the page opened at the url.
+        Does nothing if HAR mode is off or the page was not created for an application.
+        """
+        app_class = self._page_apps.get(page)
+        if app_class is None:
+            return
+
+        path = self.archive_path(app_class, url)
+        routed = self._routed.setdefault(page, set())
+        if path in routed:
+            return
+        routed.add(path)
+
+        if self._should_record(path):
+            part_path = self._part_path(path)
+            part_path.parent.mkdir(parents=True, exist_ok=True)
+            # the part is written when the test context is closed
+            page.route_from_har(part_path, update=True, update_content="embed")
+            self.metrics.recorded_archives += 1
+        elif path.exists():
+            page.route_from_har(path, not_found="fallback")
+            self.metrics.replayed_archives += 1
+        else:
+            self.metrics.missing_archives += 1
+
+    @property
+    def recording_directory(self) -> Path:
+        return self.directory / RECORDING_DIRECTORY
+
+    def _part_path(self, path: Path) -> Path:
+        self._recorded_parts += 1
+        relative = path.relative_to(self.directory)
+        return (
+            self.recording_directory
+            / self.worker_id
+            / relative.parent
+            / f"{relative.stem}.{self._recorded_parts}.har"
+        )
+
+    def start_session(self):
+        """Drop the parts left by a run that crashed before merging them.
+        Called on the controller before the workers start."""
+        shutil.rmtree(self.recording_directory, ignore_errors=True)
+
+    def merge_recordings(self) -> int:
+        """Merge the parts recorded by all workers into the archives.
+        Called on the controller after the workers are done.
+        Returns the number of the written archives.
+        """
+        if not self.recording_directory.is_dir():
+            return 0
+        parts: Dict[Path, List[Path]] = defaultdict(list)
+        for part_path in self.recording_directory.glob("*/*/*.har"):
+            _, app_name, name = part_path.relative_to(self.recording_directory).parts
+            archive_name = name.rsplit(".", 2)[0] + ".har"
+            parts[self.directory / app_name / archive_name].append(part_path)
+        for path, part_paths in parts.items():
+            # the later recordings of a request win
+            merge_har_files(sorted(part_paths, key=lambda x: x.stat().st_mtime), path)
+        shutil.rmtree(self.recording_directory)
+        return len(parts)
+
+
+def _entry_key(entry: dict) -> tuple:
+    request = entry["request"]
+    return (
+        request["method"],
+        request["url"],
+        (request.get("postData") or {}).get("text"),
+    )
+
+
+def merge_har_files(file_paths: List[Path], output_path: Path):
+    """Write the entries of all HAR files into one. An entry of a later file replaces
+    the entry of the same request (method, URL and body) in the earlier ones."""
+    merged = None
+    pages = {}
+    entries = {}
+    for file_path in file_paths:
+        with open(file_path, encoding="utf-8") as file:
+            har = json.load(file)
+        merged = merged or har
+        for page in har["log"].get("pages", []):
+            pages[page["id"]] = page
+        for entry in har["log"]["entries"]:
+            key = _entry_key(entry)
+            entries.pop(key, None)
+            entries[key] = entry
+    if merged is None:
+        return
+    if pages:
+        merged["log"]["pages"] = list(pages.values())
+    merged["log"]["entries"] = list(entries.values())
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_name(f"{output_path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(merged, file)
+    os.replace(tmp_path, output_path)
+
+
+har_archives = HarArchives()
@@ -1,8 +1,53 @@
+import asyncio
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+from playwright.async_api import async_playwright
 from playwright.sync_api import sync_playwright
 from singleton_decorator import singleton
 
+from utils.reporting.test_context import TestIdentity, _current_test, get_current_test
+
+T = TypeVar("T")
+
 
 @singleton
 class PlaywrightSyncEngine:
     def __init__(self):
         self.engine = sync_playwright().start()
+
+
+@singleton
+class PlaywrightAsyncEngine:
+    """Async Playwright running in its own event loop thread.
+
+    The sync API keeps its own event loop in the worker thread,
+    so the async API cannot share it. Coroutines are submitted with run().
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="playwright-async", daemon=True
+        )
+        self._thread.start()
+        self.engine = self.run(async_playwright().start())
+
+    @staticmethod
+    async def _in_test_context(identity: Optional[TestIdentity], awaitable):
+        # the coroutine runs in the loop thread, so the current test is passed explicitly
+        # (tasks created by asyncio.gather inherit it)
+        _current_test.set(identity)
+        return await awaitable
+
+    def run(self, awaitable: Awaitable[T], timeout: float = None) -> T:
+        """Run the coroutine in the Playwright loop and wait for the result."""
+        future = asyncio.run_coroutine_threadsafe(
+            self._in_test_context(get_current_test(), awaitable), self.loop
+        )
+        return future.result(timeout)
+
+    def stop(self):
+        self.run(self.engine.stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
@@ -0,0 +1,71 @@
+"""Loads and persists the wait durations of the adaptive timeouts
+(see utils/reporting/adaptive_timeouts.py).
+
+Every process loads the history at the start of the session and writes the durations
+of its waits to its shard at the end. The controller (or the only process if xdist
+is disabled) merges the shards into the history after all workers have finished.
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from core.environment_variables_setup import (
+    ADAPTIVE_TIMEOUTS_DIRECTORY,
+    ADAPTIVE_TIMEOUTS_ENABLED,
+)
+from utils.reporting.adaptive_timeouts import WaitStats, adaptive_timeouts
+
+
+def _worker_id() -> str:
+    return os.environ.get("PYTEST_XDIST_WORKER", "master")
+
+
+class AdaptiveTimeoutsPlugin:
+    def __init__(self, directory: Path, is_controller: bool):
+        self.directory = Path(directory)
+        self.is_controller = is_controller
+        self.stats = WaitStats()
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_sessionstart(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if self.is_controller:
+            # the controller starts before the workers: keep the shards of a crashed run
+            adaptive_timeouts.update_history(self.directory)
+        else:
+            adaptive_timeouts.load_history(self.directory)
+
+    def pytest_sessionfinish(self):
+        if adaptive_timeouts.stats.waits:
+            adaptive_timeouts.dump_shard(self.directory, _worker_id())
+            adaptive_timeouts.clear()
+        if self.is_controller:
+            # the controller finishes after all workers (or it is the only process)
+            self.stats = adaptive_timeouts.update_history(self.directory)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not (self.is_controller and self.stats.waits):
+            return
+        learned = sum(
+            adaptive_timeouts.learned_timeout(x) is not None
+            for x in adaptive_timeouts.history
+        )
+        terminalreporter.write_sep("-", "adaptive timeouts")
+        terminalreporter.write_line(
+            f"{self.stats.waits} waits, {self.stats.adapted} with a learned timeout, "
+            f"{self.stats.timed_out} of them failed; "
+            f"{learned} of {len(adaptive_timeouts.history)} locators have enough history"
+        )
+
+
+def pytest_configure(config: pytest.Config):
+    if ADAPTIVE_TIMEOUTS_ENABLED:
+        config.pluginmanager.register(
+            AdaptiveTimeoutsPlugin(
+                ADAPTIVE_TIMEOUTS_DIRECTORY,
+                is_controller=not hasattr(config, "workerinput"),
+            ),
+            "adaptive_timeouts",
+        )
@@ -0,0 +1,252 @@
+"""Duration-aware scheduling of the tests across xdist workers.
+
+The durations of the tests (setup + call + teardown) are kept in a local history file
+keyed by nodeid, together with the allure id of the test.
+With --dist=loadgroup the work units (an xdist_group or a single test) are
+partitioned across the workers longest-processing-time first using that history.
+A worker that runs out of its planned units takes the longest unit left.
+
+The predicted and the actual makespan are printed in the terminal summary
+and written to the report file.
+"""
+
+import heapq
+import json
+import re
+import statistics
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+import pytest
+from xdist.scheduler import LoadGroupScheduling
+
+from core.environment_variables_setup import (
+    DURATION_SCHEDULER_ENABLED,
+    TEST_DURATIONS_FILE,
+    TEST_DURATIONS_REPORT_FILE,
+)
+from utils.reporting.test_context import get_item_identity
+
+# Weight of the latest run in the duration estimate
+SMOOTHING = 0.5
+# Estimate of a test without any history if there is no history at all
+DEFAULT_DURATION = 10.0
+
+_PARAMETERS = re.compile(r"\[.*\]$")
+
+
+class DurationHistory:
+    """Smoothed durations of the tests in seconds, stored as JSON:
+    {nodeid: {"allure_id": "3", "duration": 12.5, "runs": 4}}
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.tests: Dict[str, dict] = {}
+        if self.path.exists():
+            with open(self.path) as file:
+                self.tests = json.load(file)
+        self._by_function: Optional[Dict[str, List[float]]] = None
+        self._by_allure_id: Optional[Dict[str, List[float]]] = None
+
+    def update(self, nodeid: str, allure_id: Optional[str], duration: float):
+        entry = self.tests.get(nodeid)
+        if entry is None:
+            self.tests[nodeid] = {
+                "allure_id": allure_id,
+                "duration": duration,
+                "runs": 1,
+            }
+        else:
+            entry["duration"] = (
+                SMOOTHING * duration + (1 - SMOOTHING) * entry["duration"]
+            )
+            entry["runs"] += 1
+            entry["allure_id"] = allure_id or entry["allure_id"]
+        self._by_function = self._by_allure_id = None
+
+    def _index(self):
+        self._by_function = defaultdict(list)
+        self._by_allure_id = defaultdict(list)
+        for nodeid, entry in self.tests.items():
+            self._by_function[_PARAMETERS.sub("", nodeid)].append(entry["duration"])
+            if entry["allure_id"]:
+                self._by_allure_id[entry["allure_id"]].append(entry["duration"])
+
+    def predict(self, nodeid: str, allure_id: Optional[str] = None) -> float:
+        """Duration of the test, of its other parameter sets, of the tests with
+        the same allure id or the median duration of all tests (in this order)."""
+        entry = self.tests.get(nodeid)
+        if entry is not None:
+            return entry["duration"]
+
+        if self._by_function is None:
+            self._index()
+        for durations in (
+            self._by_function.get(_PARAMETERS.sub("", nodeid)),
+            self._by_allure_id.get(allure_id) if allure_id else None,
+        ):
+            if durations:
+                return statistics.mean(durations)
+        if self.tests:
+            return statistics.median(x["duration"] for x in self.tests.values())
+        return DEFAULT_DURATION
+
+    def save(self):
+        with open(self.path, "w") as file:
+            json.dump(self.tests, file, indent=4, sort_keys=True)
+
+
+class DurationTracker:
+    """Collects the durations reported by the workers on the controller."""
+
+    def __init__(self, history: DurationHistory):
+        self.history = history
+        self.durations: Dict[str, float] = defaultdict(float)
+        self.allure_ids: Dict[str, Optional[str]] = {}
+        self.worker_busy: Dict[str, float] = defaultdict(float)
+        # worker id -> predicted seconds of the planned work units
+        self.predicted_loads: Dict[str, float] = {}
+        self.start = time.perf_counter()
+
+    def add_report(self, report: pytest.TestReport):
+        self.durations[report.nodeid] += report.duration
+        properties = dict(report.user_properties)
+        if "allure_id" in properties:
+            self.allure_ids[report.nodeid] = properties["allure_id"]
+        node = getattr(report, "node", None)
+        worker = node.gateway.id if node is not None else "master"
+        self.worker_busy[worker] += report.duration
+
+    def update_history(self):
+        for nodeid, duration in self.durations.items():
+            self.history.update(nodeid, self.allure_ids.get(nodeid), duration)
+        self.history.save()
+
+    def makespan_report(self) -> dict:
+        predicted = max(self.predicted_loads.values(), default=None)
+        actual = max(self.worker_busy.values(), default=0.0)
+        return {
+            "predicted_makespan_s": predicted,
+            "actual_makespan_s": actual,
+            "wall_time_s": time.perf_counter() - self.start,
+            "workers": {
+                worker: {
+                    "predicted_s": self.predicted_loads.get(worker),
+                    "actual_s": busy,
+                }
+                for worker, busy in sorted(self.worker_busy.items())
+            },
+        }
+
+
+def lpt_partition(
+    unit_durations: Dict[str, float], workers: List[str]
+) -> Dict[str, List[str]]:
+    """Assign the units to the workers longest-processing-time first.
+    The units of every worker are in descending order of their durations.
+    """
+    loads = [(0.0, i) for i in range(len(workers))]
+    plan = {worker: [] for worker in workers}
+    for scope, duration in sorted(unit_durations.items(), key=lambda x: -x[1]):
+        load, i = heapq.heappop(loads)
+        plan[workers[i]].append(scope)
+        heapq.heappush(loads, (load + duration, i))
+    return plan
+
+
+class DurationLoadGroupScheduling(LoadGroupScheduling):
+    """LoadGroupScheduling with the work units planned by their historical durations.
+    Tests of an xdist_group are still one work unit run by one worker.
+    """
+
+    def __init__(self, config: pytest.Config, tracker: DurationTracker, log=None):
+        super().__init__(config, log)
+        self.tracker = tracker
+        self._plan: Optional[Dict[str, Deque[str]]] = None
+        self._unit_durations: Dict[str, float] = {}
+
+    def _make_plan(self):
+        for scope, work_unit in self.workqueue.items():
+            self._unit_durations[scope] = sum(
+                self.tracker.history.predict(nodeid) for nodeid in work_unit
+            )
+        workers = [node.gateway.id for node in self.nodes]
+        plan = lpt_partition(self._unit_durations, workers)
+        self._plan = {worker: deque(scopes) for worker, scopes in plan.items()}
+        self.tracker.predicted_loads = {
+            worker: sum(self._unit_durations[x] for x in scopes)
+            for worker, scopes in plan.items()
+        }
+
+    def _next_scope(self, worker: str) -> str:
+        planned = self._plan.get(worker, deque())
+        while planned:
+            scope = planned.popleft()
+            if scope in self.workqueue:
+                return scope
+        # the worker is done with its plan (or replaces a crashed one)
+        return max(self.workqueue, key=lambda x: self._unit_durations.get(x, 0.0))
+
+    def _assign_work_unit(self, node) -> None:
+        if self._plan is None:
+            self._make_plan()
+        scope = self._next_scope(node.gateway.id)
+        self.workqueue.move_to_end(scope, last=False)
+        super()._assign_work_unit(node)
+
+
+class DurationSchedulerPlugin:
+    """Runs on the controller (or in the only process if xdist is disabled)."""
+
+    def __init__(self):
+        self.tracker = DurationTracker(DurationHistory(TEST_DURATIONS_FILE))
+
+    @pytest.hookimpl(optionalhook=True, tryfirst=True)
+    def pytest_xdist_make_scheduler(self, config: pytest.Config, log):
+        if DURATION_SCHEDULER_ENABLED and config.getoption("dist") == "loadgroup":
+            return DurationLoadGroupScheduling(config, self.tracker, log)
+        return None
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport):
+        self.tracker.add_report(report)
+
+    def pytest_sessionfinish(self):
+        if not self.tracker.durations:
+            return
+        self.tracker.update_history()
+        with open(TEST_DURATIONS_REPORT_FILE, "w") as file:
+            json.dump(self.tracker.makespan_report(), file, indent=4)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        report = self.tracker.makespan_report()
+        if report["predicted_makespan_s"] is None:
+            return
+        terminalreporter.write_sep("-", "duration scheduler")
+        terminalreporter.write_line(
+            f"predicted makespan {report['predicted_makespan_s']:.1f}s, "
+            f"actual {report['actual_makespan_s']:.1f}s, "
+            f"wall time {report['wall_time_s']:.1f}s"
+        )
+        for worker, loads in report["workers"].items():
+            predicted = loads["predicted_s"]
+            predicted = "-" if predicted is None else f"{predicted:.1f}s"
+            terminalreporter.write_line(
+                f"  {worker}: predicted {predicted}, actual {loads['actual_s']:.1f}s"
+            )
+
+
+def pytest_configure(config: pytest.Config):
+    # workers only report the durations
+    if not hasattr(config, "workerinput"):
+        config.pluginmanager.register(DurationSchedulerPlugin(), "duration_scheduler")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item: pytest.Item):
+    # the allure id travels to the controller with the reports
+    allure_id, _ = get_item_identity(item)
+    if allure_id:
+        item.user_properties.append(("allure_id", allure_id))
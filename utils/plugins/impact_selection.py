@@ -0,0 +1,230 @@
+"""Selection of the tests affected by a git diff of the page objects.
+
+The xpaths changed or removed in ui/pages and ui/blocks are looked up in the merged
+used_locators.json (page URL -> xpath -> tests), and only the tests that used them
+and the tests from the changed test files are run:
+
+    pytest --impacted-by=origin/main
+
+The recorded xpaths are full xpaths (the xpaths of the parent blocks included),
+so an xpath from the diff matches every recorded xpath containing it.
+All tests are run if the impact can not be derived from the xpaths:
+the base classes or the fixtures changed, a page object changed lines without
+an xpath literal (a wait, a method, an xpath built from a constant), or there is
+no coverage file.
+"""
+
+import re
+import subprocess
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pytest
+import rootpath
+
+from utils.reporting.coverage_merge import OUTPUT_FILENAME, read_coverage_pages
+from utils.reporting.test_context import get_item_identity
+from utils.reporting.xpath_normalizer import xpath_normalizer
+
+# The page objects; only their xpaths are taken into account
+PAGE_OBJECT_PATHS = ("ui/pages/", "ui/blocks/")
+TEST_PATHS = ("tests/",)
+# Changes of these files may affect any test
+FULL_SUITE_PATHS = (
+    "ui/base/",
+    "ui/applications/",
+    "utils/",
+    "core/",
+    "conftest.py",
+    "pytest.ini",
+    "requirements.txt",
+)
+
+# string literals (optionally f-strings) that start like an xpath
+_XPATH_LITERAL = re.compile(r"""(?:\bf)?(["'])(\(*/.*?)(?<!\\)\1""")
+# placeholders of f-strings (e.g. {course_name})
+_PLACEHOLDER = re.compile(r"\{[^{}]*\}")
+# changed lines that can not change the behavior: blank lines and comments
+_NO_CODE = re.compile(r"^\s*(?:#.*)?$")
+
+_selection_key = pytest.StashKey["Selection"]()
+
+
+@dataclass
+class DiffImpact:
+    """What a diff changed, by the kind of the files."""
+
+    xpaths: Set[str] = field(default_factory=set)
+    test_files: Set[str] = field(default_factory=set)
+    # changed files that require the full suite
+    full_suite_files: Set[str] = field(default_factory=set)
+
+
+def parse_diff(diff: str) -> DiffImpact:
+    """Collect the xpaths of the added and removed lines of a unified diff.
+    Removed lines give the xpaths the tests were recorded with,
+    added lines give the new versions of them.
+    A page object with a changed line of code without an xpath literal
+    (or without any xpath at all) requires the full suite.
+    """
+    impact = DiffImpact()
+    file_path = None
+    page_objects: Set[str] = set()
+    # page objects with changed xpaths and with changed lines of code without them
+    with_xpaths: Set[str] = set()
+    without_xpaths: Set[str] = set()
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            # diff --git a/<path> b/<path>
+            file_path = line.split(" b/", 1)[-1]
+            if file_path.startswith(FULL_SUITE_PATHS):
+                impact.full_suite_files.add(file_path)
+            elif file_path.startswith(TEST_PATHS) and file_path.endswith(".py"):
+                impact.test_files.add(file_path)
+            elif file_path.startswith(PAGE_OBJECT_PATHS):
+                page_objects.add(file_path)
+            continue
+        if file_path not in page_objects:
+            continue
+        if line.startswith(("+++", "---")) or not line.startswith(("+", "-")):
+            continue
+        xpaths = [x for _, x in _XPATH_LITERAL.findall(line[1:])]
+        if xpaths:
+            impact.xpaths.update(xpaths)
+            with_xpaths.add(file_path)
+        elif not _NO_CODE.match(line[1:]):
+            without_xpaths.add(file_path)
+    impact.full_suite_files |= without_xpaths | (page_objects - with_xpaths)
+    return impact
+
+
+def git_diff(base: str, paths: Iterable[str] = ()) -> str:
+    """Diff of the working tree against the base revision (e.g. origin/main)."""
+    return subprocess.run(
+        ["git", "diff", "--no-color", "--no-ext-diff", base, "--", *paths],
+        cwd=rootpath.detect(),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+
+def xpath_pattern(xpath: str) -> "re.Pattern":
+    """Pattern of the recorded full xpaths containing the xpath from the source code.
+    Placeholders of f-strings match any text.
+    """
+    parts = _PLACEHOLDER.split(xpath)
+    return re.compile(".*?".join(re.escape(x) for x in parts))
+
+
+class CoverageIndex:
+    """Reverse index of the merged coverage file: xpath -> tests that used it."""
+
+    def __init__(self):
+        self.tests: Dict[str, Set[Tuple[Optional[str], str]]] = defaultdict(set)
+
+    @classmethod
+    def load(cls, file_path: Path) -> "CoverageIndex":
+        index = cls()
+        for _, xpaths in read_coverage_pages(file_path):
+            for xpath, records in xpaths.items():
+                index.tests[xpath].update(
+                    (x["allure_id"], x["test_name"]) for x in records
+                )
+        return index
+
+    def affected_tests(self, xpaths: Iterable[str]) -> Set[Tuple[Optional[str], str]]:
+        """(allure_id, test_name) of the tests that used any of the xpaths.
+        The xpaths are recorded in the canonical form (see XpathNormalizer),
+        the coverage files recorded before that have them as they are written.
+        """
+        xpaths = {y for x in xpaths for y in (x, xpath_normalizer.normalize(x))}
+        patterns = [xpath_pattern(x) for x in xpaths]
+        affected = set()
+        for recorded_xpath, tests in self.tests.items():
+            if any(x.search(recorded_xpath) for x in patterns):
+                affected |= tests
+        return affected
+
+
+@dataclass
+class Selection:
+    # None if all tests have to be run
+    tests: Optional[Set[Tuple[Optional[str], str]]]
+    test_files: Set[str]
+    reason: str
+
+    def is_selected(self, item: pytest.Item, root: Path) -> bool:
+        if self.tests is None:
+            return True
+        if item.path.relative_to(root).as_posix() in self.test_files:
+            return True
+        # the tests without an allure id are recorded with their title
+        allure_id, test_name = get_item_identity(item)
+        if allure_id is not None:
+            return any(allure_id == x for x, _ in self.tests)
+        return any(x is None and test_name == y for x, y in self.tests)
+
+
+def select_tests(diff: str, coverage_file: Path) -> Selection:
+    impact = parse_diff(diff)
+    if impact.full_suite_files:
+        files = ", ".join(sorted(impact.full_suite_files))
+        return Selection(None, set(), f"the changes of {files} may affect any test")
+    if impact.xpaths and not coverage_file.exists():
+        return Selection(None, set(), f"{coverage_file} does not exist")
+
+    tests = (
+        CoverageIndex.load(coverage_file).affected_tests(impact.xpaths)
+        if impact.xpaths
+        else set()
+    )
+    return Selection(
+        tests,
+        impact.test_files,
+        f"{len(impact.xpaths)} changed xpaths used by {len(tests)} tests, "
+        f"{len(impact.test_files)} changed test files",
+    )
+
+
+def pytest_addoption(parser: pytest.Parser):
+    group = parser.getgroup("impact selection")
+    group.addoption(
+        "--impacted-by",
+        metavar="REVISION",
+        default=None,
+        help="Run only the tests affected by the changes since the git revision",
+    )
+    group.addoption(
+        "--impact-coverage-file",
+        default=str(rootpath.detect() / Path(OUTPUT_FILENAME)),
+        help="Merged used_locators.json of a full run",
+    )
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: List[pytest.Item]):
+    base = config.getoption("impacted_by")
+    if not base:
+        return
+
+    selection = select_tests(
+        git_diff(base), Path(config.getoption("impact_coverage_file"))
+    )
+    config.stash[_selection_key] = selection
+    root = Path(rootpath.detect())
+    selected, deselected = [], []
+    for item in items:
+        (selected if selection.is_selected(item, root) else deselected).append(item)
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = selected
+
+
+def pytest_report_collectionfinish(config: pytest.Config) -> Optional[str]:
+    selection = config.stash.get(_selection_key, None)
+    if selection is None:
+        return None
+    mode = "all tests" if selection.tests is None else "affected tests only"
+    return f"impact selection ({config.getoption('impacted_by')}): {mode}, {selection.reason}"
@@ -0,0 +1,268 @@
+"""Timeouts of element waits learned from the wait durations of previous runs.
+
+The durations of successful waits are recorded per (normalized page URL, xpath)
+in latency histograms. Each worker writes the durations of its run to a shard file,
+the controller merges the shards into the history at the end of the session:
+
+    <ADAPTIVE_TIMEOUTS_DIRECTORY>/wait_durations.json       history of all runs
+    <ADAPTIVE_TIMEOUTS_DIRECTORY>/wait_durations_<worker>.json  durations of a run
+
+A wait of a locator with enough history gets the timeout
+percentile * factor + margin (at least MIN_TIMEOUT), capped by the timeout passed
+to the wait, so a broken locator fails in seconds instead of DEFAULT_TIMEOUT or
+LONG_TIMEOUT. Enable it with ADAPTIVE_TIMEOUTS_ENABLED=true. When disabled,
+`adaptive_timeout` returns the decorated function unchanged.
+"""
+
+import functools
+import inspect
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from core.environment_variables_setup import (
+    ADAPTIVE_TIMEOUT_FACTOR,
+    ADAPTIVE_TIMEOUT_MARGIN_MS,
+    ADAPTIVE_TIMEOUT_MAX_SAMPLES,
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+    ADAPTIVE_TIMEOUT_PERCENTILE,
+    ADAPTIVE_TIMEOUTS_ENABLED,
+    MIN_TIMEOUT,
+)
+from utils.reporting.latency import KeyFunction, LatencyHistogram
+from utils.reporting.url_normalizer import url_normalizer
+
+HISTORY_FILENAME = "wait_durations.json"
+SHARD_PREFIX = "wait_durations_"
+
+# (normalized page URL, xpath)
+WaitKey = Tuple[str, str]
+
+
+@dataclass
+class WaitStats:
+    waits: int = 0
+    # waits with a timeout shorter than the one passed to them
+    adapted: int = 0
+    # adapted waits that failed (timed out)
+    timed_out: int = 0
+
+    def merge(self, other: "WaitStats"):
+        self.waits += other.waits
+        self.adapted += other.adapted
+        self.timed_out += other.timed_out
+
+
+class AdaptiveTimeouts:
+    """Wait durations of the previous runs (history) and of this run (recorded)."""
+
+    def __init__(
+        self,
+        percentile: float = ADAPTIVE_TIMEOUT_PERCENTILE,
+        factor: float = ADAPTIVE_TIMEOUT_FACTOR,
+        margin_ms: float = ADAPTIVE_TIMEOUT_MARGIN_MS,
+        min_samples: int = ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+        max_samples: int = ADAPTIVE_TIMEOUT_MAX_SAMPLES,
+        min_timeout: float = MIN_TIMEOUT,
+    ):
+        self.percentile = percentile
+        self.factor = factor
+        self.margin_ms = margin_ms
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.min_timeout = min_timeout
+        self.history: Dict[WaitKey, LatencyHistogram] = {}
+        self.recorded: Dict[WaitKey, LatencyHistogram] = {}
+        self.stats = WaitStats()
+        # learned timeouts (None - not enough history), the history does not change in a run
+        self._timeouts: Dict[WaitKey, Optional[float]] = {}
+
+    def key(self, page_url: str, xpath: str) -> WaitKey:
+        return url_normalizer.normalize(page_url), xpath
+
+    def learned_timeout(self, key: WaitKey) -> Optional[float]:
+        """Timeout in milliseconds learned for the locator, None without enough history."""
+        if key in self._timeouts:
+            return self._timeouts[key]
+        histogram = self.history.get(key)
+        timeout = None
+        if histogram is not None and histogram.count >= self.min_samples:
+            timeout = max(
+                self.min_timeout,
+                histogram.percentile(self.percentile) * self.factor + self.margin_ms,
+            )
+        self._timeouts[key] = timeout
+        return timeout
+
+    def timeout(self, key: WaitKey, timeout: float) -> float:
+        """The learned timeout of the locator capped by the timeout of the wait.
+        Timeouts up to MIN_TIMEOUT are kept as they are."""
+        if timeout is None or timeout <= self.min_timeout:
+            return timeout
+        learned = self.learned_timeout(key)
+        return timeout if learned is None else min(timeout, learned)
+
+    def record(self, key: WaitKey, seconds: float):
+        histogram = self.recorded.get(key)
+        if histogram is None:
+            histogram = self.recorded[key] = LatencyHistogram()
+        histogram.add(seconds * 1000)
+
+    def merge_history(self, histograms: Dict[WaitKey, LatencyHistogram]):
+        """Add the durations of a run. Locators with more than max_samples
+        durations have the older ones halved first (while it lowers their count)."""
+        for key, histogram in histograms.items():
+            merged = self.history.get(key)
+            if merged is None:
+                merged = self.history[key] = LatencyHistogram()
+            while merged.count + histogram.count > self.max_samples:
+                count = merged.count
+                merged.decay()
+                if merged.count == count:
+                    break
+            merged.merge(histogram)
+        self._timeouts.clear()
+
+    def load_history(self, directory: Path):
+        file_path = Path(directory) / HISTORY_FILENAME
+        if file_path.exists():
+            self.history = _load_histograms(file_path)[0]
+        self._timeouts.clear()
+
+    def dump_shard(self, directory: Path, worker_id: str):
+        _dump_histograms(shard_path(directory, worker_id), self.recorded, self.stats)
+
+    def update_history(self, directory: Path) -> WaitStats:
+        """Merge the shards of the workers into the history and remove them.
+        Returns the stats of the merged runs."""
+        directory = Path(directory)
+        self.load_history(directory)
+        stats = WaitStats()
+        shards = find_shards(directory)
+        for file_path in shards:
+            histograms, shard_stats = _load_histograms(file_path)
+            self.merge_history(histograms)
+            stats.merge(shard_stats)
+        if shards:
+            _dump_histograms(directory / HISTORY_FILENAME, self.history)
+            for file_path in shards:
+                file_path.unlink()
+        return stats
+
+    def clear(self):
+        self.recorded.clear()
+        self.stats = WaitStats()
+
+
+def shard_path(directory: Path, worker_id: str) -> Path:
+    return Path(directory) / f"{SHARD_PREFIX}{worker_id}.json"
+
+
+def find_shards(directory: Path) -> List[Path]:
+    return sorted(Path(directory).glob(f"{SHARD_PREFIX}*.json"))
+
+
+def _dump_histograms(
+    file_path: Path,
+    histograms: Dict[WaitKey, LatencyHistogram],
+    stats: Optional[WaitStats] = None,
+):
+    data = {
+        "histograms": [
+            {"page_url": key[0], "xpath": key[1], **value.to_dict()}
+            for key, value in histograms.items()
+        ],
+        "stats": asdict(stats or WaitStats()),
+    }
+    tmp_path = file_path.with_name(f"{file_path.name}.tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(data, file)
+    os.replace(tmp_path, file_path)
+
+
+def _load_histograms(
+    file_path: Path,
+) -> Tuple[Dict[WaitKey, LatencyHistogram], WaitStats]:
+    with open(file_path) as file:
+        data = json.load(file)
+    histograms = {
+        (item["page_url"], item["xpath"]): LatencyHistogram.from_dict(item)
+        for item in data["histograms"]
+    }
+    return histograms, WaitStats(**data.get("stats", {}))
+
+
+adaptive_timeouts = AdaptiveTimeouts()
+
+
+def adaptive_timeout(key: KeyFunction):
+    """Replace the `timeout` argument of the decorated wait with the learned timeout
+    and record the duration of every successful wait.
+
+    :param key:
+        Called with the arguments of the decorated function before it runs.
+        Returns the (page_url, xpath) pair the wait is learned for.
+
+    Returns the function itself if ADAPTIVE_TIMEOUTS_ENABLED is False.
+    """
+
+    def decorator(func):
+        if not ADAPTIVE_TIMEOUTS_ENABLED:
+            return func
+
+        position = list(inspect.signature(func).parameters).index("timeout")
+
+        def prepare(args: tuple, kwargs: dict):
+            wait_key = adaptive_timeouts.key(*key(*args, **kwargs))
+            by_keyword = "timeout" in kwargs
+            timeout = kwargs["timeout"] if by_keyword else args[position]
+            adapted = adaptive_timeouts.timeout(wait_key, timeout)
+            adaptive_timeouts.stats.waits += 1
+            if adapted != timeout:
+                adaptive_timeouts.stats.adapted += 1
+                if by_keyword:
+                    kwargs = {**kwargs, "timeout": adapted}
+                else:
+                    args = args[:position] + (adapted,) + args[position + 1 :]
+            return wait_key, adapted != timeout, args, kwargs
+
+        def finish(wait_key: WaitKey, adapted: bool, start: float, failed: bool):
+            if not failed:
+                adaptive_timeouts.record(wait_key, time.perf_counter() - start)
+            elif adapted:
+                adaptive_timeouts.stats.timed_out += 1
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                wait_key, adapted, args, kwargs = prepare(args, kwargs)
+                start = time.perf_counter()
+                failed = True
+                try:
+                    result = await func(*args, **kwargs)
+                    failed = False
+                    return result
+                finally:
+                    finish(wait_key, adapted, start, failed)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            wait_key, adapted, args, kwargs = prepare(args, kwargs)
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = func(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                finish(wait_key, adapted, start, failed)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,323 @@
+"""Compressed columnar format of the used_locators files (.uicov).
+
+Every string (page URLs, xpaths, test names...) is stored once in the string table,
+records are stored as integer-coded columns in blocks compressed with zstd
+(if the zstandard package is installed) or gzip:
+
+    MAGIC | codec | block 1 | ... | block N | footer | footer offset, footer size
+
+    block:  uint32 size | compressed columns of up to BLOCK_RECORDS records,
+            every column is an array of uint32 string table indexes (is_block is 0/1)
+    footer: compressed JSON {"strings": [...], "blocks": [[offset, size, records]],
+            "grouped": true if the records of every page are written together}
+
+Index 0 of the string table is None. Records keep the order they were written in,
+so the export to the ui-coverage plugin JSON schema is lossless.
+
+Usage:
+    python -m utils.reporting.coverage_columnar ui_coverage/used_locators_gw0.uicov \\
+        used_locators_gw0.json --indent 4
+"""
+
+import argparse
+import gzip
+import json
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is used without it
+    zstandard = None
+
+SUFFIX = ".uicov"
+MAGIC = b"UICOV\x01"
+BLOCK_RECORDS = 1 << 16
+
+# uncompressed blocks, for temporary files
+NONE = "none"
+GZIP = "gzip"
+ZSTD = "zstd"
+# the codec is stored in the file header
+_CODECS = {NONE: 0, GZIP: 1, ZSTD: 2}
+
+COLUMNS = (
+    "page_url",
+    "xpath",
+    "allure_id",
+    "test_name",
+    "is_block",
+    "original_page_url",
+    "outer_xpath",
+)
+
+# (page_url, xpath, allure_id, test_name, is_block, original_page_url, outer_xpath)
+Record = Tuple[str, str, Optional[str], str, bool, str, Optional[str]]
+PathLike = Union[str, Path]
+
+_BLOCK_SIZE = struct.Struct("<I")
+_TRAILER = struct.Struct("<QQ")
+
+
+def default_compression() -> str:
+    return ZSTD if zstandard is not None else GZIP
+
+
+def _compress(codec: str, data: bytes) -> bytes:
+    if codec == NONE:
+        return data
+    if codec == ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def _decompress(codec: str, data: bytes) -> bytes:
+    if codec == NONE:
+        return data
+    if codec == ZSTD:
+        if zstandard is None:
+            raise RuntimeError(
+                "Install the zstandard package to read zstd .uicov files"
+            )
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _to_bytes(column: array) -> bytes:
+    if sys.byteorder != "little":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _from_bytes(data: bytes) -> array:
+    column = array("I")
+    column.frombytes(data)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column
+
+
+class ColumnarWriter:
+    """Write records to a .uicov file block by block.
+
+    :param path: output file
+    :param compression: "zstd", "gzip" or "none", zstd requires the zstandard package
+    :param block_records: number of records in a compressed block
+    """
+
+    def __init__(
+        self,
+        path: PathLike,
+        compression: Optional[str] = None,
+        block_records: int = BLOCK_RECORDS,
+    ):
+        compression = compression or default_compression()
+        if compression not in _CODECS:
+            raise ValueError(
+                f"Unknown compression '{compression}'. Expected one of {tuple(_CODECS)}"
+            )
+        if compression == ZSTD and zstandard is None:
+            raise RuntimeError(
+                "Install the zstandard package to write zstd .uicov files"
+            )
+        self.path = Path(path)
+        self.compression = compression
+        self.block_records = block_records
+        self._strings: Dict[Optional[str], int] = {None: 0}
+        self._columns = [array("I") for _ in COLUMNS]
+        self._blocks: List[Tuple[int, int, int]] = []
+        self._pages: Set[int] = set()
+        self._last_page: Optional[int] = None
+        self._grouped = True
+        self._file = open(self.path, "wb")
+        self._file.write(MAGIC + bytes([_CODECS[compression]]))
+
+    def _index(self, value: Optional[str]) -> int:
+        index = self._strings.get(value)
+        if index is None:
+            index = self._strings[value] = len(self._strings)
+        return index
+
+    def add(
+        self,
+        page_url: str,
+        xpath: str,
+        allure_id: Optional[str],
+        test_name: str,
+        is_block: bool,
+        original_page_url: str,
+        outer_xpath: Optional[str] = None,
+    ):
+        columns = self._columns
+        page = self._index(page_url)
+        if page != self._last_page:
+            if page in self._pages:
+                self._grouped = False
+            self._pages.add(page)
+            self._last_page = page
+        columns[0].append(page)
+        columns[1].append(self._index(xpath))
+        columns[2].append(self._index(allure_id))
+        columns[3].append(self._index(test_name))
+        columns[4].append(1 if is_block else 0)
+        columns[5].append(self._index(original_page_url))
+        columns[6].append(self._index(outer_xpath))
+        if len(columns[0]) >= self.block_records:
+            self._write_block()
+
+    def _write_block(self):
+        records = len(self._columns[0])
+        if not records:
+            return
+        payload = _compress(
+            self.compression, b"".join(_to_bytes(x) for x in self._columns)
+        )
+        offset = self._file.tell()
+        self._file.write(_BLOCK_SIZE.pack(len(payload)))
+        self._file.write(payload)
+        self._blocks.append((offset, len(payload), records))
+        self._columns = [array("I") for _ in COLUMNS]
+
+    def close(self):
+        if self._file is None:
+            return
+        self._write_block()
+        strings = [None] * len(self._strings)
+        for value, index in self._strings.items():
+            strings[index] = value
+        footer = _compress(
+            self.compression,
+            json.dumps(
+                {"strings": strings, "blocks": self._blocks, "grouped": self._grouped},
+                separators=(",", ":"),
+            ).encode(),
+        )
+        offset = self._file.tell()
+        self._file.write(footer)
+        self._file.write(_TRAILER.pack(offset, len(footer)))
+        self._file.close()
+        self._file = None
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *_exc_info):
+        self.close()
+
+
+class ColumnarReader:
+    """Read a .uicov file. Only one block of records is decoded at a time."""
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        with open(self.path, "rb") as file:
+            header = file.read(len(MAGIC) + 1)
+            if header[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"{self.path} is not a {SUFFIX} file")
+            codecs = {v: k for k, v in _CODECS.items()}
+            self.compression = codecs[header[-1]]
+            file.seek(-_TRAILER.size, 2)
+            offset, size = _TRAILER.unpack(file.read(_TRAILER.size))
+            file.seek(offset)
+            footer = json.loads(_decompress(self.compression, file.read(size)))
+        self.strings: List[Optional[str]] = footer["strings"]
+        self.blocks: List[Tuple[int, int, int]] = [tuple(x) for x in footer["blocks"]]
+        # unknown in the files written before it was stored
+        self.grouped: bool = footer.get("grouped", False)
+
+    def __len__(self) -> int:
+        return sum(x[2] for x in self.blocks)
+
+    def iter_columns(self) -> Iterator[List[array]]:
+        """Integer-coded columns of every block (see COLUMNS and `strings`)."""
+        with open(self.path, "rb") as file:
+            for offset, size, records in self.blocks:
+                file.seek(offset + _BLOCK_SIZE.size)
+                data = _decompress(self.compression, file.read(size))
+                width = records * 4
+                yield [
+                    _from_bytes(data[i * width : (i + 1) * width])
+                    for i in range(len(COLUMNS))
+                ]
+
+    def __iter__(self) -> Iterator[Record]:
+        strings = self.strings
+        for columns in self.iter_columns():
+            # decode whole columns, it is faster than decoding row by row
+            yield from zip(
+                *(
+                    list(map(bool, x)) if i == 4 else [strings[y] for y in x]
+                    for i, x in enumerate(columns)
+                )
+            )
+
+    def iter_pages(self) -> Iterator[Tuple[str, Dict[str, List[dict]]]]:
+        """Yield (page_url, {xpath: [records]}) like coverage_merge.iter_coverage_pages.
+        If the records of every page are written together, one page is in memory
+        at a time. Otherwise the pages are collected first, so each is yielded once.
+        """
+        if self.grouped:
+            yield from self._iter_runs()
+        else:
+            yield from self.to_dict().items()
+
+    def _iter_runs(self) -> Iterator[Tuple[str, Dict[str, List[dict]]]]:
+        """(page_url, {xpath: [records]}) of every run of the records of a page"""
+        page_url, xpaths = None, None
+        for record in self:
+            if record[0] != page_url:
+                if xpaths is not None:
+                    yield page_url, xpaths
+                page_url, xpaths = record[0], {}
+            xpaths.setdefault(record[1], []).append(
+                {
+                    "allure_id": record[2],
+                    "is_block": record[4],
+                    "test_name": record[3],
+                    "original_page_url": record[5],
+                    "outer_xpath": record[6],
+                }
+            )
+        if xpaths is not None:
+            yield page_url, xpaths
+
+    def to_dict(self) -> Dict[str, Dict[str, List[dict]]]:
+        """The ui-coverage plugin JSON structure"""
+        pages = {}
+        for page_url, xpaths in self._iter_runs():
+            page = pages.setdefault(page_url, {})
+            for xpath, records in xpaths.items():
+                page.setdefault(xpath, []).extend(records)
+        return pages
+
+
+def export_json(path: PathLike, output_path: PathLike, indent: Optional[int] = None):
+    """Convert a .uicov file to the JSON file read by the ui-coverage plugin."""
+    separators = None if indent is not None else (",", ":")
+    with open(output_path, "w") as file:
+        json.dump(
+            ColumnarReader(path).to_dict(),
+            file,
+            indent=indent,
+            separators=separators,
+            sort_keys=True,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=f"Export a {SUFFIX} file to the ui-coverage JSON format"
+    )
+    parser.add_argument("input", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--indent", type=int, default=None)
+    args = parser.parse_args()
+    export_json(args.input, args.output, args.indent)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""Diff of the coverage of two runs (used_locators.json or .uicov files).
+
+The smaller file is read into a map (page_url, xpath) -> set of its tests
+(allure_id, test_name), the bigger one is streamed page by page and every locator
+is looked up in the map, so the diff takes linear time. A file that was not merged
+may repeat a locator, its tests are unioned on both sides. The streamed locators
+are kept until the end for that, but every one of them is either in the map or
+reported, so the memory is that of the smaller side and of the report.
+Locators are reported as:
+
+    removed  - covered in the baseline only, with the tests that covered them
+    added    - covered in the current run only
+    changed  - covered in both runs by different tests, with the lost and the new tests
+
+Usage:
+    python -m utils.reporting.coverage_diff baseline/used_locators.json used_locators.json \\
+        --output coverage_diff.json --max-removed 0
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from utils.reporting.coverage_merge import PathLike, read_coverage_pages
+
+LocatorKey = Tuple[str, str]
+# (allure_id, test_name)
+TestKey = Tuple[Optional[str], str]
+LocatorTests = Dict[LocatorKey, FrozenSet[TestKey]]
+
+
+@dataclass
+class DiffSummary:
+    removed: int = 0
+    added: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    lost_tests: int = 0
+
+
+@dataclass
+class CoverageDiff:
+    summary: DiffSummary = field(default_factory=DiffSummary)
+    removed: List[dict] = field(default_factory=list)
+    added: List[dict] = field(default_factory=list)
+    changed: List[dict] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def iter_locator_tests(
+    file_path: PathLike,
+) -> Iterator[Tuple[LocatorKey, FrozenSet[TestKey]]]:
+    """Yield ((page_url, xpath), tests) of a merged coverage file."""
+    for page_url, xpaths in read_coverage_pages(file_path):
+        for xpath, records in xpaths.items():
+            yield (page_url, xpath), frozenset(
+                (x["allure_id"], x["test_name"]) for x in records
+            )
+
+
+def load_locator_tests(file_path: PathLike) -> LocatorTests:
+    """Map (page_url, xpath) -> tests of the coverage file. The tests of a locator
+    that is repeated (in a file that was not merged) are unioned."""
+    locators: LocatorTests = {}
+    # test sets are interned, locators of the same tests share one
+    test_sets: Dict[FrozenSet[TestKey], FrozenSet[TestKey]] = {}
+    for key, tests in iter_locator_tests(file_path):
+        previous = locators.get(key)
+        if previous is not None:
+            tests = previous | tests
+        locators[key] = test_sets.setdefault(tests, tests)
+    return locators
+
+
+def _sorted_tests(tests: FrozenSet[TestKey]) -> List[dict]:
+    # allure_id may be None
+    return [
+        {"allure_id": x, "test_name": y}
+        for x, y in sorted(tests, key=lambda x: (x[0] or "", x[1]))
+    ]
+
+
+def diff_coverage(baseline_path: PathLike, current_path: PathLike) -> CoverageDiff:
+    """Compare the coverage of the baseline and the current run (merged files)."""
+    diff = CoverageDiff()
+    summary = diff.summary
+
+    def removed(key: LocatorKey, tests: FrozenSet[TestKey]):
+        diff.removed.append(
+            {"page_url": key[0], "xpath": key[1], "tests": _sorted_tests(tests)}
+        )
+        summary.removed += 1
+        summary.lost_tests += len(tests)
+
+    def added(key: LocatorKey, tests: FrozenSet[TestKey]):
+        diff.added.append(
+            {"page_url": key[0], "xpath": key[1], "tests": _sorted_tests(tests)}
+        )
+        summary.added += 1
+
+    def compare(
+        key: LocatorKey, baseline: FrozenSet[TestKey], current: FrozenSet[TestKey]
+    ):
+        if baseline == current:
+            summary.unchanged += 1
+            return
+        lost = baseline - current
+        diff.changed.append(
+            {
+                "page_url": key[0],
+                "xpath": key[1],
+                "lost_tests": _sorted_tests(lost),
+                "new_tests": _sorted_tests(current - baseline),
+            }
+        )
+        summary.changed += 1
+        summary.lost_tests += len(lost)
+
+    if Path(baseline_path).stat().st_size <= Path(current_path).stat().st_size:
+        loaded = load_locator_tests(baseline_path)
+        for key, tests in load_locator_tests(current_path).items():
+            baseline = loaded.pop(key, None)
+            if baseline is None:
+                added(key, tests)
+            else:
+                compare(key, baseline, tests)
+        for key, tests in loaded.items():
+            removed(key, tests)
+    else:
+        loaded = load_locator_tests(current_path)
+        for key, tests in load_locator_tests(baseline_path).items():
+            current = loaded.pop(key, None)
+            if current is None:
+                removed(key, tests)
+            else:
+                compare(key, tests, current)
+        for key, tests in loaded.items():
+            added(key, tests)
+    return diff
+
+
+def exceeded_limits(
+    summary: DiffSummary,
+    max_removed: Optional[int] = None,
+    max_lost_tests: Optional[int] = None,
+) -> List[str]:
+    """Messages of the exceeded limits, empty if the diff passes the gate."""
+    messages = []
+    if max_removed is not None and summary.removed > max_removed:
+        messages.append(
+            f"{summary.removed} locators lost coverage (allowed {max_removed})"
+        )
+    if max_lost_tests is not None and summary.lost_tests > max_lost_tests:
+        messages.append(
+            f"{summary.lost_tests} locator tests were lost (allowed {max_lost_tests})"
+        )
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Diff the coverage of the baseline and the current run"
+    )
+    parser.add_argument(
+        "baseline", type=Path, help="Merged coverage of the baseline run"
+    )
+    parser.add_argument("current", type=Path, help="Merged coverage of the current run")
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Write the JSON report to the file instead of stdout",
+    )
+    parser.add_argument(
+        "--max-removed",
+        type=int,
+        default=None,
+        help="Exit with 1 if more locators lost their coverage",
+    )
+    parser.add_argument(
+        "--max-lost-tests",
+        type=int,
+        default=None,
+        help="Exit with 1 if more tests stopped covering the locators they covered",
+    )
+    args = parser.parse_args()
+
+    diff = diff_coverage(args.baseline, args.current)
+    failures = exceeded_limits(diff.summary, args.max_removed, args.max_lost_tests)
+    report = {**diff.as_dict(), "passed": not failures, "failures": failures}
+    if args.output is None:
+        print(json.dumps(report, indent=4))
+    else:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=4)
+        print(json.dumps(asdict(diff.summary)))
+    for message in failures:
+        print(message, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
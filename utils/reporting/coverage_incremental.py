@@ -0,0 +1,345 @@
+"""Incremental merge of the used_locators files.
+
+A manifest of the merged inputs (content hash, size, mtime) and the merge state
+with the provenance of every record are kept beside the aggregate:
+
+    <output dir>/used_locators.manifest (JSON)
+    <output dir>/used_locators.state.pickle
+
+On the next run only new and changed input files are read. The contributions of
+changed and removed files are retracted: a record stays in the aggregate while any
+input still contains it. Records are deduplicated by (page_url, xpath, allure_id)
+(the test title for the tests without it) like in CoverageMerger, the record of the first input in the order of the file names
+wins, so the aggregate has the same records as a full merge of the same inputs.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import pickle
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.reporting.coverage_merge import Pages, PathLike, read_coverage_pages
+from utils.reporting.test_context import IdentityKey, identity_key
+
+# not a .json file, so it is never taken for a worker file
+MANIFEST_FILENAME = "used_locators.manifest"
+STATE_FILENAME = "used_locators.state.pickle"
+# bumped when the state structure changes, older states are rebuilt from scratch
+STATE_VERSION = 2
+
+HASH_CHUNK_SIZE = 1 << 20
+
+# (page_url, xpath, (allure_id, test_name if there is no allure_id))
+RecordKey = Tuple[str, str, IdentityKey]
+# [the winning record, names of the inputs containing its key in sorted order]
+# The record is (test_name, is_block, original_page_url, outer_xpath).
+# Strings and input tuples are interned, so the pickled state stores them once.
+Entry = List
+RECORD, INPUTS = 0, 1
+
+
+def file_hash(file_path: PathLike) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class InputFile:
+    """Manifest entry of a merged input file"""
+
+    sha256: str
+    size: int
+    mtime_ns: int
+    records: int = 0
+
+
+@dataclass
+class MergeSummary:
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    records: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class IncrementalMerger:
+    """Keeps the merged pages between the runs and updates them with the changed inputs.
+    The state is loaded only if any input changed.
+
+    :param state_directory: directory of the manifest and the state files
+    """
+
+    def __init__(self, state_directory: PathLike):
+        self.state_directory = Path(state_directory)
+        self.manifest_path = self.state_directory / MANIFEST_FILENAME
+        self.state_path = self.state_directory / STATE_FILENAME
+        self.inputs: Dict[str, InputFile] = {}
+        self._state_id: Optional[str] = None
+        self._pages: Optional[Dict[str, Dict[str, Dict[IdentityKey, Entry]]]] = None
+        self._strings: Dict[Optional[str], Optional[str]] = {}
+        self._input_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        self._records: Optional[int] = None
+        self._modified = False
+        self._load_manifest()
+
+    def _load_manifest(self):
+        if not (self.manifest_path.exists() and self.state_path.exists()):
+            return
+        with open(self.manifest_path) as file:
+            manifest = json.load(file)
+        if manifest.get("version") != STATE_VERSION:
+            return
+        self._state_id = manifest["state_id"]
+        self._records = manifest["records"]
+        self.inputs = {k: InputFile(**v) for k, v in manifest["inputs"].items()}
+
+    @property
+    def _state(self) -> Dict[str, Dict[str, Dict[IdentityKey, Entry]]]:
+        if self._pages is None:
+            self._load_state()
+        return self._pages
+
+    def _load_state(self) -> bool:
+        """Returns False if the state does not match the manifest and is started over."""
+        self._pages = {}
+        if self._state_id is None:
+            return True
+        with open(self.state_path, "rb") as file:
+            state = pickle.load(file)
+        if state.get("state_id") != self._state_id:
+            # the state was written by another run than the manifest
+            self.inputs = {}
+            self._state_id = self._records = None
+            return False
+        self._pages = state["pages"]
+        # the interned objects are shared in the loaded state as well
+        for xpaths in self._pages.values():
+            for entries in xpaths.values():
+                for entry in entries.values():
+                    inputs = self._input_tuples.setdefault(entry[INPUTS], entry[INPUTS])
+                    entry[INPUTS] = inputs
+        return True
+
+    def __len__(self) -> int:
+        return sum(
+            len(records)
+            for xpaths in self._state.values()
+            for records in xpaths.values()
+        )
+
+    def _is_unchanged(self, name: str, file_path: Path) -> bool:
+        known = self.inputs.get(name)
+        if known is None:
+            return False
+        stat = file_path.stat()
+        if known.size != stat.st_size:
+            return False
+        if known.mtime_ns == stat.st_mtime_ns:
+            return True
+        # touched or copied again: compare the content
+        if known.sha256 == file_hash(file_path):
+            known.mtime_ns = stat.st_mtime_ns
+            return True
+        return False
+
+    @property
+    def modified(self) -> bool:
+        """False if the last update did not change the merged pages."""
+        return self._modified
+
+    def update(self, file_paths: Iterable[PathLike]) -> MergeSummary:
+        """Fold in the new and changed files, retract the changed and removed ones.
+        Inputs are identified by their file names.
+        """
+        file_paths = {Path(x).name: Path(x) for x in file_paths}
+        summary = self._compare(file_paths)
+        self._modified = bool(summary.added or summary.changed or summary.removed)
+        if self._modified and self._pages is None and not self._load_state():
+            summary = self._compare(file_paths)
+
+        self._retract(set(summary.removed) | set(summary.changed), file_paths)
+        for name in summary.removed:
+            del self.inputs[name]
+        for name in summary.added + summary.changed:
+            file_path = file_paths[name]
+            stat = file_path.stat()
+            self.inputs[name] = InputFile(
+                file_hash(file_path),
+                stat.st_size,
+                stat.st_mtime_ns,
+                self._add(name, file_path),
+            )
+        summary.records = len(self) if self._modified else self._manifest_records
+        return summary
+
+    def _compare(self, file_paths: Dict[str, Path]) -> MergeSummary:
+        summary = MergeSummary()
+        for name, file_path in sorted(file_paths.items()):
+            if self._is_unchanged(name, file_path):
+                summary.unchanged += 1
+            else:
+                (summary.changed if name in self.inputs else summary.added).append(name)
+        summary.removed = sorted(set(self.inputs) - set(file_paths))
+        return summary
+
+    @property
+    def _manifest_records(self) -> int:
+        return self._records if self._records is not None else len(self)
+
+    def _intern(self, value: Optional[str]) -> Optional[str]:
+        return self._strings.setdefault(value, value)
+
+    def _with_input(self, inputs: Tuple[str, ...], i: int, name: str):
+        inputs = inputs[:i] + (name,) + inputs[i:]
+        return self._input_tuples.setdefault(inputs, inputs)
+
+    def _add(self, name: str, file_path: Path) -> int:
+        """Add the records of the input, returns the number of its distinct records."""
+        pages = self._state
+        records = 0
+        intern = self._intern
+        for page_url, xpaths in read_coverage_pages(file_path):
+            merged_xpaths = pages.setdefault(intern(page_url), {})
+            for xpath, test_cases in xpaths.items():
+                entries = merged_xpaths.setdefault(intern(xpath), {})
+                for item in test_cases:
+                    key = identity_key(item["allure_id"], item["test_name"])
+                    entry = entries.get(key)
+                    if entry is not None:
+                        inputs = entry[INPUTS]
+                        i = bisect.bisect_left(inputs, name)
+                        if i < len(inputs) and inputs[i] == name:
+                            # a duplicate within the file, the first one wins
+                            continue
+                        entry[INPUTS] = self._with_input(inputs, i, name)
+                        records += 1
+                        if i > 0:
+                            continue
+                    else:
+                        key = (intern(key[0]), intern(key[1]))
+                        entry = entries[key] = [
+                            None,
+                            self._with_input((), 0, name),
+                        ]
+                        records += 1
+                    entry[RECORD] = (
+                        intern(item["test_name"]),
+                        item["is_block"],
+                        intern(item["original_page_url"]),
+                        intern(item["outer_xpath"]),
+                    )
+        return records
+
+    def _retract(self, names: Set[str], file_paths: Dict[str, Path]):
+        """Remove the contributions of the inputs. If the winning record is retracted,
+        it is replaced with the record of the next input containing the key.
+        """
+        if not names:
+            return
+        pages = self._state
+        # input name -> keys whose record has to be read from it
+        replacements: Dict[str, Set[RecordKey]] = defaultdict(set)
+        # entries of the same inputs share the tuple, so every tuple is checked once
+        remaining: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+        for inputs in list(self._input_tuples):
+            if not names.isdisjoint(inputs):
+                kept = tuple(x for x in inputs if x not in names)
+                remaining[inputs] = self._input_tuples.setdefault(kept, kept)
+        empty_xpaths = []
+        for page_url, xpaths in pages.items():
+            for xpath, entries in xpaths.items():
+                retracted = [
+                    x for x, entry in entries.items() if entry[INPUTS] in remaining
+                ]
+                for key in retracted:
+                    entry = entries[key]
+                    inputs = remaining[entry[INPUTS]]
+                    if not inputs:
+                        del entries[key]
+                        continue
+                    if inputs[0] != entry[INPUTS][0]:
+                        entry[RECORD] = None
+                        replacements[inputs[0]].add((page_url, xpath, key))
+                    entry[INPUTS] = inputs
+                if not entries:
+                    empty_xpaths.append((page_url, xpath))
+        for page_url, xpath in empty_xpaths:
+            del pages[page_url][xpath]
+            if not pages[page_url]:
+                del pages[page_url]
+        for inputs in remaining:
+            del self._input_tuples[inputs]
+
+        for name, keys in replacements.items():
+            for page_url, xpaths in read_coverage_pages(file_paths[name]):
+                if not keys:
+                    break
+                for xpath, test_cases in xpaths.items():
+                    for item in test_cases:
+                        test = identity_key(item["allure_id"], item["test_name"])
+                        key = (page_url, xpath, test)
+                        if key in keys:
+                            keys.discard(key)
+                            pages[page_url][xpath][test][RECORD] = (
+                                self._intern(item["test_name"]),
+                                item["is_block"],
+                                self._intern(item["original_page_url"]),
+                                self._intern(item["outer_xpath"]),
+                            )
+
+    def pages(self) -> Pages:
+        """Merged pages in the used_locators.json structure"""
+        return {
+            page_url: {
+                xpath: [
+                    {
+                        "allure_id": key[0],
+                        "is_block": entry[RECORD][1],
+                        "test_name": entry[RECORD][0],
+                        "original_page_url": entry[RECORD][2],
+                        "outer_xpath": entry[RECORD][3],
+                    }
+                    for key, entry in entries.items()
+                ]
+                for xpath, entries in xpaths.items()
+            }
+            for page_url, xpaths in self._state.items()
+        }
+
+    def save(self):
+        """Write the state (if it changed) and then the manifest, both atomically."""
+        self.state_directory.mkdir(parents=True, exist_ok=True)
+        if self._modified or self._state_id is None:
+            self._state_id = uuid.uuid4().hex
+            state = pickle.dumps(
+                {"pages": self._state, "state_id": self._state_id},
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+            _replace(self.state_path, state)
+            self._records = len(self)
+        manifest = {
+            "version": STATE_VERSION,
+            "state_id": self._state_id,
+            "records": self._manifest_records,
+            "inputs": {k: asdict(v) for k, v in sorted(self.inputs.items())},
+        }
+        _replace(self.manifest_path, json.dumps(manifest, indent=4).encode())
+
+
+def _replace(file_path: Path, data: bytes):
+    tmp_path = file_path.with_name(f"{file_path.name}.tmp")
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, file_path)
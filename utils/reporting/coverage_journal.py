@@ -0,0 +1,177 @@
+import json
+import os
+import threading
+import uuid
+import warnings
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+from core.environment_variables_setup import (
+    UI_COVERAGE_JOURNAL_FLUSH_RECORDS,
+    UI_COVERAGE_JOURNAL_FLUSH_SECONDS,
+)
+from utils.reporting.coverage_store import UsedLocatorsStore
+
+JOURNAL_SUFFIX = ".ndjson"
+# id of the last test session started in the directory, written by the controller
+SESSION_FILENAME = "used_locators.session"
+# the id is passed to the xdist workers, they are started after the controller
+SESSION_ENV = "UI_COVERAGE_SESSION"
+
+JournalEntry = Tuple[
+    str, Union[str, List[str]], Optional[str], str, bool, str, Optional[str]
+]
+
+
+def journal_path(directory: Path, worker_id: str) -> Path:
+    return directory / f"used_locators_{worker_id}{JOURNAL_SUFFIX}"
+
+
+def start_session(directory: Path) -> str:
+    """Called by the controller (or the only process) before the workers start.
+    Journals of the other sessions are not compacted (see compact_journals).
+    """
+    session_id = os.environ.setdefault(SESSION_ENV, uuid.uuid4().hex)
+    (Path(directory) / SESSION_FILENAME).write_text(session_id)
+    return session_id
+
+
+def current_session(directory: Path) -> Optional[str]:
+    path = Path(directory) / SESSION_FILENAME
+    return path.read_text().strip() if path.exists() else None
+
+
+class CoverageJournal:
+    """Append-only NDJSON journal of the locators recorded by one worker.
+
+    The first line is {"session": <id of the test session>} (see start_session),
+    every next line is a JSON array with the UsedLocatorsStore.add arguments:
+    [page_url, xpath, allure_id, test_name, is_block, original_page_url, outer_xpath]
+    The xpath is a list if it was recorded as a chain of block xpaths.
+    Entries are buffered in memory and written by a background thread
+    when flush_records entries are buffered or every flush_seconds.
+    If the worker dies, everything written so far can be restored by compact_journal.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        flush_records: int = UI_COVERAGE_JOURNAL_FLUSH_RECORDS,
+        flush_seconds: float = UI_COVERAGE_JOURNAL_FLUSH_SECONDS,
+        session_id: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        self.session_id = session_id or os.environ.get(SESSION_ENV)
+        self.flush_records = flush_records
+        self.flush_seconds = flush_seconds
+        self._buffer: List[JournalEntry] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake_up = threading.Event()
+        self._closed = False
+        self._file = None
+        self._thread = threading.Thread(
+            target=self._run, name="ui-coverage-journal", daemon=True
+        )
+        self._thread.start()
+
+    def append(self, entry: JournalEntry):
+        with self._lock:
+            self._buffer.append(entry)
+            buffered = len(self._buffer)
+        if buffered >= self.flush_records:
+            self._wake_up.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake_up.wait(self.flush_seconds)
+            self._wake_up.clear()
+            self.flush()
+
+    def flush(self):
+        """Write all buffered entries to the journal file."""
+        with self._lock:
+            entries, self._buffer = self._buffer, []
+        if not entries:
+            return
+
+        with self._write_lock:
+            if self._file is None:
+                # the file is created on the first write, so idle workers leave nothing
+                self._file = open(self.path, "w")
+                self._file.write(json.dumps({"session": self.session_id}) + "\n")
+            self._file.write(
+                "".join(
+                    json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries
+                )
+            )
+            self._file.flush()
+
+    def close(self):
+        """Stop the writer thread and write the rest of the buffer."""
+        self._closed = True
+        self._wake_up.set()
+        self._thread.join()
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def remove(self):
+        if self.path.exists():
+            os.remove(self.path)
+
+
+def read_journal(path: Path, store: UsedLocatorsStore = None) -> UsedLocatorsStore:
+    """Load journal entries into the store. A partially written last line is ignored."""
+    store = store if store is not None else UsedLocatorsStore()
+    with open(path, "r") as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # the worker was killed in the middle of writing
+                continue
+            if isinstance(entry, list):
+                store.add(*entry)
+    return store
+
+
+def journal_session(path: Path) -> Optional[str]:
+    """Id of the session that wrote the journal, None if it is unknown."""
+    with open(path, "r") as file:
+        try:
+            header = json.loads(file.readline())
+        except json.JSONDecodeError:
+            return None
+    return header.get("session") if isinstance(header, dict) else None
+
+
+def compact_journal(path: Path, output_path: Path = None) -> Optional[Path]:
+    """Convert the journal to the used_locators_<worker>.json file and remove it."""
+    path = Path(path)
+    output_path = output_path or path.with_suffix(".json")
+    store = read_journal(path)
+    if store:
+        store.dump(output_path)
+    os.remove(path)
+    return output_path if store else None
+
+
+def compact_journals(directory: Path) -> List[Path]:
+    """Compact journals left by workers that did not finish their session.
+    Journals of an earlier session than the last one started in the directory
+    are skipped with a warning: their coverage is stale.
+    """
+    session_id = current_session(directory)
+    output_paths = []
+    for path in sorted(Path(directory).glob(f"used_locators_*{JOURNAL_SUFFIX}")):
+        journal_session_id = journal_session(path)
+        if session_id and journal_session_id and journal_session_id != session_id:
+            warnings.warn(f"{path} is left by an earlier test session, skipped")
+            continue
+        output_path = compact_journal(path)
+        if output_path is not None:
+            output_paths.append(output_path)
+    return output_paths
@@ -0,0 +1,197 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from utils.reporting.coverage_columnar import SUFFIX as COLUMNAR_SUFFIX
+from utils.reporting.coverage_columnar import ColumnarReader, ColumnarWriter
+from utils.reporting.test_context import identity_key
+
+OUTPUT_FILENAME = "used_locators.json"
+READ_CHUNK_SIZE = 1 << 20
+
+PathLike = Union[str, Path]
+Pages = Dict[str, Dict[str, List[dict]]]
+
+_decoder = json.JSONDecoder()
+
+
+class _StreamReader:
+    """Reads a text file in chunks and decodes JSON values one by one."""
+
+    def __init__(self, file: IO[str], chunk_size: int = READ_CHUNK_SIZE):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _read_more(self) -> bool:
+        if self._eof:
+            return False
+        # read at least as much as is buffered to keep retries linear
+        chunk = self._file.read(max(self._chunk_size, len(self._buffer)))
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _skip_whitespaces(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._read_more():
+                return
+
+    def peek_char(self) -> str:
+        """Skip whitespaces and return the next character without consuming it."""
+        self._skip_whitespaces()
+        if self._pos >= len(self._buffer):
+            raise ValueError("Unexpected end of the coverage file")
+        return self._buffer[self._pos]
+
+    def next_char(self) -> str:
+        char = self.peek_char()
+        self._pos += 1
+        return char
+
+    def next_value(self):
+        """Skip whitespaces and decode the next JSON value."""
+        self._skip_whitespaces()
+        while True:
+            try:
+                value, self._pos = _decoder.raw_decode(self._buffer, self._pos)
+                return value
+            except json.JSONDecodeError:
+                # the value may be cut by the chunk boundary
+                if not self._read_more():
+                    raise
+
+
+def iter_coverage_pages(file: IO[str]) -> Iterator[Tuple[str, Dict[str, List[dict]]]]:
+    """Incrementally parse a used_locators JSON file.
+
+    Yields (page_url, {xpath: [records]}) pairs one page at a time,
+    so only a single page of the file has to be in memory.
+    """
+    reader = _StreamReader(file)
+    if reader.next_char() != "{":
+        raise ValueError("Coverage file must contain a JSON object")
+    if reader.peek_char() == "}":
+        return
+
+    while True:
+        if reader.peek_char() != '"':
+            raise ValueError("Expected a page URL in the coverage file")
+        page_url = reader.next_value()
+        if reader.next_char() != ":":
+            raise ValueError("Expected ':' after the page URL in the coverage file")
+        yield page_url, reader.next_value()
+
+        char = reader.next_char()
+        if char == "}":
+            return
+        if char != ",":
+            raise ValueError(f"Unexpected character in the coverage file: {char!r}")
+
+
+def read_coverage_pages(
+    file_path: PathLike,
+) -> Iterator[Tuple[str, Dict[str, List[dict]]]]:
+    """Yield (page_url, {xpath: [records]}) of a JSON or a .uicov coverage file."""
+    if Path(file_path).suffix == COLUMNAR_SUFFIX:
+        yield from ColumnarReader(file_path).iter_pages()
+        return
+    with open(file_path, "r") as file:
+        yield from iter_coverage_pages(file)
+
+
+class CoverageMerger:
+    """Merge used_locators data of several workers in linear time.
+
+    Pages, xpaths and records keep the order in which they are seen first.
+    Records of the same (page_url, xpath) are deduplicated by allure_id
+    (by the test title for the tests without it), the first one wins.
+    """
+
+    def __init__(self):
+        self.pages: Pages = {}
+        self._seen: Dict[Tuple[str, str], set] = {}
+
+    def add_page(self, page_url: str, xpaths: Dict[str, List[dict]]):
+        merged_xpaths = self.pages.setdefault(page_url, {})
+        for xpath, test_cases in xpaths.items():
+            merged_test_cases = merged_xpaths.setdefault(xpath, [])
+            seen = self._seen.setdefault((page_url, xpath), set())
+            for item in test_cases:
+                key = identity_key(item["allure_id"], item["test_name"])
+                if key not in seen:
+                    seen.add(key)
+                    merged_test_cases.append(item)
+
+    def add_pages(self, pages: Iterable[Tuple[str, Dict[str, List[dict]]]]):
+        for page_url, xpaths in pages:
+            self.add_page(page_url, xpaths)
+
+
+def load_coverage_file(file_path: PathLike) -> List[Tuple[str, Dict[str, List[dict]]]]:
+    """Read a worker file and remove its duplicated records."""
+    merger = CoverageMerger()
+    merger.add_pages(read_coverage_pages(file_path))
+    return list(merger.pages.items())
+
+
+def find_coverage_files(
+    input_dir_path: PathLike, exclude: Optional[PathLike] = None
+) -> List[Path]:
+    exclude = Path(exclude).resolve() if exclude else None
+    return [
+        Path(input_dir_path) / filename
+        for filename in sorted(os.listdir(input_dir_path))
+        if filename.endswith((".json", COLUMNAR_SUFFIX))
+        and (Path(input_dir_path) / filename).resolve() != exclude
+    ]
+
+
+def merge_coverage_files(file_paths: List[PathLike], workers: int = 1) -> Pages:
+    """Merge worker files. Files are parsed in parallel when workers > 1.
+    Every file is parsed page by page, but the merged pages are kept in memory
+    until they are written (see coverage_reduce.py for a merge with bounded memory).
+    """
+    merger = CoverageMerger()
+    if workers > 1 and len(file_paths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # results are folded in the order of files to keep the output stable
+            for pages in executor.map(load_coverage_file, file_paths):
+                merger.add_pages(pages)
+    else:
+        for file_path in file_paths:
+            merger.add_pages(read_coverage_pages(file_path))
+    return merger.pages
+
+
+def write_coverage_file(pages: Pages, output_file_path: PathLike, indent: int = None):
+    """Write merged data. Compact JSON is written unless indent is set.
+    A .uicov file is written if the output file has its suffix.
+    """
+    if Path(output_file_path).suffix == COLUMNAR_SUFFIX:
+        with ColumnarWriter(output_file_path) as writer:
+            for page_url, xpaths in pages.items():
+                for xpath, records in xpaths.items():
+                    for x in records:
+                        writer.add(
+                            page_url,
+                            xpath,
+                            x["allure_id"],
+                            x["test_name"],
+                            x["is_block"],
+                            x["original_page_url"],
+                            x["outer_xpath"],
+                        )
+        return
+    separators = None if indent is not None else (",", ":")
+    with open(output_file_path, "w") as output_file:
+        json.dump(pages, output_file, indent=indent, separators=separators)
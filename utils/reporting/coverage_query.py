@@ -0,0 +1,288 @@
+"""Indexed queries over a merged coverage file (used_locators.json or .uicov).
+
+The file is read once into a list of records and indexes by page_url, xpath
+(also by its canonical form, see XpathNormalizer), allure_id, test_name and is_block,
+so a lookup costs O(1) plus the number of the matched records. With use_index=True
+the records and the indexes are pickled to a sidecar file beside the coverage file
+(<coverage file>.index.pickle) and the next load skips parsing it while the file
+is unchanged (same size and mtime).
+
+Usage:
+    python -m utils.reporting.coverage_query tests "//button[@id='ok']"
+    python -m utils.reporting.coverage_query locators --allure-id 3
+    python -m utils.reporting.coverage_query --index --coverage-file used_locators.uicov pages
+"""
+
+import argparse
+import json
+import os
+import pickle
+from array import array
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from operator import itemgetter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import rootpath
+
+from utils.reporting.coverage_columnar import COLUMNS, Record
+from utils.reporting.coverage_merge import (
+    OUTPUT_FILENAME,
+    PathLike,
+    read_coverage_pages,
+)
+from utils.reporting.xpath_normalizer import xpath_normalizer
+
+INDEX_SUFFIX = ".index.pickle"
+# bumped when the pickled structure changes, older sidecars are rebuilt
+INDEX_VERSION = 1
+
+PAGE_URL, XPATH, ALLURE_ID, TEST_NAME, IS_BLOCK = range(5)
+# indexed column -> its name in the queries
+_INDEXED = {
+    "page_url": PAGE_URL,
+    "xpath": XPATH,
+    "allure_id": ALLURE_ID,
+    "test_name": TEST_NAME,
+    "is_block": IS_BLOCK,
+}
+
+_test_of = itemgetter(ALLURE_ID, TEST_NAME)
+_locator_of = itemgetter(PAGE_URL, XPATH)
+
+# positions of the records in `CoverageQuery.records`
+Positions = array
+
+
+@dataclass
+class PageSummary:
+    page_url: str
+    locators: int
+    block_locators: int
+    records: int
+    tests: int
+
+
+class CoverageQuery:
+    """Records of a coverage file with an index per queried column.
+
+    :param records: (page_url, xpath, allure_id, test_name, is_block,
+        original_page_url, outer_xpath) tuples in the order of the file
+    """
+
+    def __init__(self, records: Sequence[Record]):
+        self.records: List[Record] = list(records)
+        indexes = [defaultdict(lambda: array("I")) for _ in _INDEXED]
+        for position, record in enumerate(self.records):
+            for column, index in enumerate(indexes):
+                index[record[column]].append(position)
+        self._indexes: List[Dict[object, Positions]] = [dict(x) for x in indexes]
+        # canonical xpath -> the recorded xpaths written differently
+        self._canonical_xpaths: Dict[str, List[str]] = {}
+        for xpath in self._indexes[XPATH]:
+            canonical = xpath_normalizer.normalize(xpath)
+            if canonical != xpath:
+                self._canonical_xpaths.setdefault(canonical, []).append(xpath)
+
+    @classmethod
+    def from_file(cls, file_path: PathLike) -> "CoverageQuery":
+        # repeated strings are stored once, in memory and in the sidecar
+        intern = {}.setdefault
+        return cls(
+            (
+                intern(page_url, page_url),
+                intern(xpath, xpath),
+                intern(x["allure_id"], x["allure_id"]),
+                intern(x["test_name"], x["test_name"]),
+                bool(x["is_block"]),
+                intern(x["original_page_url"], x["original_page_url"]),
+                intern(x["outer_xpath"], x["outer_xpath"]),
+            )
+            for page_url, xpaths in read_coverage_pages(file_path)
+            for xpath, records in xpaths.items()
+            for x in records
+        )
+
+    @classmethod
+    def load(cls, file_path: PathLike, use_index: bool = False) -> "CoverageQuery":
+        """Read the coverage file, or its index sidecar if use_index is set and it is
+        up to date. A missing or outdated sidecar is (re)written."""
+        if not use_index:
+            return cls.from_file(file_path)
+        file_path = Path(file_path)
+        index_path = file_path.with_name(file_path.name + INDEX_SUFFIX)
+        stat = file_path.stat()
+        source = [stat.st_size, stat.st_mtime_ns]
+        if index_path.exists():
+            with open(index_path, "rb") as file:
+                state = pickle.load(file)
+            if state.get("version") == INDEX_VERSION and state.get("source") == source:
+                query = cls.__new__(cls)
+                query.records = state["records"]
+                query._indexes = state["indexes"]
+                query._canonical_xpaths = state["canonical_xpaths"]
+                return query
+
+        query = cls.from_file(file_path)
+        state = {
+            "version": INDEX_VERSION,
+            "source": source,
+            "records": query.records,
+            "indexes": query._indexes,
+            "canonical_xpaths": query._canonical_xpaths,
+        }
+        tmp_path = index_path.with_name(f"{index_path.name}.tmp")
+        with open(tmp_path, "wb") as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, index_path)
+        return query
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _values(self, column: int, value) -> List:
+        """Recorded values matching the queried one. An xpath may be recorded
+        in its canonical form or written differently."""
+        if column != XPATH:
+            return [value]
+        canonical = xpath_normalizer.normalize(value)
+        variants = [value, canonical] + self._canonical_xpaths.get(canonical, [])
+        return list(dict.fromkeys(variants))
+
+    def _positions(self, column: int, values: List) -> Positions:
+        index = self._indexes[column]
+        matched = [index[x] for x in values if x in index]
+        if len(matched) == 1:
+            return matched[0]
+        return array("I", sorted(x for positions in matched for x in positions))
+
+    def find(self, **filters) -> Iterator[Record]:
+        """Records matching all filters (page_url, xpath, allure_id, test_name, is_block)
+        in the order of the file. The records of the smallest index entry are scanned
+        and checked against the other filters.
+        """
+        unknown = set(filters) - set(_INDEXED)
+        if unknown:
+            raise ValueError(
+                f"Unknown filters {sorted(unknown)}. Expected some of {tuple(_INDEXED)}"
+            )
+        if not filters:
+            yield from self.records
+            return
+        lookups = []
+        for name, value in filters.items():
+            column = _INDEXED[name]
+            values = self._values(column, value)
+            lookups.append((self._positions(column, values), column, set(values)))
+        lookups.sort(key=lambda x: len(x[0]))
+        records = map(self.records.__getitem__, lookups[0][0])
+        checks = [(column, values) for _, column, values in lookups[1:]]
+        if not checks:
+            yield from records
+            return
+        for record in records:
+            if all(record[column] in values for column, values in checks):
+                yield record
+
+    def tests_for_xpath(
+        self, xpath: str, page_url: Optional[str] = None
+    ) -> List[Tuple[Optional[str], str]]:
+        """(allure_id, test_name) of the tests that used the xpath"""
+        filters = {"xpath": xpath}
+        if page_url is not None:
+            filters["page_url"] = page_url
+        return list(dict.fromkeys(map(_test_of, self.find(**filters))))
+
+    def locators_for_test(
+        self, allure_id: Optional[str] = None, test_name: Optional[str] = None
+    ) -> List[Tuple[str, str]]:
+        """(page_url, xpath) of the locators used by the test"""
+        filters = {}
+        if allure_id is not None:
+            filters["allure_id"] = str(allure_id)
+        if test_name is not None:
+            filters["test_name"] = test_name
+        if not filters:
+            raise ValueError("Set allure_id or test_name")
+        return list(dict.fromkeys(map(_locator_of, self.find(**filters))))
+
+    def pages(self) -> List[PageSummary]:
+        """Coverage by page, in the order of the file"""
+        summaries = []
+        for page_url, positions in self._indexes[PAGE_URL].items():
+            records = [self.records[x] for x in positions]
+            summaries.append(
+                PageSummary(
+                    page_url,
+                    locators=len({x[XPATH] for x in records}),
+                    block_locators=len({x[XPATH] for x in records if x[IS_BLOCK]}),
+                    records=len(records),
+                    tests=len({(x[ALLURE_ID], x[TEST_NAME]) for x in records}),
+                )
+            )
+        return summaries
+
+
+def _record_dict(record: Record) -> dict:
+    return dict(zip(COLUMNS, record))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query a merged coverage file")
+    parser.add_argument(
+        "--coverage-file",
+        type=Path,
+        default=rootpath.detect() / Path(OUTPUT_FILENAME),
+        help="Merged used_locators.json or .uicov file",
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help=f"Read and keep the <coverage file>{INDEX_SUFFIX} sidecar",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    tests = commands.add_parser("tests", help="Tests that used the xpath")
+    tests.add_argument("xpath")
+    tests.add_argument("--page-url")
+    locators = commands.add_parser("locators", help="Locators used by the test")
+    locators.add_argument("--allure-id")
+    locators.add_argument("--test-name")
+    commands.add_parser("pages", help="Coverage by page")
+    records = commands.add_parser("records", help="Records matching all filters")
+    records.add_argument("--page-url")
+    records.add_argument("--xpath")
+    records.add_argument("--allure-id")
+    records.add_argument("--test-name")
+    records.add_argument("--is-block", choices=("true", "false"))
+    args = parser.parse_args()
+    if args.command == "locators" and args.allure_id is None and args.test_name is None:
+        parser.error("locators requires --allure-id or --test-name")
+
+    query = CoverageQuery.load(args.coverage_file, use_index=args.index)
+    if args.command == "tests":
+        result = [
+            {"allure_id": x, "test_name": y}
+            for x, y in query.tests_for_xpath(args.xpath, args.page_url)
+        ]
+    elif args.command == "locators":
+        result = [
+            {"page_url": x, "xpath": y}
+            for x, y in query.locators_for_test(args.allure_id, args.test_name)
+        ]
+    elif args.command == "pages":
+        result = [asdict(x) for x in query.pages()]
+    else:
+        filters = {
+            k: getattr(args, k)
+            for k in ("page_url", "xpath", "allure_id", "test_name")
+            if getattr(args, k) is not None
+        }
+        if args.is_block is not None:
+            filters["is_block"] = args.is_block == "true"
+        result = [_record_dict(x) for x in query.find(**filters)]
+    print(json.dumps(result, indent=4))
+
+
+if __name__ == "__main__":
+    main()
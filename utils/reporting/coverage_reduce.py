@@ -0,0 +1,264 @@
+"""Parallel merge of the used_locators files of many CI machines.
+
+Every input source (a directory or a .zip/.tar/.tar.gz archive with the
+used_locators_<worker>.json or .uicov files of one machine) is read by a map task,
+which streams its records into spill files partitioned by the hash of the page URL.
+Every partition is then merged by a reduce task, the partitions are independent
+because all records of a page are in the same one. The merged partitions are
+concatenated into the output file.
+
+Map and reduce tasks run in a process pool. Only one page of a source is in memory
+in a map task, and one partition in a reduce task, so the memory is bounded by
+the largest partition and the wall time is close to the time of merging it.
+
+Records are deduplicated like in CoverageMerger: the first record of
+(page_url, xpath, allure_id) wins, in the order of the sources and their files.
+"""
+
+import io
+import json
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from utils.reporting.coverage_columnar import SUFFIX as COLUMNAR_SUFFIX
+from utils.reporting.coverage_columnar import NONE, ColumnarReader, ColumnarWriter
+from utils.reporting.coverage_journal import compact_journals
+from utils.reporting.coverage_merge import (
+    CoverageMerger,
+    Pages,
+    PathLike,
+    find_coverage_files,
+    iter_coverage_pages,
+    read_coverage_pages,
+    write_coverage_file,
+)
+
+DEFAULT_PARTITIONS = 16
+ARCHIVE_SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+COVERAGE_SUFFIXES = (".json", COLUMNAR_SUFFIX)
+
+PageItems = Iterator[Tuple[str, dict]]
+
+
+def is_archive(path: PathLike) -> bool:
+    return Path(path).name.endswith(ARCHIVE_SUFFIXES)
+
+
+def partition_of(page_url: str, partitions: int) -> int:
+    """Stable partition of the page, the same in every process"""
+    return zlib.crc32(page_url.encode()) % partitions
+
+
+def _is_coverage_member(name: str) -> bool:
+    name = Path(name).name
+    return name.startswith("used_locators") and name.endswith(COVERAGE_SUFFIXES)
+
+
+def _read_archive_member(opener: Callable, name: str, tmp_dir: Path) -> PageItems:
+    with opener() as member:
+        if name.endswith(COLUMNAR_SUFFIX):
+            # the columnar reader seeks, so the member is extracted
+            file_path = tmp_dir / Path(name).name
+            with open(file_path, "wb") as file:
+                shutil.copyfileobj(member, file)
+            yield from ColumnarReader(file_path).iter_pages()
+            os.remove(file_path)
+        else:
+            yield from iter_coverage_pages(io.TextIOWrapper(member, encoding="utf-8"))
+
+
+def iter_source_pages(
+    source: PathLike, tmp_dir: PathLike, exclude: Optional[PathLike] = None
+) -> PageItems:
+    """Yield (page_url, {xpath: [records]}) of all coverage files of the source,
+    file by file in the order of their names. .uicov members of archives
+    are extracted to tmp_dir."""
+    source, tmp_dir = Path(source), Path(tmp_dir)
+    if source.is_dir():
+        for file_path in find_coverage_files(source, exclude=exclude):
+            yield from read_coverage_pages(file_path)
+    elif source.name.endswith(".zip"):
+        with zipfile.ZipFile(source) as archive:
+            for name in sorted(x for x in archive.namelist() if _is_coverage_member(x)):
+                yield from _read_archive_member(
+                    lambda n=name: archive.open(n), name, tmp_dir
+                )
+    elif source.name.endswith(ARCHIVE_SUFFIXES):
+        with tarfile.open(source) as archive:
+            members = sorted(
+                (x for x in archive.getmembers() if x.isfile()),
+                key=lambda x: x.name,
+            )
+            for member in members:
+                if _is_coverage_member(member.name):
+                    yield from _read_archive_member(
+                        lambda m=member: archive.extractfile(m), member.name, tmp_dir
+                    )
+    else:
+        yield from read_coverage_pages(source)
+
+
+def _spill_path(spill_dir: Path, source_index: int, partition: int) -> Path:
+    return (
+        spill_dir / f"part{partition:04}" / f"source{source_index:06}{COLUMNAR_SUFFIX}"
+    )
+
+
+def map_source(
+    source: PathLike,
+    source_index: int,
+    spill_dir: PathLike,
+    partitions: int,
+    exclude: Optional[PathLike] = None,
+) -> int:
+    """Split the records of the source into the spill files of the partitions.
+    Returns the number of the records."""
+    spill_dir = Path(spill_dir)
+    tmp_dir = spill_dir / f"source{source_index:06}"
+    tmp_dir.mkdir()
+    writers = {}
+    records = 0
+    try:
+        for page_url, xpaths in iter_source_pages(source, tmp_dir, exclude):
+            partition = partition_of(page_url, partitions)
+            writer = writers.get(partition)
+            if writer is None:
+                writer = writers[partition] = ColumnarWriter(
+                    _spill_path(spill_dir, source_index, partition), NONE
+                )
+            for xpath, test_cases in xpaths.items():
+                for x in test_cases:
+                    writer.add(
+                        page_url,
+                        xpath,
+                        x["allure_id"],
+                        x["test_name"],
+                        x["is_block"],
+                        x["original_page_url"],
+                        x["outer_xpath"],
+                    )
+                    records += 1
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return records
+
+
+def reduce_partition(
+    partition_dir: PathLike, output_path: PathLike, indent: Optional[int] = None
+) -> int:
+    """Merge the spill files of a partition in the order of the sources.
+    The pages are written to a .uicov file or as the inside of a JSON object,
+    so the partitions can be concatenated. Returns the number of the merged records.
+    """
+    merger = CoverageMerger()
+    for spill_path in sorted(Path(partition_dir).iterdir()):
+        merger.add_pages(ColumnarReader(spill_path).iter_pages())
+        os.remove(spill_path)
+
+    if Path(output_path).suffix == COLUMNAR_SUFFIX:
+        write_coverage_file(merger.pages, output_path)
+    else:
+        with open(output_path, "w") as file:
+            file.write(_json_fragment(merger.pages, indent))
+    return sum(len(x) for xpaths in merger.pages.values() for x in xpaths.values())
+
+
+def _json_fragment(pages: Pages, indent: Optional[int]) -> str:
+    """The pages formatted like in json.dump(pages, indent=indent), without the braces"""
+    if indent is None:
+        return ",".join(
+            f"{json.dumps(page_url)}:{json.dumps(xpaths, separators=(',', ':'))}"
+            for page_url, xpaths in pages.items()
+        )
+    nested = "\n" + " " * indent
+    return ",\n".join(
+        f"{' ' * indent}{json.dumps(page_url)}: "
+        + json.dumps(xpaths, indent=indent).replace("\n", nested)
+        for page_url, xpaths in pages.items()
+    )
+
+
+def _run(executor: Optional[ProcessPoolExecutor], func: Callable, *iterables) -> list:
+    if executor is None:
+        return list(map(func, *iterables))
+    return list(executor.map(func, *iterables))
+
+
+def reduce_coverage(
+    sources: Sequence[PathLike],
+    output_file_path: PathLike,
+    workers: int = 1,
+    partitions: int = DEFAULT_PARTITIONS,
+    indent: Optional[int] = None,
+    spill_dir: Optional[PathLike] = None,
+) -> dict:
+    """Merge the coverage files of all sources into the output file
+    (used_locators.json or .uicov). Returns the numbers of the input and merged records.
+    """
+    for source in sources:
+        if Path(source).is_dir():
+            # restore coverage of workers that crashed before writing their file
+            compact_journals(source)
+
+    with tempfile.TemporaryDirectory(dir=spill_dir) as directory:
+        directory = Path(directory)
+        for partition in range(partitions):
+            (directory / f"part{partition:04}").mkdir()
+
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            input_records = _run(
+                executor,
+                map_source,
+                sources,
+                range(len(sources)),
+                [directory] * len(sources),
+                [partitions] * len(sources),
+                [output_file_path] * len(sources),
+            )
+            suffix = Path(output_file_path).suffix
+            fragments = [directory / f"part{x:04}{suffix}" for x in range(partitions)]
+            merged_records = _run(
+                executor,
+                reduce_partition,
+                [directory / f"part{x:04}" for x in range(partitions)],
+                fragments,
+                [indent] * partitions,
+            )
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        _concatenate(fragments, output_file_path, indent)
+    return {"input_records": sum(input_records), "records": sum(merged_records)}
+
+
+def _concatenate(
+    fragments: List[Path], output_file_path: PathLike, indent: Optional[int]
+):
+    output_file_path = Path(output_file_path)
+    if output_file_path.suffix == COLUMNAR_SUFFIX:
+        with ColumnarWriter(output_file_path) as writer:
+            for fragment in fragments:
+                for record in ColumnarReader(fragment):
+                    writer.add(*record)
+        return
+
+    fragments = [x for x in fragments if x.stat().st_size]
+    newline = "" if indent is None or not fragments else "\n"
+    with open(output_file_path, "w") as output_file:
+        output_file.write("{" + newline)
+        for i, fragment in enumerate(fragments):
+            if i:
+                output_file.write("," + newline)
+            with open(fragment) as file:
+                shutil.copyfileobj(file, output_file)
+        output_file.write(newline + "}")
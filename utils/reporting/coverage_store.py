@@ -0,0 +1,248 @@
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Sequence, Set, Tuple, Union
+
+from utils.reporting.coverage_columnar import ColumnarWriter
+from utils.reporting.test_context import TestIdentity, IdentityKey, identity_key
+from utils.reporting.xpath_normalizer import xpath_normalizer
+
+RecordKey = Tuple[IdentityKey, bool, Optional[str]]
+# A full xpath or the xpaths of the parent blocks and the element: ('//div', '//a')
+XpathChain = Union[str, Sequence[str]]
+
+
+class LocatorRecord:
+    """A single usage of a locator by a test. Strings are shared with the store."""
+
+    __slots__ = ("test", "is_block", "original_page_url", "outer_xpath")
+
+    def __init__(
+        self,
+        test: TestIdentity,
+        is_block: bool,
+        original_page_url: str,
+        outer_xpath: Optional[str],
+    ):
+        self.test = test
+        self.is_block = is_block
+        self.original_page_url = original_page_url
+        self.outer_xpath = outer_xpath
+
+    def to_dict(self) -> dict:
+        return {
+            "allure_id": self.test[0],
+            "is_block": self.is_block,
+            "test_name": self.test[1],
+            "original_page_url": self.original_page_url,
+            "outer_xpath": self.outer_xpath,
+        }
+
+
+class _XpathNode:
+    """Node of the xpath trie of a page. Every parent block is stored once
+    and shared by all the elements found inside of it.
+    Children are keyed by the canonical xpath (see XpathNormalizer),
+    the spelling is the xpath of the node as it was recorded first."""
+
+    __slots__ = ("children", "records", "spelling")
+
+    def __init__(self, spelling: str = ""):
+        self.children: Dict[str, "_XpathNode"] = {}
+        self.records: Optional[Dict[RecordKey, LocatorRecord]] = None
+        self.spelling = spelling
+
+    def walk(self) -> Iterator[Tuple[str, str, "_XpathNode"]]:
+        """Iterate over (full canonical xpath, full spelling, node)
+        of the node and its descendants."""
+        stack = [("", "", self)]
+        while stack:
+            xpath, spelling, node = stack.pop()
+            yield xpath, spelling, node
+            stack.extend(
+                (xpath + segment, spelling + child.spelling, child)
+                for segment, child in reversed(node.children.items())
+            )
+
+
+@dataclass
+class BlockRollup:
+    """Coverage of a block: the locators used inside of it (the block included)."""
+
+    xpath: str
+    locators: int = 0
+    records: int = 0
+    tests: Set[TestIdentity] = field(default_factory=set)
+
+
+class UsedLocatorsStore:
+    """In-memory storage of the locators used during the test session.
+
+    Records are deduplicated on insert by
+    (page_url, canonical xpath, test, is_block, outer_xpath): the first usage wins.
+    Tests are identified by the allure_id, the ones without it by their titles.
+    Xpaths are written as they were recorded first, so they match the page objects.
+    Xpaths are stored per page in a trie of the block chains (see XpathChain),
+    so the xpath of a parent block is stored once for all of its elements.
+    Test identities and URLs are interned, so repeated strings
+    are stored only once per worker.
+    The store is serialized to the JSON shape consumed by the ui-coverage plugin:
+    {page_url: {xpath: [{allure_id, is_block, test_name, original_page_url, outer_xpath}]}}
+    New records are also appended to the journal (see coverage_journal.py) if it is set.
+    """
+
+    def __init__(self):
+        self._pages: Dict[str, _XpathNode] = {}
+        self._strings: Dict[str, str] = {}
+        self._tests: Dict[TestIdentity, TestIdentity] = {}
+        self._size = 0
+        self.journal = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._size > 0
+
+    def _intern(self, value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return None
+        return self._strings.setdefault(value, value)
+
+    def _node(self, page_url: str, xpath: XpathChain, create: bool = True):
+        node = self._pages.get(page_url)
+        if node is None:
+            if not create:
+                return None
+            node = self._pages[self._intern(page_url)] = _XpathNode()
+        for segment in (xpath,) if isinstance(xpath, str) else xpath:
+            canonical = xpath_normalizer.normalize(segment)
+            child = node.children.get(canonical)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[self._intern(canonical)] = _XpathNode(
+                    self._intern(segment)
+                )
+            node = child
+        return node
+
+    def add(
+        self,
+        page_url: str,
+        xpath: XpathChain,
+        allure_id: Optional[str],
+        test_name: str,
+        is_block: bool,
+        original_page_url: str,
+        outer_xpath: Optional[str] = None,
+    ) -> bool:
+        """Save the locator usage. Returns False if the same usage is already stored.
+        The xpath is either the full xpath or the chain of the block xpaths
+        ending with the xpath of the element (the full xpath is their concatenation).
+        """
+        node = self._node(page_url, xpath)
+        if node.records is None:
+            node.records = {}
+        records = node.records
+
+        key = (identity_key(allure_id, test_name), is_block, outer_xpath)
+        if key in records:
+            return False
+
+        test = (allure_id, test_name)
+        test = self._tests.setdefault(test, test)
+        outer_xpath = self._intern(outer_xpath)
+        records[(identity_key(*test), is_block, outer_xpath)] = LocatorRecord(
+            test, is_block, self._intern(original_page_url), outer_xpath
+        )
+        self._size += 1
+
+        if self.journal is not None:
+            self.journal.append(
+                (
+                    page_url,
+                    xpath if isinstance(xpath, str) else list(xpath),
+                    allure_id,
+                    test_name,
+                    is_block,
+                    original_page_url,
+                    outer_xpath,
+                )
+            )
+        return True
+
+    def _xpaths(self, root: _XpathNode) -> Iterator[Tuple[str, list]]:
+        """(full xpath, records) of a page. Chains with the same canonical concatenation
+        (e.g. ('//div', '//a') and '//div//a') are merged under the first spelling."""
+        merged: Dict[str, Tuple[str, Dict[RecordKey, LocatorRecord]]] = {}
+        for xpath, spelling, node in root.walk():
+            if node.records:
+                records = merged.setdefault(xpath, (spelling, {}))[1]
+                for key, record in node.records.items():
+                    records.setdefault(key, record)
+        for spelling, records in merged.values():
+            yield spelling, list(records.values())
+
+    def items(self) -> Iterator[Tuple[str, str, LocatorRecord]]:
+        """Iterate over (page_url, xpath, record) triples.
+        Pages are in insertion order, xpaths of a page are grouped by their blocks.
+        """
+        for page_url, root in self._pages.items():
+            for xpath, records in self._xpaths(root):
+                for record in records:
+                    yield page_url, xpath, record
+
+    def rollup(self, page_url: str, block_xpath: XpathChain) -> BlockRollup:
+        """Coverage of a block: all the locators recorded with the chain
+        starting with the block chain. Only the subtree of the block is visited."""
+        chain = (block_xpath,) if isinstance(block_xpath, str) else tuple(block_xpath)
+        rollup = BlockRollup("".join(chain))
+        node = self._node(page_url, chain, create=False)
+        if node is None:
+            return rollup
+        for _, _, child in node.walk():
+            if child.records:
+                rollup.locators += 1
+                rollup.records += len(child.records)
+                rollup.tests.update(x.test for x in child.records.values())
+        return rollup
+
+    def to_dict(self) -> Dict[str, Dict[str, list]]:
+        """Convert the store to the ui-coverage plugin JSON structure."""
+        return {
+            page_url: {
+                xpath: [record.to_dict() for record in records]
+                for xpath, records in self._xpaths(root)
+            }
+            for page_url, root in self._pages.items()
+        }
+
+    def dump(self, filepath: Path):
+        """Write the worker JSON file (used_locators_<worker>.json)."""
+        with open(filepath, "w") as file:
+            json.dump(self.to_dict(), file, indent=4, sort_keys=True)
+
+    def dump_columnar(self, filepath: Path, compression: Optional[str] = None):
+        """Write the worker file in the compressed columnar format
+        (used_locators_<worker>.uicov, see coverage_columnar.py)."""
+        with ColumnarWriter(filepath, compression) as writer:
+            for page_url, xpath, record in self.items():
+                writer.add(
+                    page_url,
+                    xpath,
+                    record.test[0],
+                    record.test[1],
+                    record.is_block,
+                    record.original_page_url,
+                    record.outer_xpath,
+                )
+
+    def clear(self):
+        self._pages.clear()
+        self._strings.clear()
+        self._tests.clear()
+        self._size = 0
+
+
+used_locators = UsedLocatorsStore()
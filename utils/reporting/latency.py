@@ -0,0 +1,296 @@
+"""Latency histograms of element lookups, waits, highlights and interactions.
+
+Timings are aggregated per (operation, normalized page URL, xpath) in each worker.
+Enable them with UI_LATENCY_ENABLED=true. When disabled, `timed` returns the decorated
+function unchanged, so the page objects run exactly the same code as without it.
+"""
+
+import csv
+import functools
+import inspect
+import io
+import json
+import math
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import allure
+
+from core.environment_variables_setup import UI_LATENCY_ENABLED
+from utils.reporting.url_normalizer import url_normalizer
+
+# Upper bounds of the buckets grow by 2^(1/8) (~9%),
+# so a percentile is never off by more than one bucket width.
+BUCKETS_PER_DOUBLING = 8
+MIN_LATENCY_MS = 0.001
+PERCENTILES = (50, 95, 99)
+
+LATENCY_FILE_PREFIX = "latency_"
+LATENCY_REPORT_NAME = "ui_latency_report"
+
+_LOG_STEP = math.log(2) / BUCKETS_PER_DOUBLING
+
+# (operation, page_url, xpath)
+LatencyKey = Tuple[str, str, str]
+KeyFunction = Callable[..., Tuple[str, str]]
+
+CSV_COLUMNS = [
+    "operation",
+    "page_url",
+    "xpath",
+    "count",
+    "mean_ms",
+    *(f"p{x}_ms" for x in PERCENTILES),
+    "max_ms",
+    "total_ms",
+]
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram of durations in milliseconds. Histograms can be merged."""
+
+    __slots__ = ("buckets", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, duration_ms: float):
+        index = math.ceil(math.log(max(duration_ms, MIN_LATENCY_MS)) / _LOG_STEP)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.max_ms = max(self.max_ms, other.max_ms)
+
+    def decay(self):
+        """Halve the counts, so older durations weigh less than the ones added next.
+        Counts are rounded up: the rare slow durations of the tail are kept."""
+        self.buckets = {k: (v + 1) // 2 for k, v in self.buckets.items()}
+        count = sum(self.buckets.values())
+        self.total_ms = self.total_ms * count / self.count if self.count else 0.0
+        self.count = count
+
+    def percentile(self, percent: float) -> float:
+        """Upper bound of the bucket holding the percentile (capped by the maximum)."""
+        if not self.count:
+            return 0.0
+
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(math.exp(index * _LOG_STEP), self.max_ms)
+        return self.max_ms
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total_ms": self.total_ms,
+            "max_ms": self.max_ms,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.count = data["count"]
+        histogram.total_ms = data["total_ms"]
+        histogram.max_ms = data["max_ms"]
+        histogram.buckets = {
+            int(index): count for index, count in data["buckets"].items()
+        }
+        return histogram
+
+
+class LatencyRecorder:
+    """Latency histograms of a worker keyed by (operation, normalized page URL, xpath).
+
+    Worker files are written with dump() and merged with merge_latency_files().
+    """
+
+    def __init__(self):
+        self.histograms: Dict[LatencyKey, LatencyHistogram] = {}
+
+    def add(self, operation: str, page_url: str, xpath: str, seconds: float):
+        key = (operation, url_normalizer.normalize(page_url), xpath)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        histogram.add(seconds * 1000)
+
+    def merge(self, other: "LatencyRecorder"):
+        for key, histogram in other.histograms.items():
+            if key in self.histograms:
+                self.histograms[key].merge(histogram)
+            else:
+                self.histograms[key] = histogram
+
+    def rows(self) -> List[dict]:
+        """Summary of every histogram, the most time-consuming first."""
+        rows = []
+        for (operation, page_url, xpath), histogram in self.histograms.items():
+            row = {
+                "operation": operation,
+                "page_url": page_url,
+                "xpath": xpath,
+                "count": histogram.count,
+                "mean_ms": round(histogram.mean_ms, 3),
+            }
+            for percent in PERCENTILES:
+                row[f"p{percent}_ms"] = round(histogram.percentile(percent), 3)
+            row["max_ms"] = round(histogram.max_ms, 3)
+            row["total_ms"] = round(histogram.total_ms, 3)
+            rows.append(row)
+        return sorted(rows, key=lambda x: x["total_ms"], reverse=True)
+
+    def to_csv(self) -> str:
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=CSV_COLUMNS)
+        writer.writeheader()
+        writer.writerows(self.rows())
+        return output.getvalue()
+
+    def to_dict(self) -> dict:
+        return {
+            "histograms": [
+                {
+                    "operation": key[0],
+                    "page_url": key[1],
+                    "xpath": key[2],
+                    **value.to_dict(),
+                }
+                for key, value in self.histograms.items()
+            ]
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyRecorder":
+        recorder = cls()
+        for item in data["histograms"]:
+            key = (item["operation"], item["page_url"], item["xpath"])
+            recorder.histograms[key] = LatencyHistogram.from_dict(item)
+        return recorder
+
+    def dump(self, filepath: Path):
+        with open(filepath, "w") as file:
+            json.dump(self.to_dict(), file)
+
+    @classmethod
+    def load(cls, filepath: Path) -> "LatencyRecorder":
+        with open(filepath) as file:
+            return cls.from_dict(json.load(file))
+
+    def clear(self):
+        self.histograms.clear()
+
+    def __len__(self) -> int:
+        return len(self.histograms)
+
+    def __bool__(self) -> bool:
+        return bool(self.histograms)
+
+
+latency_recorder = LatencyRecorder()
+
+
+def latency_file_path(directory: Path, worker_id: str) -> Path:
+    return directory / f"{LATENCY_FILE_PREFIX}{worker_id}.json"
+
+
+def find_latency_files(directory: Path) -> List[Path]:
+    return sorted(Path(directory).glob(f"{LATENCY_FILE_PREFIX}*.json"))
+
+
+def merge_latency_files(file_paths: Iterable[Path]) -> LatencyRecorder:
+    merged = LatencyRecorder()
+    for filepath in file_paths:
+        merged.merge(LatencyRecorder.load(filepath))
+    return merged
+
+
+def write_latency_report(directory: Path) -> LatencyRecorder:
+    """Merge worker files of the directory into ui_latency_report.json and .csv"""
+    merged = merge_latency_files(find_latency_files(directory))
+    with open(directory / f"{LATENCY_REPORT_NAME}.json", "w") as file:
+        json.dump(merged.rows(), file, indent=4)
+    with open(directory / f"{LATENCY_REPORT_NAME}.csv", "w", newline="") as file:
+        file.write(merged.to_csv())
+    return merged
+
+
+def attach_latency_report(directory: Path):
+    """Attach the merged report to the Allure results as global attachments.
+    Called on the controller, which writes them once for all workers."""
+    allure.global_attach.file(
+        directory / f"{LATENCY_REPORT_NAME}.json",
+        name=f"{LATENCY_REPORT_NAME}.json",
+        attachment_type=allure.attachment_type.JSON,
+    )
+    allure.global_attach.file(
+        directory / f"{LATENCY_REPORT_NAME}.csv",
+        name=f"{LATENCY_REPORT_NAME}.csv",
+        attachment_type=allure.attachment_type.CSV,
+    )
+
+
+def timed(key: KeyFunction, operation: str = None):
+    """Record the duration of every call of the decorated function or coroutine.
+
+    :param key:
+        Called with the arguments of the decorated function before it runs.
+        Returns the (page_url, xpath) pair the duration is recorded for.
+    :param operation:
+        Name of the operation in the report. Defaults to the function name.
+
+    Returns the function itself if UI_LATENCY_ENABLED is False.
+    """
+
+    def decorator(func):
+        if not UI_LATENCY_ENABLED:
+            return func
+
+        name = operation or func.__name__
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                page_url, xpath = key(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    latency_recorder.add(
+                        name, page_url, xpath, time.perf_counter() - start
+                    )
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            page_url, xpath = key(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                latency_recorder.add(name, page_url, xpath, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
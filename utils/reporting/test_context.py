@@ -0,0 +1,76 @@
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+import pytest
+
+TestIdentity = tuple[Optional[str], str]
+# the allure_id, or (None, title) for the tests without one
+IdentityKey = tuple[Optional[str], Optional[str]]
+
+_current_test: ContextVar[Optional[TestIdentity]] = ContextVar(
+    "current_test", default=None
+)
+_identity_key = pytest.StashKey[TestIdentity]()
+
+
+def resolve_test_identity(
+    test_function: Callable, markers: Optional[list] = None
+) -> TestIdentity:
+    """Extract the allure_id and test title of a test function.
+
+    Parameters
+    ----------
+    test_function: Callable
+        The original (not parametrized) test function.
+    markers: list
+        Markers applied to the test. Defaults to the function's own 'pytestmark'.
+    """
+    markers = (
+        markers if markers is not None else getattr(test_function, "pytestmark", [])
+    )
+    test_id_annotations = [
+        x for x in markers if x.name == "allure_label" and "as_id" in x.kwargs.values()
+    ]
+    test_id = test_id_annotations[0].args[0] if test_id_annotations else None
+
+    # In case allure title is absent, use the function name
+    test_title = (
+        test_function.__allure_display_name__
+        if hasattr(test_function, "__allure_display_name__")
+        else test_function.__name__
+    )
+
+    return test_id, test_title
+
+
+def identity_key(allure_id: Optional[str], test_name: str) -> IdentityKey:
+    """Key the records of a locator are deduplicated by: the allure_id of the test.
+    The tests without an allure id are told apart by their titles,
+    otherwise all of them would collapse into one record.
+    """
+    return allure_id, test_name if allure_id is None else None
+
+
+def get_item_identity(item: pytest.Item) -> TestIdentity:
+    """Resolve the allure_id and title of a collected test item only once."""
+    identity = item.stash.get(_identity_key, None)
+    if identity is None:
+        identity = resolve_test_identity(
+            item.function, list(item.iter_markers(name="allure_label"))
+        )
+        item.stash[_identity_key] = identity
+    return identity
+
+
+def set_current_test(item: pytest.Item) -> None:
+    """Make the item the test that all recorded locators are attributed to."""
+    _current_test.set(get_item_identity(item))
+
+
+def clear_current_test() -> None:
+    _current_test.set(None)
+
+
+def get_current_test() -> Optional[TestIdentity]:
+    """Return (allure_id, test_title) of the running test or None outside of tests."""
+    return _current_test.get()
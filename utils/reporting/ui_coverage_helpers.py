@@ -1,39 +1,32 @@
 import inspect
-import re
-from urllib.parse import urlparse
 
 from playwright.sync_api import Locator
 
-from conftest import used_locators
+from utils.reporting.coverage_store import used_locators
+from utils.reporting.latency import timed
+from utils.reporting.test_context import get_current_test, resolve_test_identity
+from utils.reporting.url_normalizer import url_normalizer
+from utils.reporting.xpath_normalizer import xpath_normalizer
 
 
 def get_test_allure_id_and_title() -> tuple[str, str]:
-    """Find the test function and extract the allure_id and test title from annotations."""
+    """Find the test function and extract the allure_id and test title from annotations.
+    Walks the whole call stack, so it is only used as a fallback
+    when the current test is not set by the pytest hooks (see conftest.py).
+    """
     functions = inspect.getouterframes(inspect.currentframe())
     test_function = [x for x in functions if x.function.startswith("test_")][
         0
     ].frame.f_back.f_locals.get("testfunction")
-    test_id_annotations = [
-        x
-        for x in test_function.pytestmark
-        if x.name == "allure_label" and "as_id" in x.kwargs.values()
-    ]
-    test_id = test_id_annotations[0].args[0] if test_id_annotations else None
-
-    # In case allure title is absent, use the function name
-    test_title = (
-        test_function.__allure_display_name__
-        if hasattr(test_function, "__allure_display_name__")
-        else test_function.__name__
-    )
 
-    return test_id, test_title
+    return resolve_test_identity(test_function)
 
 
 def _normalize_url(url: str):
     """Remove all query parameters and other not needed fragments from the URL.
-    All IDs in the path will be replaced with X to avoid duplicates.
-    The URL will be normalized to the base path.
+    The URL is mapped to the template of the page it belongs to (see BasePage.path).
+    If no page matches, all IDs (numbers, UUIDs, hex ids, dates) in the path
+    will be replaced with X to avoid duplicates.
 
     Parameters
     ----------
@@ -44,41 +37,43 @@ def _normalize_url(url: str):
     --------
     Originals - https://example.com/path/to/page?param1=value1&param2=value2#tab1
                 https://example.com/path/item/1/
+                https://example.com/orders/3f2b8c1e-8a4d-4c1e-9b7a-2d6f1e0c9a11
     Normalized - https://example.com/path/to/page
                 https://example.com/path/item/X
+                https://example.com/orders/X
 
     """
-    parsed_url = urlparse(url)
+    return url_normalizer.normalize(url)
 
-    # replace numbers with X to make URL abstract
-    parsed_path = re.sub(r"\d+", "X", parsed_url.path)
-    if parsed_path.endswith("/"):
-        parsed_path = parsed_path[:-1]
-    if url.endswith("/{}"):
-        # remove string template parts. Occurs when test fails
-        parsed_path = parsed_path.replace("/{}", "/X")
-    if "#" in parsed_path:
-        # remove added tabs names from url
-        parsed_path = "".join(parsed_path.split("#")[:-1])
 
-    return parsed_url.scheme + "://" + parsed_url.netloc + parsed_path
+def _get_xpath_chain(playwright_locator: "Locator") -> tuple:
+    """Extract the xpaths of the parent blocks and the element
+    from the Playwright Locator object, as they are written in the page objects.
+    """
+    return xpath_normalizer.selector_xpaths(playwright_locator._impl_obj._selector)
 
 
 def _get_full_xpath(playwright_locator: "Locator"):
-    """Extract the full xpath from the Playwright Locator object.
-    Includes all parent elements up to the root.
+    """Extract the full canonical xpath from the Playwright Locator object
+    (see XpathNormalizer). Includes all parent elements up to the root.
     """
-    raw_xpath: str = playwright_locator._impl_obj._selector
+    return "".join(
+        xpath_normalizer.split_selector(playwright_locator._impl_obj._selector)
+    )
+
 
-    # remove 'xpath=' from string
-    locator: str = raw_xpath.replace("xpath=", "")
+def locator_latency_key(playwright_locator: "Locator", *_args, **_kwargs):
+    """(page URL, full xpath) of the locator the latency of an operation is recorded for"""
+    return playwright_locator.page.url, _get_full_xpath(playwright_locator)
 
-    # split string by ' >> nth=x >> ' pattern
-    locator = locator.split(" >> ")
 
-    return "".join(x for x in locator if "nth" not in x)
+def _record_locator_latency_key(
+    url: str, playwright_locator: "Locator", *_args, **_kwargs
+):
+    return url, _get_full_xpath(playwright_locator)
 
 
+@timed(_record_locator_latency_key)
 def record_locator(
     url: str,
     playwright_locator: "Locator",
@@ -87,8 +82,8 @@ def record_locator(
     outer_xpath: str = None,
 ):
     """
-    Save used locator to the dictionary.
-    The dictionary will be dumped to a JSON file after the test session is finished.
+    Save used locator to the used_locators store.
+    The store will be dumped to a JSON file after the test session is finished.
     File will be used by the UI Coverage tool to generate the report.
 
     Parameters
@@ -105,18 +100,17 @@ def record_locator(
         Set if you use outer_search=True. The outer_xpath xpath of the element you are looking for.
     """
     page_url = _normalize_url(url)
-    parsed_xpath = _get_full_xpath(playwright_locator)
-    allure_id, test_name = get_test_allure_id_and_title()
+    xpath_chain = _get_xpath_chain(playwright_locator)
+    allure_id, test_name = get_current_test() or get_test_allure_id_and_title()
 
     outer_xpath = outer_xpath if outer_search else None
 
-    # Add or update the data for the given page_url and full_xpath
-    used_locators.setdefault(page_url, {}).setdefault(parsed_xpath, []).append(
-        {
-            "allure_id": allure_id,
-            "is_block": is_block,
-            "test_name": test_name,
-            "original_page_url": url,
-            "outer_xpath": outer_xpath,
-        }
+    used_locators.add(
+        page_url,
+        xpath_chain,
+        allure_id=allure_id,
+        test_name=test_name,
+        is_block=is_block,
+        original_page_url=url,
+        outer_xpath=outer_xpath,
     )
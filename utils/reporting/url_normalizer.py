@@ -0,0 +1,131 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Pattern, Tuple
+from urllib.parse import urlparse
+
+PLACEHOLDER = "X"
+
+# Rules are applied to every path segment that does not match a page template.
+# The first rule whose pattern matches the whole segment replaces it.
+DEFAULT_SEGMENT_RULES: Tuple[Tuple[Pattern[str], str], ...] = (
+    # string template parts, e.g. '/items/{}' or '/items/{item_id}'
+    (re.compile(r"\{[^/]*\}"), PLACEHOLDER),
+    # UUIDs
+    (
+        re.compile(
+            r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I
+        ),
+        PLACEHOLDER,
+    ),
+    # dates, e.g. '2024-06-01' or '20240601'
+    (re.compile(r"\d{4}-\d{2}-\d{2}|\d{8}"), PLACEHOLDER),
+    # hex ids and hashes (at least 8 chars with at least one digit)
+    (re.compile(r"(?=[a-f]*\d)[0-9a-f]{8,}", re.I), PLACEHOLDER),
+)
+DEFAULT_CACHE_SIZE = 4096
+
+
+class _TemplateNode:
+    __slots__ = ("children", "wildcard", "template")
+
+    def __init__(self):
+        self.children: Dict[str, "_TemplateNode"] = {}
+        self.wildcard: Optional["_TemplateNode"] = None
+        self.template: Optional[str] = None
+
+
+class UrlNormalizer:
+    """Map live URLs to the URL templates of the pages they belong to.
+
+    Page templates (e.g. 'https://example.com/items/{}/details') are stored
+    in a trie of path segments per host. Segments like '{}' or '{item_id}'
+    match any single segment of a live URL.
+    URLs that do not match any template fall back to the segment rules
+    (UUIDs, dates, hex ids) and then to replacing all digits with X.
+    Results are kept in a bounded LRU cache of raw URL -> normalized URL.
+    """
+
+    def __init__(
+        self,
+        rules: Iterable[Tuple[Pattern[str], str]] = DEFAULT_SEGMENT_RULES,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ):
+        self.rules = tuple(rules)
+        self._roots: Dict[str, _TemplateNode] = {}
+        self._templates = set()
+        self._normalize_cached = lru_cache(maxsize=cache_size)(self._normalize)
+
+    @staticmethod
+    def _split_path(path: str) -> list:
+        return [x for x in path.split("/") if x]
+
+    def _is_placeholder(self, segment: str) -> bool:
+        return segment.startswith("{") and segment.endswith("}")
+
+    def register(self, template_url: str):
+        """Add the URL template of a page, e.g. BasePage.url."""
+        if template_url in self._templates:
+            return
+        parsed_url = urlparse(template_url)
+        node = self._roots.setdefault(parsed_url.netloc, _TemplateNode())
+        normalized_segments = []
+        for segment in self._split_path(parsed_url.path):
+            if self._is_placeholder(segment):
+                node.wildcard = node.wildcard or _TemplateNode()
+                node = node.wildcard
+                normalized_segments.append(PLACEHOLDER)
+            else:
+                node = node.children.setdefault(segment, _TemplateNode())
+                normalized_segments.append(segment)
+
+        node.template = (
+            "/".join(["", *normalized_segments]) if normalized_segments else ""
+        )
+        self._templates.add(template_url)
+        self._normalize_cached.cache_clear()
+
+    def _match_template(self, node: _TemplateNode, segments: list, index: int):
+        if index == len(segments):
+            return node.template
+        child = node.children.get(segments[index])
+        if child is not None:
+            template = self._match_template(child, segments, index + 1)
+            if template is not None:
+                return template
+        if node.wildcard is not None:
+            return self._match_template(node.wildcard, segments, index + 1)
+        return None
+
+    def _normalize_segment(self, segment: str) -> str:
+        for pattern, replacement in self.rules:
+            if pattern.fullmatch(segment):
+                return replacement
+        # replace numbers with X to make URL abstract
+        return re.sub(r"\d+", PLACEHOLDER, segment)
+
+    def _normalize(self, url: str) -> str:
+        parsed_url = urlparse(url)
+        path = parsed_url.path
+        if "#" in path:
+            # remove added tabs names from url
+            path = "".join(path.split("#")[:-1])
+        segments = self._split_path(path)
+
+        root = self._roots.get(parsed_url.netloc)
+        template = self._match_template(root, segments, 0) if root is not None else None
+        if template is None:
+            normalized_segments = [self._normalize_segment(x) for x in segments]
+            template = (
+                "/".join(["", *normalized_segments]) if normalized_segments else ""
+            )
+
+        return parsed_url.scheme + "://" + parsed_url.netloc + template
+
+    def normalize(self, url: str) -> str:
+        return self._normalize_cached(url)
+
+    def cache_info(self):
+        return self._normalize_cached.cache_info()
+
+
+url_normalizer = UrlNormalizer()
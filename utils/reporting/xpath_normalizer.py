@@ -0,0 +1,85 @@
+import re
+from functools import lru_cache
+from typing import Tuple
+
+DEFAULT_CACHE_SIZE = 4096
+
+# string literals and the code between them
+_TOKENS = re.compile(r"'[^']*'|\"[^\"]*\"|[^'\"]+|['\"]")
+# whitespace around the characters that can not be a part of a name or an operator
+_SPACES_AROUND_PUNCTUATION = re.compile(r"\s*([/\[\](),=!<>|:])\s*")
+_SPACES_AFTER_AT = re.compile(r"@\s+")
+_SPACES = re.compile(r"\s+")
+_DESCENDANT_OR_SELF = re.compile(r"/descendant-or-self::node\(\)/")
+_SELF = re.compile(r"/(?:\.|self::node\(\))(?=/)")
+_SLASHES = re.compile(r"///+")
+
+
+def _normalize_code(code: str) -> str:
+    code = _SPACES.sub(" ", code)
+    code = _SPACES_AROUND_PUNCTUATION.sub(r"\1", code)
+    code = _SPACES_AFTER_AT.sub("@", code)
+    code = _DESCENDANT_OR_SELF.sub("//", code)
+    code = _SELF.sub("", code)
+    return _SLASHES.sub("//", code)
+
+
+class XpathNormalizer:
+    """Bring equivalent xpaths to one canonical form, so they are recorded once.
+
+    Outside the string literals whitespace is collapsed and removed around
+    brackets, operators and axis separators, the abbreviated steps
+    ('/descendant-or-self::node()/', '/./') and runs of slashes are collapsed.
+    Literals are kept as is, but written in single quotes where possible.
+
+    Examples
+    --------
+    Originals - //div[ contains(@class, "et_pb_row") ]///a[. = 'View']/
+                //div[contains(@class,'et_pb_row')]/descendant-or-self::node()/a[.='View']
+    Normalized - //div[contains(@class,'et_pb_row')]//a[.='View']
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
+        self._normalize_cached = lru_cache(maxsize=cache_size)(self._normalize)
+
+    @staticmethod
+    def _normalize(xpath: str) -> str:
+        parts = []
+        code = ""
+        for token in _TOKENS.findall(xpath.strip()):
+            if token[0] in "'\"" and len(token) > 1 and token[-1] == token[0]:
+                parts.append(_normalize_code(code))
+                code = ""
+                parts.append(f"'{token[1:-1]}'" if "'" not in token[1:-1] else token)
+            else:
+                code += token
+        code = _normalize_code(code)
+        # a trailing slash selects nothing more than the step before it
+        if code.endswith("/") and not code.endswith("//") and (parts or len(code) > 1):
+            code = code[:-1]
+        parts.append(code)
+        return "".join(parts)
+
+    def normalize(self, xpath: str) -> str:
+        return self._normalize_cached(xpath)
+
+    @staticmethod
+    def selector_xpaths(selector: str) -> Tuple[str, ...]:
+        """Xpaths of a Playwright selector chain as written, from the outermost block.
+        'xpath=//div >> nth=0 >> xpath=//a' -> ('//div', '//a')
+        """
+        chain = []
+        for part in selector.split(" >> "):
+            if part.startswith("nth="):
+                continue
+            if part.startswith("xpath="):
+                part = part[len("xpath=") :]
+            chain.append(part)
+        return tuple(chain)
+
+    def split_selector(self, selector: str) -> Tuple[str, ...]:
+        """Canonical xpaths of a Playwright selector chain, from the outermost block."""
+        return tuple(self.normalize(x) for x in self.selector_xpaths(selector))
+
+
+xpath_normalizer = XpathNormalizer()
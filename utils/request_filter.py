@@ -0,0 +1,235 @@
+import copy
+import json
+import weakref
+from collections import Counter
+from dataclasses import MISSING, asdict, dataclass, field, fields
+from functools import partial
+from pathlib import Path
+from typing import Dict, Optional
+
+from playwright.sync_api import Error, Page, Request, Route
+
+from core.environment_variables_setup import (
+    REQUEST_POLICY_BASELINE_DIRECTORY,
+    REQUEST_POLICY_MODE,
+)
+from ui.base.request_policy import RequestPolicy
+from utils.reporting.url_normalizer import url_normalizer
+
+OFF = "off"
+# block the requests of the policies and report the savings
+BLOCK = "block"
+# load everything and record the sizes and load times the savings are compared with
+BASELINE = "baseline"
+
+MODES = (OFF, BLOCK, BASELINE)
+
+BASELINE_FILE_PREFIX = "baseline_"
+
+# Load time of the current document: from the navigation start to the end of the load event.
+# timeOrigin identifies the document: it changes with every navigation or reload.
+_LOAD_TIME_JS = """() => {
+    const [entry] = performance.getEntriesByType('navigation');
+    return {
+        timeOrigin: performance.timeOrigin,
+        loadMs: entry && entry.loadEventEnd > 0 ? entry.loadEventEnd - entry.startTime : null,
+    };
+}"""
+
+
+@dataclass
+class RequestStats:
+    """Requests of a test page. Savings are estimated with the baseline."""
+
+    allowed_requests: int = 0
+    blocked_requests: int = 0
+    blocked_by_rule: Counter = field(default_factory=Counter)
+    # encoded (compressed) response bodies of the finished requests
+    received_bytes: int = 0
+    saved_bytes: int = 0
+    # blocked requests that are not in the baseline, so their size is unknown
+    blocked_unknown_size: int = 0
+    page_url: Optional[str] = None
+    # 0 if the test reused the document left loaded by the previous test of a shared page
+    load_ms: Optional[float] = None
+    baseline_load_ms: Optional[float] = None
+    reused: bool = False
+
+    def as_dict(self) -> dict:
+        data = asdict(self)
+        data["blocked_by_rule"] = dict(self.blocked_by_rule.most_common())
+        data["load_ms_difference"] = (
+            self.load_ms - self.baseline_load_ms
+            if self.load_ms is not None and self.baseline_load_ms is not None
+            else None
+        )
+        return data
+
+    def reset(self):
+        """Start over, in place: the handlers of the page keep this object."""
+        for item in fields(self):
+            if item.default_factory is not MISSING:
+                setattr(self, item.name, item.default_factory())
+            else:
+                setattr(self, item.name, item.default)
+
+
+class RequestBaseline:
+    """Response sizes and page load times of the pages loaded without request policies.
+
+    It is collected by the runs with REQUEST_POLICY_MODE=baseline
+    (one file per xdist worker) and used to estimate the savings of the policies.
+    """
+
+    def __init__(self):
+        self.sizes: Dict[str, int] = {}
+        self.load_ms: Dict[str, float] = {}
+
+    def dump(self, filepath: Path):
+        with open(filepath, "w") as file:
+            json.dump({"sizes": self.sizes, "load_ms": self.load_ms}, file)
+
+    @classmethod
+    def load(cls, directory: Path) -> "RequestBaseline":
+        """Merge the baseline files of all workers"""
+        baseline = cls()
+        for filepath in sorted(Path(directory).glob(f"{BASELINE_FILE_PREFIX}*.json")):
+            with open(filepath) as file:
+                data = json.load(file)
+            baseline.sizes.update(data["sizes"])
+            baseline.load_ms.update(data["load_ms"])
+        return baseline
+
+    def __bool__(self) -> bool:
+        return bool(self.sizes or self.load_ms)
+
+
+class RequestFilter:
+    """Installs request policies of the applications (see BaseApp.request_policy)
+    into the test contexts and collects the request stats of every page.
+
+    In the baseline mode the pages of the applications with a policy
+    are measured to build the baseline instead. Nothing is installed when it is off.
+    """
+
+    def __init__(
+        self,
+        mode: str = REQUEST_POLICY_MODE,
+        baseline_directory: Path = REQUEST_POLICY_BASELINE_DIRECTORY,
+    ):
+        if mode not in MODES:
+            raise ValueError(
+                f"Unknown request policy mode '{mode}'. Expected one of {MODES}"
+            )
+        self.mode = mode
+        self.baseline_directory = Path(baseline_directory)
+        self._baseline: Optional[RequestBaseline] = None
+        self._stats: "weakref.WeakKeyDictionary[Page, RequestStats]" = (
+            weakref.WeakKeyDictionary()
+        )
+        # time origin of the document a shared page was left with by the previous test
+        self._documents: "weakref.WeakKeyDictionary[Page, float]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != OFF
+
+    @property
+    def blocking(self) -> bool:
+        return self.mode == BLOCK
+
+    @property
+    def baseline(self) -> RequestBaseline:
+        if self._baseline is None:
+            self._baseline = (
+                RequestBaseline.load(self.baseline_directory)
+                if self.blocking
+                else RequestBaseline()
+            )
+        return self._baseline
+
+    def install(self, page: Page, policy: Optional[RequestPolicy]):
+        """Called for every new page of the browser pool."""
+        if not self.enabled or policy is None:
+            return
+        stats = self._stats[page] = RequestStats()
+        if self.blocking:
+            page.context.route("**/*", partial(self._on_route, policy, stats))
+        page.on("requestfinished", partial(self._on_request_finished, stats))
+
+    def _on_route(self, policy: RequestPolicy, stats: RequestStats, route: Route):
+        request = route.request
+        rule = policy.blocked_rule(request.url, request.resource_type)
+        if rule is None:
+            route.fallback()
+            return
+
+        stats.blocked_requests += 1
+        stats.blocked_by_rule[rule] += 1
+        size = self.baseline.sizes.get(url_normalizer.normalize(request.url))
+        if size is None:
+            stats.blocked_unknown_size += 1
+        else:
+            stats.saved_bytes += size
+        route.abort("blockedbyclient")
+
+    def _on_request_finished(self, stats: RequestStats, request: Request):
+        # the size of the body as it was transferred: content-length is missing
+        # in chunked responses and is not the decoded size of compressed ones
+        stats.allowed_requests += 1
+        try:
+            size = max(request.sizes()["responseBodySize"], 0)
+        except Error:
+            # the context is closed
+            return
+        stats.received_bytes += size
+        if not self.blocking:
+            self.baseline.sizes[url_normalizer.normalize(request.url)] = size
+
+    def finish(self, page: Page, keep: bool = False) -> Optional[RequestStats]:
+        """Stats of the page, called before its context is closed.
+        With keep=True (a page shared by several tests) the page stays tracked
+        and its stats start over for the next test. A test that did not load
+        the page again gets load_ms=0 and reused=True.
+        Returns None if the application of the page has no request policy.
+        """
+        stats = self._stats.get(page) if keep else self._stats.pop(page, None)
+        if stats is not None and keep:
+            tracked, stats = stats, copy.deepcopy(stats)
+            tracked.reset()
+        if stats is None or page.is_closed():
+            return stats
+
+        stats.page_url = url_normalizer.normalize(page.url)
+        timing = page.evaluate(_LOAD_TIME_JS)
+        if keep:
+            previous = self._documents.get(page)
+            self._documents[page] = timing["timeOrigin"]
+            stats.reused = previous == timing["timeOrigin"]
+        else:
+            self._documents.pop(page, None)
+        if stats.reused:
+            # nothing was loaded by the test
+            stats.load_ms = 0.0
+            return stats
+
+        stats.load_ms = timing["loadMs"]
+        if self.blocking:
+            stats.baseline_load_ms = self.baseline.load_ms.get(stats.page_url)
+        elif stats.load_ms is not None:
+            self.baseline.load_ms[stats.page_url] = stats.load_ms
+        return stats
+
+    def save_baseline(self, worker_id: str):
+        """Write the baseline collected by the worker (only in the baseline mode)"""
+        if self.mode != BASELINE or not self._baseline:
+            return
+        self.baseline_directory.mkdir(parents=True, exist_ok=True)
+        self._baseline.dump(
+            self.baseline_directory / f"{BASELINE_FILE_PREFIX}{worker_id}.json"
+        )
+
+
+request_filter = RequestFilter()